@@ -0,0 +1,193 @@
+"""
+Batch Render Module
+
+This module provides a headless command-line batch mode that turns many
+exercise JSON documents into PDF files using a multiprocessing pool.
+
+Usage:
+    python batch_render.py <directory|file.jsonl|-> -o <output_dir> [-w WORKERS]
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+from pdf_generator import PDFGenerator
+from render_cache import RenderCache
+
+# PDF generator and render cache of the current worker process (created once per process)
+_worker_generator = None
+_worker_cache = None
+
+
+def _init_worker(cache_dir=None):
+    """Create the PDF generator (and render cache) once per worker process"""
+    global _worker_generator, _worker_cache
+    _worker_generator = PDFGenerator()
+    _worker_cache = RenderCache(cache_dir) if cache_dir else None
+
+
+def iter_render_jobs(source, output_dir):
+    """
+    Yield render jobs for a directory of .json files or a JSONL stream
+
+    Args:
+        source (str): Directory with .json files, path to a .jsonl file or "-" for stdin
+        output_dir (str): Directory for the generated PDFs
+
+    Yields:
+        tuple: (name, json_path, json_string, output_dir) - either json_path or json_string is None
+    """
+    if os.path.isdir(source):
+        for filename in sorted(os.listdir(source)):
+            if filename.lower().endswith(".json"):
+                name = os.path.splitext(filename)[0]
+                yield name, os.path.join(source, filename), None, output_dir
+        return
+
+    if source == "-":
+        stream, stem = sys.stdin, "stdin"
+    else:
+        stream = open(source, encoding="utf-8")
+        stem = os.path.splitext(os.path.basename(source))[0]
+
+    try:
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if line:
+                yield f"{stem}_{line_number:05d}", None, line, output_dir
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _render_job(job):
+    """
+    Render a single job inside a worker process
+
+    Args:
+        job (tuple): Job as produced by iter_render_jobs
+
+    Returns:
+        dict: Per-file result with name, ok flag, PDF paths or error message and duration
+    """
+    name, json_path, json_string, output_dir = job
+    start = time.perf_counter()
+    result = {"name": name, "ok": False, "exercise_pdf": None, "solution_pdf": None, "error": None}
+
+    try:
+        if json_path is not None:
+            with open(json_path, encoding="utf-8") as f:
+                json_string = f.read()
+
+        exercise_pdf, solution_pdf = _worker_generator.generate_pdfs_from_json(
+            json_string, os.path.join(output_dir, name), cache=_worker_cache
+        )
+        result.update(ok=True, exercise_pdf=exercise_pdf, solution_pdf=solution_pdf)
+    except Exception as e:
+        result["error"] = str(e)
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def render_batch(source, output_dir, workers=None, on_result=None, cache_dir=None):
+    """
+    Render all documents of a directory or JSONL stream on a process pool
+
+    Args:
+        source (str): Directory with .json files, path to a .jsonl file or "-" for stdin
+        output_dir (str): Directory for the generated PDFs
+        workers (int): Number of worker processes (default: number of CPU cores)
+        on_result (callable): Optional callback invoked with every per-file result
+        cache_dir (str): Optional render cache directory, unchanged documents are served from it
+
+    Returns:
+        tuple: (results, summary) - list of per-file result dicts and a summary dict
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    jobs = iter_render_jobs(source, output_dir)
+    results = []
+
+    start = time.perf_counter()
+    if workers == 1:
+        # Render in-process, no pool overhead for a single worker
+        _init_worker(cache_dir)
+        for job in jobs:
+            result = _render_job(job)
+            results.append(result)
+            if on_result:
+                on_result(result)
+    else:
+        with multiprocessing.Pool(processes=workers, initializer=_init_worker, initargs=(cache_dir,)) as pool:
+            for result in pool.imap_unordered(_render_job, jobs):
+                results.append(result)
+                if on_result:
+                    on_result(result)
+    wall_time = time.perf_counter() - start
+
+    results.sort(key=lambda r: r["name"])
+    succeeded = sum(1 for r in results if r["ok"])
+    summary = {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "workers": workers,
+        "wall_seconds": wall_time,
+        "docs_per_second": len(results) / wall_time if wall_time > 0 else 0.0,
+    }
+    return results, summary
+
+
+def format_result(result):
+    """Format a per-file result as a single status line"""
+    if result["ok"]:
+        return f"✓ {result['name']} ({result['seconds']:.2f}s): {result['exercise_pdf']}, {result['solution_pdf']}"
+    return f"✗ {result['name']} ({result['seconds']:.2f}s): {result['error']}"
+
+
+def format_summary(summary):
+    """Format the batch summary"""
+    return (
+        f"{summary['succeeded']}/{summary['total']} Dokumente erfolgreich, {summary['failed']} fehlgeschlagen "
+        f"({summary['workers']} Prozesse, {summary['wall_seconds']:.2f}s, "
+        f"{summary['docs_per_second']:.2f} Dokumente/s)"
+    )
+
+
+def build_arg_parser():
+    """Create the argument parser for the batch renderer"""
+    parser = argparse.ArgumentParser(description="Rendert viele Übungs-JSON-Dokumente parallel zu PDFs.")
+    parser.add_argument("source", help="Verzeichnis mit .json-Dateien, .jsonl-Datei oder '-' für stdin")
+    parser.add_argument("-o", "--output-dir", default="pdf_output", help="Zielverzeichnis für die PDFs")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=None, help="Anzahl der Prozesse (Standard: alle CPU-Kerne)"
+    )
+    parser.add_argument("--cache-dir", default=None, help="Render-Cache-Verzeichnis (unveränderte Dokumente)")
+    return parser
+
+
+def main(argv=None):
+    """Run the batch renderer from the command line"""
+    args = build_arg_parser().parse_args(argv)
+
+    results, summary = render_batch(
+        args.source,
+        args.output_dir,
+        args.workers,
+        on_result=lambda r: print(format_result(r), flush=True),
+        cache_dir=args.cache_dir,
+    )
+    print(format_summary(summary))
+
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Benchmark Corpus Module
+
+This module generates synthetic exercise documents for benchmarks. The
+documents use the real exercise types from config.EXERCISE_MAPPINGS, mix
+the sub-question and multiple choice formats and contain long German
+text with umlauts, so they stress the renderer like real AI output.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import json
+import random
+
+from config import EXERCISE_MAPPINGS, MULTIPLE_CHOICE_TYPE
+
+SUBTOPICS = ("Plural", "Artikel", "Merkwörter", "Zusammengesetzte Nomen", "Großschreibung", "Wortfamilien")
+
+WORDS = (
+    "Mädchen",
+    "Übungsblatt",
+    "Bäume",
+    "Straße",
+    "Größe",
+    "Frühstück",
+    "Schüler",
+    "Prüfung",
+    "Märchen",
+    "Häuser",
+    "fröhlich",
+    "schön",
+    "Gemüse",
+    "Brücke",
+    "Käse",
+    "Hütte",
+    "Fußball",
+    "Bücher",
+    "Äpfel",
+    "Löwen",
+    "grün",
+    "müde",
+    "Tür",
+    "Öffnung",
+)
+
+SENTENCE_PARTS = (
+    "Die Kinder laufen über die große Brücke",
+    "Im Märchen lebt ein fröhlicher König",
+    "Nach dem Frühstück üben die Schüler für die Prüfung",
+    "Auf der Straße spielen zwei Mädchen Fußball",
+    "Die Äpfel und Birnen liegen in der Schüssel",
+    "Der Löwe schläft müde unter den grünen Bäumen",
+)
+
+
+def _sentence(rng, min_words=8, max_words=24):
+    """Create a long German sentence with umlauts"""
+    words = [rng.choice(SENTENCE_PARTS)]
+    words.extend(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+    return " ".join(words) + "."
+
+
+def generate_exercise(exercise_id, rng, subject="Deutsch", subtopics=SUBTOPICS, mc_ratio=0.25):
+    """
+    Generate a single synthetic exercise
+
+    Args:
+        exercise_id (int): Exercise id
+        rng (random.Random): Random generator
+        subject (str): Subject whose exercise types are used
+        subtopics (tuple): Subtopics to choose from
+        mc_ratio (float): Share of multiple choice exercises
+
+    Returns:
+        dict: Exercise in the JSON format
+    """
+    subtopic = subtopics[(exercise_id - 1) % len(subtopics)]
+
+    if rng.random() < mc_ratio:
+        options = rng.sample(WORDS, 4)
+        return {
+            "id": exercise_id,
+            "type": MULTIPLE_CHOICE_TYPE,
+            "subtopic": subtopic,
+            "question": f"Welche Antwort ist richtig? {_sentence(rng, 4, 10)}",
+            "options": options,
+            "answer": rng.choice(options),
+            "explanation": _sentence(rng),
+        }
+
+    types = [t for t in EXERCISE_MAPPINGS.get(subject, EXERCISE_MAPPINGS["Deutsch"]) if t != MULTIPLE_CHOICE_TYPE]
+    return {
+        "id": exercise_id,
+        "type": rng.choice(types),
+        "subtopic": subtopic,
+        "question": f"Bearbeite die folgenden Sätze: {_sentence(rng, 4, 10)}",
+        "sub_questions": [
+            {"question": _sentence(rng), "answer": _sentence(rng, 2, 6), "explanation": _sentence(rng, 4, 12)}
+            for _ in range(rng.randint(3, 5))
+        ],
+        "explanation": _sentence(rng),
+    }
+
+
+def generate_worksheet(num_exercises, seed=0, subject="Deutsch", grade="4. Klasse", mc_ratio=0.25):
+    """
+    Generate a synthetic worksheet document
+
+    Args:
+        num_exercises (int): Number of exercises
+        seed (int): Random seed (same seed -> same document)
+        subject (str): Subject (key of EXERCISE_MAPPINGS)
+        grade (str): Grade for the metadata
+        mc_ratio (float): Share of multiple choice exercises
+
+    Returns:
+        dict: Worksheet in the JSON format
+    """
+    rng = random.Random(seed)
+    return {
+        "metadata": {
+            "topic": "Nomen und Wortarten",
+            "grade": grade,
+            "subject": subject,
+            "subtopics": list(SUBTOPICS),
+        },
+        "exercises": [generate_exercise(i, rng, subject, mc_ratio=mc_ratio) for i in range(1, num_exercises + 1)],
+    }
+
+
+def write_worksheet_file(path, num_exercises, seed=0, subject="Deutsch", grade="4. Klasse", mc_ratio=0.25):
+    """
+    Write a synthetic worksheet exercise by exercise, for documents too large to build in memory
+
+    Unlike generate_worksheet, the exercises are grouped by subtopic (as in
+    documents written by this application), so streaming renders match the
+    regular layout.
+
+    Args:
+        path (str): Target file; .jsonl writes the metadata line and one exercise per line, otherwise JSON
+        num_exercises (int): Number of exercises
+        seed (int): Random seed (same seed -> same document)
+        subject (str): Subject (key of EXERCISE_MAPPINGS)
+        grade (str): Grade for the metadata
+        mc_ratio (float): Share of multiple choice exercises
+    """
+    rng = random.Random(seed)
+    metadata = {"topic": "Nomen und Wortarten", "grade": grade, "subject": subject, "subtopics": list(SUBTOPICS)}
+    records = path.lower().endswith(".jsonl")
+
+    with open(path, "w", encoding="utf-8") as f:
+        if records:
+            f.write(json.dumps({"metadata": metadata}, ensure_ascii=False) + "\n")
+        else:
+            f.write('{"metadata": ' + json.dumps(metadata, ensure_ascii=False) + ', "exercises": [\n')
+
+        for exercise_id in range(1, num_exercises + 1):
+            # Consecutive blocks of exercises share a subtopic
+            subtopic = SUBTOPICS[(exercise_id - 1) * len(SUBTOPICS) // num_exercises]
+            exercise = generate_exercise(exercise_id, rng, subject, (subtopic,), mc_ratio)
+            separator = "\n" if records else (",\n" if exercise_id < num_exercises else "\n")
+            f.write(json.dumps(exercise, ensure_ascii=False) + separator)
+
+        if not records:
+            f.write("]}\n")
@@ -0,0 +1,142 @@
+"""
+PDF Memory Benchmark
+
+Measures the peak resident memory (RSS) of rendering synthetic worksheets
+of increasing size, in the streaming mode (generate_pdfs_streaming) and
+optionally in the regular mode (whole document loaded, whole story built).
+Every measurement runs in a fresh subprocess, so the peak RSS of one size
+does not carry over to the next. The streaming peak should stay flat; the
+run fails if it grows by more than --max-growth from the smallest to the
+largest size.
+
+Needs the resource module (Linux, macOS).
+
+Usage:
+    python benchmark_memory.py [--sizes 1000,10000,100000] [--regular-up-to 10000] [--max-growth 1.5]
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmark_corpus import write_worksheet_file
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+MODES = ("stream", "regular")
+
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB"""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(mode, path, output_dir):
+    """
+    Render one document in this process and print the measurement as JSON
+
+    Args:
+        mode (str): "stream" or "regular"
+        path (str): Worksheet file
+        output_dir (str): Directory for the rendered PDFs
+    """
+    from pdf_generator import PDFGenerator
+
+    generator = PDFGenerator()
+    prefix = os.path.join(output_dir, mode)
+    start = time.perf_counter()
+    if mode == "stream":
+        generator.generate_pdfs_streaming(path, prefix)
+    else:
+        with open(path, encoding="utf-8") as f:
+            generator.generate_pdfs_from_json(f.read(), prefix)
+    print(json.dumps({"seconds": time.perf_counter() - start, "peak_rss_mb": _peak_rss_mb()}))
+
+
+def measure(mode, path, output_dir):
+    """Run one measurement in a fresh subprocess and return its result dict"""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, path, output_dir],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def format_result(size, mode, result):
+    """Format one result line"""
+    return (
+        f"{size:>7} Aufgaben | {mode:<7} | Peak RSS {result['peak_rss_mb']:7.1f} MB | "
+        f"{result['seconds']:8.1f}s | {size / result['seconds']:.0f} Aufgaben/s"
+    )
+
+
+def main(argv=None):
+    """Run the memory benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Speicher-Benchmark für das Streaming-Rendern")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Kommagetrennte Aufgabenanzahlen",
+    )
+    parser.add_argument(
+        "--regular-up-to",
+        type=int,
+        default=10000,
+        help="Regulären Modus nur bis zu dieser Aufgabenanzahl messen (0: nie)",
+    )
+    parser.add_argument(
+        "--max-growth",
+        type=float,
+        default=1.5,
+        help="Erlaubter Faktor des Streaming-Peaks von der kleinsten zur größten Größe",
+    )
+    parser.add_argument("--child", nargs=3, metavar=("MODUS", "DATEI", "AUSGABE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(*args.child)
+        return 0
+
+    try:
+        import resource  # noqa: F401
+    except ImportError:
+        print("Das Modul resource fehlt (nur Linux und macOS).", file=sys.stderr)
+        return 2
+
+    sizes = sorted(int(size) for size in args.sizes.split(",") if size.strip())
+    stream_peaks = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sizes:
+            path = os.path.join(work_dir, f"arbeitsblatt_{size}.json")
+            write_worksheet_file(path, size, seed=size)
+            for mode in MODES:
+                if mode == "regular" and size > args.regular_up_to:
+                    continue
+                result = measure(mode, path, work_dir)
+                if mode == "stream":
+                    stream_peaks.append(result["peak_rss_mb"])
+                print(format_result(size, mode, result), flush=True)
+            os.remove(path)
+
+    growth = stream_peaks[-1] / stream_peaks[0]
+    if growth > args.max_growth:
+        print(f"✗ Streaming-Peak wächst um Faktor {growth:.2f} (erlaubt: {args.max_growth:.2f})")
+        return 1
+    print(f"✓ Streaming-Peak flach: Faktor {growth:.2f} von {sizes[0]} bis {sizes[-1]} Aufgaben")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+PDF Rendering Benchmark
+
+Times validation, story building and the complete generate_pdfs_from_json
+call on synthetic worksheets of increasing size and reports throughput,
+pages per second, the memory blocks held by the built stories and peak
+memory. Results can be saved as a baseline and later runs are compared
+against it to flag regressions. Optionally times a class set against a
+single stamped sheet.
+
+Usage:
+    python benchmark_pdf.py [--sizes 10,100,1000] [--save-baseline] [--tolerance 0.2] [--class-set 30]
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmark_corpus import generate_worksheet
+from class_set import generate_class_set
+from exercise_model import parse_worksheet
+from pdf_generator import PDFGenerator
+
+DEFAULT_SIZES = (10, 100, 1000)
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+# Metrics compared against the baseline (all "seconds": lower is better)
+COMPARED_METRICS = ("validate_seconds", "story_seconds", "render_seconds")
+
+# Differences below this are timer noise and never count as regression
+MIN_REGRESSION_SECONDS = 0.01
+
+
+def _best_of(repeat, func):
+    """Run func repeat times and return the fastest wall time"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _story_blocks(generator, worksheet):
+    """Number of memory blocks allocated and still held by the stories of both sheets"""
+    gc.collect()
+    before = sys.getallocatedblocks()
+    stories = generator._build_exercise_story(worksheet), generator._build_solution_story(worksheet)
+    gc.collect()
+    blocks = sys.getallocatedblocks() - before
+    del stories
+    return blocks
+
+
+def benchmark_size(generator, num_exercises, output_dir, repeat=3):
+    """
+    Benchmark one worksheet size
+
+    Args:
+        generator (PDFGenerator): PDF generator
+        num_exercises (int): Number of exercises in the synthetic worksheet
+        output_dir (str): Directory for the rendered PDFs
+        repeat (int): Number of repetitions (fastest run counts)
+
+    Returns:
+        dict: Metrics for this size
+    """
+    data = generate_worksheet(num_exercises, seed=num_exercises)
+    worksheet = parse_worksheet(data)
+    repeat = 1 if num_exercises >= 1000 else repeat
+
+    validate_seconds = _best_of(repeat, lambda: parse_worksheet(data))
+    story_seconds = _best_of(
+        repeat, lambda: (generator._build_exercise_story(worksheet), generator._build_solution_story(worksheet))
+    )
+    story_blocks = _story_blocks(generator, worksheet)
+
+    prefix = os.path.join(output_dir, f"bench_{num_exercises}")
+    render_seconds = _best_of(repeat, lambda: generator.generate_pdfs_from_json(data, prefix))
+
+    # Separate profiled run for page counts and peak memory (tracemalloc slows rendering down)
+    tracemalloc.start()
+    _, _, report = generator.generate_pdfs_from_json(data, prefix, profile=True)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    pages = sum(counters.get("pages", 0) for counters in report["counters"].values())
+
+    return {
+        "exercises": num_exercises,
+        "validate_seconds": validate_seconds,
+        "story_seconds": story_seconds,
+        "story_blocks": story_blocks,
+        "render_seconds": render_seconds,
+        "exercises_per_second": num_exercises / render_seconds,
+        "pages": pages,
+        "pages_per_second": pages / render_seconds,
+        "peak_memory_mb": peak_memory / (1024 * 1024),
+    }
+
+
+def benchmark_class_set(generator, num_students, num_exercises=40, repeat=3):
+    """
+    Time a class set against the sheet of a single student
+
+    Laid out once and stamped per student, the whole class should cost
+    a small multiple of one sheet instead of num_students times as much.
+
+    Args:
+        generator (PDFGenerator): PDF generator
+        num_students (int): Number of students
+        num_exercises (int): Number of exercises in the synthetic worksheet
+        repeat (int): Number of repetitions (fastest run counts)
+
+    Returns:
+        dict: Timings of one and of all students
+    """
+    worksheet = generate_worksheet(num_exercises, seed=3)
+    students = [f"Schüler {number:02d}" for number in range(num_students)]
+    single_seconds = _best_of(repeat, lambda: generate_class_set([worksheet], students[:1], io.BytesIO(), generator))
+    class_seconds = _best_of(repeat, lambda: generate_class_set([worksheet], students, io.BytesIO(), generator))
+    return {
+        "students": num_students,
+        "single_seconds": single_seconds,
+        "class_seconds": class_seconds,
+        "factor": class_seconds / single_seconds,
+    }
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Compare results with a baseline
+
+    Args:
+        results (list): Current results
+        baseline (list): Baseline results
+        tolerance (float): Allowed slowdown (0.2 = 20 %)
+
+    Returns:
+        list: Human-readable regression messages
+    """
+    baseline_by_size = {entry["exercises"]: entry for entry in baseline}
+    regressions = []
+    for result in results:
+        reference = baseline_by_size.get(result["exercises"])
+        if not reference:
+            continue
+        for metric in COMPARED_METRICS:
+            too_slow = result[metric] > reference[metric] * (1 + tolerance)
+            if too_slow and result[metric] - reference[metric] >= MIN_REGRESSION_SECONDS:
+                slowdown = result[metric] / reference[metric] - 1
+                regressions.append(
+                    f"{result['exercises']} Aufgaben, {metric}: {result[metric]:.4f}s statt "
+                    f"{reference[metric]:.4f}s (+{slowdown:.0%})"
+                )
+    return regressions
+
+
+def format_result(result):
+    """Format one result line"""
+    return (
+        f"{result['exercises']:>6} Aufgaben | validieren {result['validate_seconds']:.4f}s | "
+        f"Story {result['story_seconds']:.4f}s, {result['story_blocks']} Blöcke | "
+        f"rendern {result['render_seconds']:.3f}s | "
+        f"{result['exercises_per_second']:.0f} Aufgaben/s | {result['pages']} Seiten, "
+        f"{result['pages_per_second']:.1f} Seiten/s | Peak {result['peak_memory_mb']:.1f} MB"
+    )
+
+
+def format_class_set_result(result):
+    """Format the class set timing"""
+    return (
+        f"Klassensatz {result['students']} Schüler: {result['class_seconds']:.3f}s, "
+        f"ein Schüler {result['single_seconds']:.3f}s ({result['factor']:.1f}-fach)"
+    )
+
+
+def main(argv=None):
+    """Run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Benchmark für die PDF-Generierung")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Kommagetrennte Aufgabenanzahlen (z.B. 10,100,1000,10000)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen pro Größe (schnellster Lauf zählt)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Pfad der Baseline-Datei")
+    parser.add_argument("--save-baseline", action="store_true", help="Ergebnisse als neue Baseline speichern")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Erlaubte Verlangsamung (0.2 = 20%%)")
+    parser.add_argument(
+        "--class-set", type=int, default=0, metavar="SCHÜLER", help="Zusätzlich einen Klassensatz dieser Größe messen"
+    )
+    args = parser.parse_args(argv)
+
+    generator = PDFGenerator()
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for size in sizes:
+            result = benchmark_size(generator, size, output_dir, args.repeat)
+            results.append(result)
+            print(format_result(result), flush=True)
+
+    if args.class_set:
+        print(format_class_set_result(benchmark_class_set(generator, args.class_set, repeat=args.repeat)), flush=True)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline gespeichert: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Keine Baseline gefunden (mit --save-baseline anlegen).")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+
+    if regressions:
+        print("REGRESSIONEN gegenüber der Baseline:")
+        for message in regressions:
+            print(f"  ✗ {message}")
+        return 1
+
+    print("✓ Keine Regressionen gegenüber der Baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Prompt Size Benchmark
+
+Compares the full and the compact JSON prompt across subtopic counts:
+characters, estimated tokens, the saving of the compact variant and the
+generation time per prompt.
+
+Usage:
+    python benchmark_prompt.py [--subtopics 1,3,5,10,20] [--types 3] [--count 5]
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import argparse
+import sys
+import time
+
+from config import EXERCISE_MAPPINGS
+from create_prompt import PromptGenerator, estimate_tokens
+
+DEFAULT_SUBTOPIC_COUNTS = (1, 3, 5, 10, 20)
+TIMING_REPEAT = 200
+
+
+def _time_per_call(func, repeat=TIMING_REPEAT):
+    """Average wall time of func in microseconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def benchmark_subtopics(generator, num_subtopics, num_types=3, count=5, subject="Deutsch"):
+    """
+    Compare full and compact prompt for one subtopic count
+
+    Args:
+        generator (PromptGenerator): Prompt generator (without whole-prompt cache)
+        num_subtopics (int): Number of subtopics
+        num_types (int): Number of exercise types
+        count (int): Exercises per subtopic
+        subject (str): Subject (key of EXERCISE_MAPPINGS)
+
+    Returns:
+        dict: Sizes, token estimates and timings of both variants
+    """
+    subtopics = ", ".join(f"Unterthema {i}" for i in range(1, num_subtopics + 1))
+    exercise_types = list(EXERCISE_MAPPINGS[subject][:num_types])
+    args = (str(count), "4. Klasse", subject, "Wortarten", subtopics, exercise_types)
+
+    full = generator.create_json_prompt_template(*args)
+    compact = generator.create_json_prompt_template(*args, compact=True)
+    full_tokens, compact_tokens = estimate_tokens(full), estimate_tokens(compact)
+
+    return {
+        "subtopics": num_subtopics,
+        "full_chars": len(full),
+        "full_tokens": full_tokens,
+        "compact_chars": len(compact),
+        "compact_tokens": compact_tokens,
+        "saving": 1 - compact_tokens / full_tokens,
+        "full_us": _time_per_call(lambda: generator.create_json_prompt_template(*args)),
+        "compact_us": _time_per_call(lambda: generator.create_json_prompt_template(*args, compact=True)),
+    }
+
+
+def format_result(result):
+    """Format one result line"""
+    return (
+        f"{result['subtopics']:>3} Unterthemen | vollständig {result['full_chars']:>6} Zeichen "
+        f"≈ {result['full_tokens']:>5} Tokens ({result['full_us']:.0f} µs) | kompakt {result['compact_chars']:>5} "
+        f"Zeichen ≈ {result['compact_tokens']:>5} Tokens ({result['compact_us']:.0f} µs) | "
+        f"-{result['saving']:.0%}"
+    )
+
+
+def main(argv=None):
+    """Run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Vergleich vollständiger und kompakter Prompts")
+    parser.add_argument(
+        "--subtopics",
+        default=",".join(str(n) for n in DEFAULT_SUBTOPIC_COUNTS),
+        help="Kommagetrennte Anzahlen von Unterthemen",
+    )
+    parser.add_argument("--types", type=int, default=3, help="Anzahl der Aufgabentypen")
+    parser.add_argument("--count", type=int, default=5, help="Aufgaben pro Unterthema")
+    args = parser.parse_args(argv)
+
+    generator = PromptGenerator()
+    for num_subtopics in (int(n) for n in args.subtopics.split(",") if n.strip()):
+        print(format_result(benchmark_subtopics(generator, num_subtopics, args.types, args.count)), flush=True)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Class Set Module
+
+This module prints a worksheet for a whole class into one PDF, with the
+name of every student from a roster CSV filled into the name line. The
+worksheet body is laid out only once per variant and stored as PDF form
+XObjects (one per page); every student page just references its form
+and stamps the name on top. Render time and file size therefore grow
+with the name header, not with the whole sheet times the class size.
+
+Usage:
+    python class_set.py arbeitsblatt.json klasse_4a.csv -o klassensatz.pdf
+    python class_set.py varianten.jsonl klasse_4a.csv -o klassensatz.pdf
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import argparse
+import csv
+import sys
+import time
+
+from exercise_model import parse_worksheet
+
+# Check if reportlab is available
+try:
+    from reportlab.pdfbase import pdfdoc
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.platypus import Flowable
+
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+    Canvas = Flowable = object
+
+# Roster columns with the student name (compared case-insensitively)
+NAME_COLUMNS = ("name", "schüler", "schülerin", "schüler/in")
+FIRST_NAME_COLUMN = "vorname"
+LAST_NAME_COLUMN = "nachname"
+
+
+def read_roster(path):
+    """
+    Read student names from a roster CSV
+
+    The delimiter (comma, semicolon or tab) is detected. A "Name" column
+    or "Vorname"/"Nachname" columns are used if there is such a header,
+    otherwise the first column of every row.
+
+    Args:
+        path (str): CSV file (UTF-8, optionally with BOM)
+
+    Returns:
+        list: Student names in roster order
+
+    Raises:
+        ValueError: If the roster contains no names
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        rows = [[cell.strip() for cell in row] for row in csv.reader(f, dialect) if any(cell.strip() for cell in row)]
+
+    if not rows:
+        raise ValueError(f"Die Klassenliste {path} enthält keine Namen")
+
+    header = [cell.casefold() for cell in rows[0]]
+    name_column = next((header.index(column) for column in NAME_COLUMNS if column in header), None)
+    if name_column is not None:
+        names = [row[name_column] for row in rows[1:] if len(row) > name_column]
+    elif FIRST_NAME_COLUMN in header and LAST_NAME_COLUMN in header:
+        first, last = header.index(FIRST_NAME_COLUMN), header.index(LAST_NAME_COLUMN)
+        names = [
+            " ".join(part for part in (row[first], row[last]) if part)
+            for row in rows[1:]
+            if len(row) > max(first, last)
+        ]
+    else:
+        names = [row[0] for row in rows]
+
+    names = [name for name in names if name]
+    if not names:
+        raise ValueError(f"Die Klassenliste {path} enthält keine Namen")
+    return names
+
+
+class _PageFormCanvas(Canvas):
+    """Canvas that stores every laid-out page as a form XObject instead of writing it as a page"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.capture = True
+        self.page_forms = []
+
+    def showPage(self):
+        if not self.capture:
+            super().showPage()
+            return
+
+        # Same stream and resources as Canvas.showPage, but added as a named form (see Canvas.endForm)
+        name = f"ClassSetPage{len(self.page_forms) + 1}"
+        width, height = self._pagesize
+        form = pdfdoc.PDFFormXObject(lowerx=0, lowery=0, upperx=width, uppery=height)
+        form.compression = self._pageCompression
+        form.setStreamList([self._preamble] + self._code + [" "])
+        self._setColorSpace(form)
+        self._setExtGState(form)
+        self._setXObjects(form)
+        self._doc.addForm(name, form)
+        self.page_forms.append(name)
+        self._startPage()
+
+
+class _NameSlot(Flowable):
+    """Blank name line that remembers where it was drawn, the student name is stamped there later"""
+
+    def __init__(self, line):
+        super().__init__()
+        self.line = line
+        self.page_index = None
+        self.position = None
+
+    def wrap(self, avail_width, avail_height):
+        self.avail_width = avail_width
+        self.width, self.height = self.line.wrap(avail_width, avail_height)
+        return self.width, self.height
+
+    def getSpaceBefore(self):
+        return self.line.getSpaceBefore()
+
+    def getSpaceAfter(self):
+        return self.line.getSpaceAfter()
+
+    def draw(self):
+        self.page_index = len(self.canv.page_forms)
+        self.position = self.canv.absolutePosition(0, 0)
+
+
+class _LaidOutVariant:
+    """Pages (form names) of one laid-out worksheet body and the position of its name line"""
+
+    __slots__ = ("forms", "name_slot", "name_page")
+
+    def __init__(self, forms, name_slot, name_page):
+        self.forms = forms
+        self.name_slot = name_slot
+        self.name_page = name_page
+
+
+def generate_class_set(worksheets, students, output_path, generator=None):
+    """
+    Render one exercise sheet per student into a single print-ready PDF
+
+    Args:
+        worksheets (list): Worksheet variants (Worksheet, dict or JSON string); students get them in turn
+        students (list): Student names
+        output_path (str or file-like): Target filename or writable binary file-like object
+        generator (PDFGenerator): PDF generator (created if None)
+
+    Returns:
+        dict: Number of students, variants and pages
+
+    Raises:
+        ValueError: If there are no students or no worksheets, or a worksheet is invalid
+    """
+    if not students:
+        raise ValueError("Keine Schüler in der Klassenliste")
+    worksheets = [parse_worksheet(worksheet) for worksheet in worksheets]
+    if not worksheets:
+        raise ValueError("Kein Arbeitsblatt angegeben")
+
+    if generator is None:
+        from pdf_generator import PDFGenerator
+
+        generator = PDFGenerator()
+
+    canvas = None
+
+    def shared_canvas(*args, **kwargs):
+        nonlocal canvas
+        if canvas is None:
+            canvas = _PageFormCanvas(*args, **kwargs)
+        return canvas
+
+    # Lay out every variant once, all pages end up as forms on the same canvas
+    variants = []
+    for worksheet in worksheets:
+        name_slot = _NameSlot(generator.create_name_line())
+        doc = generator._create_document(output_path)
+        doc._doSave = 0
+        first_form = len(canvas.page_forms) if canvas else 0
+        doc.build(generator._build_exercise_story(worksheet, name_field=name_slot), canvasmaker=shared_canvas)
+        variants.append(_LaidOutVariant(canvas.page_forms[first_form:], name_slot, name_slot.page_index - first_form))
+
+    # Stamp: every student page references a form, only the name line is drawn per student
+    canvas.capture = False
+    for number, student in enumerate(students):
+        variant = variants[number % len(variants)]
+        slot = variant.name_slot
+        for page_index, form in enumerate(variant.forms):
+            canvas.doForm(form)
+            if page_index == variant.name_page:
+                line = generator.create_name_line(student)
+                line.wrap(slot.avail_width, slot.height)
+                line.drawOn(canvas, *slot.position)
+            canvas.showPage()
+    canvas.save()
+
+    return {
+        "students": len(students),
+        "variants": len(variants),
+        "pages": sum(len(variants[number % len(variants)].forms) for number in range(len(students))),
+    }
+
+
+def load_worksheets(path):
+    """Load one worksheet (.json) or several variants (.jsonl, one worksheet per line)"""
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith(".jsonl"):
+            return [line for line in f if line.strip()]
+        return [f.read()]
+
+
+def main(argv=None):
+    """Render a class set from the command line"""
+    parser = argparse.ArgumentParser(description="Klassensatz: ein Übungsblatt pro Schüler mit Namen in einer PDF")
+    parser.add_argument("worksheet", help="Arbeitsblatt (.json) oder Varianten (.jsonl, reihum verteilt)")
+    parser.add_argument("roster", help="Klassenliste (CSV mit Spalte 'Name' oder 'Vorname'/'Nachname')")
+    parser.add_argument("-o", "--output", default="klassensatz.pdf", help="Ziel-PDF")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        summary = generate_class_set(load_worksheets(args.worksheet), read_roster(args.roster), args.output)
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+
+    print(
+        f"✓ {args.output}: {summary['students']} Schüler, {summary['variants']} Variante(n), "
+        f"{summary['pages']} Seiten in {time.perf_counter() - start:.2f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
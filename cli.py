@@ -0,0 +1,497 @@
+"""
+Command-Line Interface Module
+
+Tk-free entry point for headless use (render servers, containers).
+Tkinter is never imported on these code paths.
+
+Usage:
+    python -m cli prompt --grade "4. Klasse" --subject Deutsch --topic Nomen \\
+        --subtopics "Plural, Artikel" --type "Erkennen/Unterstreichen" --count 5
+    python -m cli prompt ... --shards 3 -o teile.jsonl
+    python -m cli prompt --jsonl requests.jsonl -o prompts.jsonl
+    python -m cli matrix lehrplan.yaml -o prompts.jsonl [-w WORKERS]
+    python -m cli merge teil1.json teil2.json -o arbeitsblatt.json
+    python -m cli generate prompts.jsonl -o pdf_ausgabe/ [--url URL] [--concurrency 8]
+    python -m cli bank add json_ordner/ aufgaben.jsonl
+    python -m cli bank search --subject Deutsch --grade "4. Klasse" --text Plural
+    python -m cli bank assemble --grade "4. Klasse" --subject Deutsch --topic Nomen \
+        --subtopics "Plural, Artikel" --type "Erkennen/Unterstreichen" --count 5 --variants 30 -o klasse.jsonl
+    python -m cli render json_ordner/ -o pdf_ausgabe/
+    python -m cli classset arbeitsblatt.json klasse_4a.csv -o klassensatz.pdf
+    python -m cli variants arbeitsblatt.json --count 4 --seed 42 -o varianten/
+    python -m cli stream kompendium.json -o pdf_ausgabe/
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from config import (
+    DEFAULT_NUM_QUESTIONS,
+    LLM_MAX_CONCURRENCY,
+    QUESTION_BANK_PATH,
+    RESPONSE_CACHE_DIR,
+    STREAM_SEGMENT_PAGES,
+)
+from create_prompt import PromptGenerator, estimate_tokens
+from exercise_model import merge_worksheets
+from prompt_batch import load_curriculum_spec, prompt_from_record, validate_record, write_prompt_matrix
+
+
+def iter_jsonl_lines(stream):
+    """Yield (line_number, line) for every non-empty line of a JSONL stream"""
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            yield line_number, line
+
+
+def run_prompt_command(args, output):
+    """
+    Run the prompt subcommand
+
+    Args:
+        args (argparse.Namespace): Parsed arguments
+        output: Writable text stream
+
+    Returns:
+        int: Exit code
+    """
+    generator = PromptGenerator()
+
+    if args.jsonl is None:
+        record = {
+            "grade": args.grade,
+            "subject": args.subject,
+            "topic": args.topic,
+            "subtopics": args.subtopics,
+            "types": args.type or [],
+            "count": args.count,
+        }
+        try:
+            prompt_args = validate_record(generator, record)
+        except ValueError as e:
+            print(f"Eingabefehler: {e}", file=sys.stderr)
+            return 2
+
+        if args.shards > 1:
+            # One JSONL line per shard, each shard can be sent (and retried) on its own
+            shards = generator.create_sharded_prompts(*prompt_args, args.shards, compact=args.compact)
+            for number, (subtopics, prompt) in enumerate(shards, 1):
+                shard = {"shard": number, "subtopics": subtopics, "prompt": prompt, "tokens": estimate_tokens(prompt)}
+                output.write(json.dumps(shard, ensure_ascii=False) + "\n")
+            print(f"{len(shards)} Teil-Prompts erzeugt", file=sys.stderr)
+            return 0
+
+        prompt = generator.create_json_prompt_template(*prompt_args, compact=args.compact)
+        output.write(prompt + "\n")
+        print(f"≈ {estimate_tokens(prompt)} Tokens (geschätzt)", file=sys.stderr)
+        return 0
+
+    # JSONL mode: one result line per request line, streamed as they are generated
+    failed = 0
+    stream = sys.stdin if args.jsonl == "-" else open(args.jsonl, encoding="utf-8")
+    try:
+        for line_number, line in iter_jsonl_lines(stream):
+            # A broken line becomes an error record, the following lines are still processed
+            try:
+                prompt = prompt_from_record(generator, json.loads(line), args.compact)
+                result = {"line": line_number, "prompt": prompt, "tokens": estimate_tokens(prompt)}
+            except ValueError as e:  # includes json.JSONDecodeError
+                result = {"line": line_number, "error": str(e)}
+                failed += 1
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    return 1 if failed else 0
+
+
+def run_matrix_command(args, output):
+    """
+    Run the matrix subcommand
+
+    Args:
+        args (argparse.Namespace): Parsed arguments
+        output: Writable text stream
+
+    Returns:
+        int: Exit code
+    """
+    try:
+        spec = load_curriculum_spec(args.spec)
+    except (ImportError, ValueError) as e:
+        print(f"Lehrplan-Fehler: {e}", file=sys.stderr)
+        return 2
+
+    summary = write_prompt_matrix(spec, output, args.workers, args.compact)
+    print(
+        f"{summary['succeeded']}/{summary['total']} Prompts erzeugt, {summary['failed']} fehlgeschlagen "
+        f"(≈ {summary['tokens']} Tokens)",
+        file=sys.stderr,
+    )
+    return 1 if summary["failed"] else 0
+
+
+def run_merge_command(args, output):
+    """
+    Run the merge subcommand
+
+    Args:
+        args (argparse.Namespace): Parsed arguments
+        output: Writable text stream
+
+    Returns:
+        int: Exit code
+    """
+    documents = []
+    for path in args.files:
+        with open(path, encoding="utf-8") as f:
+            documents.append(f.read())
+
+    try:
+        worksheet = merge_worksheets(documents)
+    except ValueError as e:
+        print(f"Fehler beim Zusammenführen: {e}", file=sys.stderr)
+        return 2
+
+    json.dump(worksheet.to_dict(), output, ensure_ascii=False, indent=2)
+    output.write("\n")
+    return 0
+
+
+def iter_prompt_jobs(path, on_error=None):
+    """
+    Yield (name, prompt) jobs from a prompt JSONL file (output of prompt --jsonl, --shards or matrix)
+
+    Every record is one job; consecutive "shard" records of one sharded
+    worksheet (numbered from 1) form a single job with the list of shard
+    prompts, a new sharded worksheet starts when the numbering starts
+    again. Lines with "error" are skipped, a line that is not valid JSON
+    is passed to on_error as a failed result and the following lines are
+    still read.
+
+    Args:
+        path (str): Prompt JSONL file
+        on_error (callable): Called with the result dict of every malformed line
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    shard_job = None
+    with open(path, encoding="utf-8") as stream:
+        for line_number, line in iter_jsonl_lines(stream):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                if on_error:
+                    name = f"{stem}_{line_number:05d}"
+                    on_error({"name": name, "ok": False, "error": f"Zeile {line_number}: {e}", "seconds": 0.0})
+                continue
+            if not isinstance(record, dict) or "prompt" not in record:
+                continue
+            name = str(record.get("id") or f"{stem}_{line_number:05d}")
+            if "shard" in record and shard_job is not None and record["shard"] > shard_job[2]:
+                shard_job[1].append(record["prompt"])
+                shard_job[2] = record["shard"]
+                continue
+            if shard_job is not None:
+                yield shard_job[0], shard_job[1]
+                shard_job = None
+            if "shard" in record:
+                shard_job = [name, [record["prompt"]], record["shard"]]
+            else:
+                yield name, record["prompt"]
+    if shard_job is not None:
+        yield shard_job[0], shard_job[1]
+
+
+def run_generate_command(args):
+    """
+    Run the generate subcommand: send prompts to the LLM and render the answers
+
+    Args:
+        args (argparse.Namespace): Parsed arguments
+
+    Returns:
+        int: Exit code
+    """
+    # Imported here, so the prompt path never loads asyncio networking or reportlab
+    import asyncio
+
+    from batch_render import format_result
+    from llm_client import LLMClient, generate_pdfs_from_prompts
+    from question_bank import QuestionBank
+    from response_cache import ResponseCache
+
+    # Malformed lines fail on their own, like a prompt the LLM could not answer
+    invalid = []
+
+    def report_invalid(result):
+        invalid.append(result)
+        print(format_result(result), flush=True)
+
+    jobs = iter_prompt_jobs(args.prompts, on_error=report_invalid)
+    bank = QuestionBank(args.bank) if args.bank else None
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+    client = LLMClient(args.url, args.model, max_concurrency=args.concurrency, cache=cache)
+
+    async def generate():
+        async with client:
+            return await generate_pdfs_from_prompts(
+                client, jobs, args.output_dir, on_result=lambda r: print(format_result(r), flush=True), bank=bank
+            )
+
+    try:
+        results = asyncio.run(generate())
+    finally:
+        if bank is not None:
+            bank.close()
+    results += invalid
+    failed = sum(1 for result in results if not result["ok"])
+    print(
+        f"{len(results) - failed}/{len(results)} Arbeitsblätter erzeugt, {failed} fehlgeschlagen, "
+        f"{client.cache_hits} Antworten aus dem Cache"
+    )
+    return 1 if failed else 0
+
+
+def run_stream_command(args):
+    """
+    Run the stream subcommand: render a very large worksheet with bounded memory
+
+    Args:
+        args (argparse.Namespace): Parsed arguments
+
+    Returns:
+        int: Exit code
+    """
+    from pdf_generator import PDFGenerator
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    prefix = os.path.join(args.output_dir, os.path.splitext(os.path.basename(args.worksheet))[0])
+    start = time.perf_counter()
+    try:
+        paths = PDFGenerator().generate_pdfs_streaming(args.worksheet, prefix, args.segment_pages)
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+
+    for path in paths:
+        print(f"✓ {path}")
+    print(f"Fertig in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+def iter_worksheet_files(paths):
+    """Yield (name, json_string) for .json files, directories of .json files and .jsonl files"""
+    for path in paths:
+        if os.path.isdir(path):
+            for filename in sorted(os.listdir(path)):
+                if filename.lower().endswith(".json"):
+                    yield from iter_worksheet_files([os.path.join(path, filename)])
+        elif path.lower().endswith(".jsonl"):
+            with open(path, encoding="utf-8") as stream:
+                for line_number, line in enumerate(stream, 1):
+                    if line.strip():
+                        yield f"{path}:{line_number}", line
+        else:
+            with open(path, encoding="utf-8") as f:
+                yield path, f.read()
+
+
+def run_bank_command(args, output):
+    """
+    Run the bank subcommand (add worksheets, search exercises or assemble worksheets)
+
+    Args:
+        args (argparse.Namespace): Parsed arguments
+        output: Writable text stream
+
+    Returns:
+        int: Exit code
+    """
+    # Imported here, so the other commands never load sqlite
+    from question_bank import QuestionBank
+    from worksheet_assembler import WorksheetAssembler
+
+    with QuestionBank(args.bank) as bank:
+        if args.bank_command == "add":
+            failed = 0
+            for name, json_string in iter_worksheet_files(args.files):
+                try:
+                    added, duplicates = bank.add_worksheet(json_string)
+                    print(f"✓ {name}: {added} neu, {duplicates} bereits vorhanden", file=sys.stderr)
+                except ValueError as e:
+                    failed += 1
+                    print(f"✗ {name}: {e}", file=sys.stderr)
+            return 1 if failed else 0
+
+        if args.bank_command == "assemble":
+            assembler = WorksheetAssembler(bank)
+            try:
+                worksheets = assembler.assemble_variants(
+                    args.variants,
+                    args.count,
+                    args.grade,
+                    args.subject,
+                    args.topic,
+                    args.subtopics,
+                    args.type or [],
+                    seed=args.seed,
+                    match_topic=not args.any_topic,
+                )
+            except ValueError as e:
+                print(f"Fehler beim Zusammenstellen: {e}", file=sys.stderr)
+                return 2
+
+            if len(worksheets) == 1:
+                json.dump(worksheets[0].to_dict(), output, ensure_ascii=False, indent=2)
+                output.write("\n")
+            else:
+                for worksheet in worksheets:
+                    output.write(json.dumps(worksheet.to_dict(), ensure_ascii=False) + "\n")
+            return 0
+
+        exercises = bank.query(args.subject, args.grade, args.topic, args.subtopic, args.type, args.text, args.limit)
+        for exercise in exercises:
+            output.write(json.dumps(exercise.to_dict(), ensure_ascii=False) + "\n")
+        print(f"{len(exercises)} Aufgaben gefunden", file=sys.stderr)
+        return 0
+
+
+def build_arg_parser():
+    """Create the argument parser with all subcommands"""
+    parser = argparse.ArgumentParser(prog="python -m cli", description="KI Prompt Generator ohne GUI")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    prompt_parser = subparsers.add_parser("prompt", help="JSON-Prompts erzeugen")
+    prompt_parser.add_argument("--grade", default="", help="Klasse/Jahrgangsstufe, z.B. '4. Klasse'")
+    prompt_parser.add_argument("--subject", default="", help="Fach, z.B. 'Deutsch'")
+    prompt_parser.add_argument("--topic", default="", help="Hauptthema")
+    prompt_parser.add_argument("--subtopics", default="", help="Unterthemen, getrennt durch Kommas")
+    prompt_parser.add_argument("--type", action="append", help="Aufgabentyp (mehrfach angeben)")
+    prompt_parser.add_argument("--count", default=DEFAULT_NUM_QUESTIONS, help="Anzahl der Aufgaben")
+    prompt_parser.add_argument("--compact", action="store_true", help="Kompakter Prompt (weniger Tokens)")
+    prompt_parser.add_argument(
+        "--shards", type=int, default=1, help="Unterthemen auf N Teil-Prompts aufteilen (Ausgabe als JSONL)"
+    )
+    prompt_parser.add_argument("--jsonl", default=None, help="JSONL-Datei mit Anfragen ('-' für stdin)")
+    prompt_parser.add_argument("-o", "--output", default="-", help="Ausgabedatei ('-' für stdout)")
+
+    matrix_parser = subparsers.add_parser("matrix", help="Prompts für einen ganzen Lehrplan erzeugen")
+    matrix_parser.add_argument("spec", help="Lehrplan als JSON- oder YAML-Datei")
+    matrix_parser.add_argument(
+        "-w", "--workers", type=int, default=None, help="Anzahl der Prozesse (Standard: alle CPU-Kerne)"
+    )
+    matrix_parser.add_argument("--compact", action="store_true", help="Kompakter Prompt (weniger Tokens)")
+    matrix_parser.add_argument("-o", "--output", default="-", help="Ausgabedatei ('-' für stdout)")
+
+    merge_parser = subparsers.add_parser("merge", help="Teil-Arbeitsblätter (JSON) zusammenführen")
+    merge_parser.add_argument("files", nargs="+", help="JSON-Dateien in Reihenfolge der Teil-Prompts")
+    merge_parser.add_argument("-o", "--output", default="-", help="Ausgabedatei ('-' für stdout)")
+
+    generate_parser = subparsers.add_parser("generate", help="Prompts an die KI senden und PDFs erzeugen")
+    generate_parser.add_argument("prompts", help="JSONL-Datei mit Prompts (Ausgabe von prompt/matrix)")
+    generate_parser.add_argument("-o", "--output-dir", default="pdf_output", help="Zielverzeichnis für die PDFs")
+    generate_parser.add_argument("--url", default=None, help="Chat-Completions-URL (Standard: LLM_API_URL)")
+    generate_parser.add_argument("--model", default=None, help="Modellname (Standard: LLM_MODEL)")
+    generate_parser.add_argument(
+        "--concurrency", type=int, default=LLM_MAX_CONCURRENCY, help="Maximal gleichzeitige Anfragen"
+    )
+    generate_parser.add_argument("--bank", default=None, help="Gültige Antworten in dieser Fragenbank speichern")
+    generate_parser.add_argument(
+        "--cache-dir", default=RESPONSE_CACHE_DIR, help="Verzeichnis des Antwort-Caches (gleiche Prompts)"
+    )
+    generate_parser.add_argument("--no-cache", action="store_true", help="Jeden Prompt an die KI senden")
+
+    bank_parser = subparsers.add_parser("bank", help="Fragenbank füllen und durchsuchen")
+    bank_parser.add_argument("--bank", default=QUESTION_BANK_PATH, help="Datenbankdatei der Fragenbank")
+    bank_subparsers = bank_parser.add_subparsers(dest="bank_command", required=True)
+    bank_add_parser = bank_subparsers.add_parser("add", help="Validierte Arbeitsblätter speichern")
+    bank_add_parser.add_argument("files", nargs="+", help="JSON-Dateien, Verzeichnisse oder JSONL-Dateien")
+    bank_search_parser = bank_subparsers.add_parser("search", help="Aufgaben suchen (Ausgabe als JSONL)")
+    for name in ("subject", "grade", "topic", "subtopic", "type", "text"):
+        bank_search_parser.add_argument(f"--{name}", default=None)
+    bank_search_parser.add_argument("--limit", type=int, default=None, help="Maximale Anzahl")
+    bank_search_parser.add_argument("-o", "--output", default="-", help="Ausgabedatei ('-' für stdout)")
+    bank_assemble_parser = bank_subparsers.add_parser(
+        "assemble", help="Arbeitsblätter aus der Fragenbank zusammenstellen (ohne KI)"
+    )
+    bank_assemble_parser.add_argument("--grade", required=True, help="Klasse/Jahrgangsstufe")
+    bank_assemble_parser.add_argument("--subject", required=True, help="Fach")
+    bank_assemble_parser.add_argument("--topic", required=True, help="Hauptthema")
+    bank_assemble_parser.add_argument("--subtopics", default="", help="Unterthemen, getrennt durch Kommas")
+    bank_assemble_parser.add_argument("--type", action="append", help="Aufgabentyp (mehrfach angeben)")
+    bank_assemble_parser.add_argument("--count", default=DEFAULT_NUM_QUESTIONS, help="Aufgaben pro Unterthema")
+    bank_assemble_parser.add_argument("--variants", type=int, default=1, help="Anzahl verschiedener Blätter (JSONL)")
+    bank_assemble_parser.add_argument("--seed", type=int, default=0, help="Startwert für die Zufallsauswahl")
+    bank_assemble_parser.add_argument(
+        "--any-topic", action="store_true", help="Aufgaben aller Hauptthemen verwenden (nur Unterthema zählt)"
+    )
+    bank_assemble_parser.add_argument("-o", "--output", default="-", help="Ausgabedatei ('-' für stdout)")
+    bank_parser.set_defaults(output="-")
+
+    render_parser = subparsers.add_parser("render", help="JSON-Dokumente zu PDFs rendern (Batch-Modus)")
+    render_parser.add_argument("render_args", nargs=argparse.REMAINDER, help="Argumente für batch_render")
+
+    classset_parser = subparsers.add_parser("classset", help="Klassensatz mit Schülernamen in einer PDF")
+    classset_parser.add_argument("classset_args", nargs=argparse.REMAINDER, help="Argumente für class_set")
+
+    variants_parser = subparsers.add_parser("variants", help="Gemischte Varianten eines Arbeitsblatts erzeugen")
+    variants_parser.add_argument("variants_args", nargs=argparse.REMAINDER, help="Argumente für worksheet_variants")
+
+    stream_parser = subparsers.add_parser("stream", help="Sehr große Arbeitsblätter speicherschonend rendern")
+    stream_parser.add_argument("worksheet", help="Arbeitsblatt (.json) oder Aufgaben-Datensätze (.jsonl)")
+    stream_parser.add_argument("-o", "--output-dir", default="pdf_output", help="Zielverzeichnis für die PDFs")
+    stream_parser.add_argument(
+        "--segment-pages",
+        type=int,
+        default=STREAM_SEGMENT_PAGES,
+        help="Seiten pro Segment, das fertig geschrieben und freigegeben wird",
+    )
+
+    return parser
+
+
+def main(argv=None):
+    """Run the command-line interface"""
+    args = build_arg_parser().parse_args(argv)
+
+    if args.command == "render":
+        # Imported here, so the prompt path never loads reportlab
+        import batch_render
+
+        return batch_render.main(args.render_args)
+    if args.command == "classset":
+        import class_set
+
+        return class_set.main(args.classset_args)
+    if args.command == "variants":
+        import worksheet_variants
+
+        return worksheet_variants.main(args.variants_args)
+    if args.command == "generate":
+        return run_generate_command(args)
+    if args.command == "stream":
+        return run_stream_command(args)
+
+    run_command = {
+        "prompt": run_prompt_command,
+        "matrix": run_matrix_command,
+        "merge": run_merge_command,
+        "bank": run_bank_command,
+    }[args.command]
+    if args.output == "-":
+        return run_command(args, sys.stdout)
+    with open(args.output, "w", encoding="utf-8") as output:
+        return run_command(args, output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+Compliance Module
+
+This module checks a worksheet returned by the AI against the
+distribution plan of its prompt (exercises per subtopic and type,
+3-5 sub_questions per exercise, at most 30 % multiple choice). Missing
+or non-compliant slots are requested again with a small repair prompt
+and the answer is spliced back into the worksheet, instead of
+regenerating the whole document.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+from config import MAX_MULTIPLE_CHOICE_SHARE, MAX_SUB_QUESTIONS, MIN_SUB_QUESTIONS, MULTIPLE_CHOICE_TYPE
+from create_prompt import PromptGenerator, create_distribution_plan
+from exercise_model import Exercise, Metadata, Worksheet, parse_worksheet
+
+
+def plan_for_request(num_questions, main_topic, subtopics, exercise_types):
+    """
+    Compute the distribution plan a prompt asked for
+
+    Args:
+        num_questions (str): Number of questions per subtopic (per type without subtopics)
+        main_topic (str): Main topic
+        subtopics (str): Subtopics separated by commas
+        exercise_types (list): List of exercise types
+
+    Returns:
+        list: [(subtopic, [(exercise_type, count), ...]), ...]; subtopic is None without subtopics
+    """
+    _, subtopic_list = PromptGenerator()._format_topic_structure_with_list(main_topic, subtopics)
+    if not subtopic_list:
+        # Without subtopics the prompt asks for num_questions exercises of every type
+        return [(None, [(ex_type, int(num_questions)) for ex_type in exercise_types])]
+    return create_distribution_plan(subtopic_list, int(num_questions), exercise_types)
+
+
+def normalize_name(name):
+    """Key for comparing subtopic and type names (case and whitespace insensitive)"""
+    return " ".join(str(name).split()).casefold()
+
+
+def is_multiple_choice(exercise):
+    """True for multiple choice exercises (by type name or options)"""
+    return exercise.multiple_choice is not None or normalize_name(exercise.type) == normalize_name(MULTIPLE_CHOICE_TYPE)
+
+
+def exercise_problem(exercise):
+    """
+    Check the format rules of a single exercise
+
+    Returns:
+        str: Description of the problem, or None if the exercise is compliant
+    """
+    if exercise.multiple_choice is not None:
+        if exercise.answer not in exercise.multiple_choice.options:
+            return "Antwort ist keine der Optionen"
+        return None
+
+    count = len(exercise.sub_questions)
+    if not MIN_SUB_QUESTIONS <= count <= MAX_SUB_QUESTIONS:
+        return f"{count} statt {MIN_SUB_QUESTIONS}-{MAX_SUB_QUESTIONS} Unteraufgaben"
+    return None
+
+
+class ComplianceReport:
+    """Result of a compliance check"""
+
+    __slots__ = ("missing", "rejected", "issues", "multiple_choice_share")
+
+    def __init__(self, missing, rejected, issues, multiple_choice_share):
+        """
+        Args:
+            missing (list): [(subtopic, exercise_type, count), ...] slots that need new exercises
+            rejected (list): Positions (indexes into worksheet.exercises) of exercises to drop
+            issues (list): Human-readable problem descriptions
+            multiple_choice_share (float): Share of multiple choice among the accepted exercises
+        """
+        self.missing = missing
+        self.rejected = rejected
+        self.issues = issues
+        self.multiple_choice_share = multiple_choice_share
+
+    @property
+    def is_compliant(self):
+        """True if the worksheet matches the plan exactly"""
+        return not self.missing and not self.rejected and not self.issues
+
+
+def check_worksheet(worksheet, plan):
+    """
+    Compare a worksheet with the distribution plan of its prompt
+
+    Exercises with an unplanned subtopic or type, a wrong number of
+    sub_questions or beyond the planned count of their slot are rejected;
+    slots with too few accepted exercises are reported as missing.
+
+    Args:
+        worksheet (Worksheet, dict or str): Worksheet returned by the AI
+        plan (list): Plan from plan_for_request / create_distribution_plan
+
+    Returns:
+        ComplianceReport: Missing slots, rejected exercises and issues
+    """
+    worksheet = parse_worksheet(worksheet)
+    by_subtopic = plan[0][0] is not None
+
+    # Normalized (subtopic, type) -> [canonical subtopic, canonical type, planned count, accepted count]
+    slots = {}
+    for subtopic, type_counts in plan:
+        for ex_type, count in type_counts:
+            key = (normalize_name(subtopic) if by_subtopic else None, normalize_name(ex_type))
+            slots[key] = [subtopic, ex_type, count, 0]
+
+    rejected, issues = [], []
+    multiple_choice = 0
+    for position, exercise in enumerate(worksheet.exercises):
+        key = (normalize_name(exercise.subtopic) if by_subtopic else None, normalize_name(exercise.type))
+        slot = slots.get(key)
+        if slot is None:
+            problem = f"nicht geplant ({exercise.subtopic} / {exercise.type})"
+        elif slot[3] >= slot[2]:
+            problem = f"überzählig für {exercise.subtopic} / {exercise.type}"
+        else:
+            problem = exercise_problem(exercise)
+
+        if problem:
+            rejected.append(position)
+            issues.append(f"Aufgabe {exercise.id}: {problem}")
+            continue
+
+        slot[3] += 1
+        multiple_choice += is_multiple_choice(exercise)
+
+    missing = [(subtopic, ex_type, planned - accepted) for subtopic, ex_type, planned, accepted in slots.values()]
+    missing = [slot for slot in missing if slot[2] > 0]
+
+    accepted_total = len(worksheet.exercises) - len(rejected)
+    share = multiple_choice / accepted_total if accepted_total else 0.0
+    planned_total = sum(slot[2] for slot in slots.values())
+    planned_share = sum(
+        slot[2] for slot in slots.values() if normalize_name(slot[1]) == normalize_name(MULTIPLE_CHOICE_TYPE)
+    ) / max(planned_total, 1)
+    if share > max(MAX_MULTIPLE_CHOICE_SHARE, planned_share):
+        issues.append(f"Multiple Choice {share:.0%} (höchstens {MAX_MULTIPLE_CHOICE_SHARE:.0%})")
+
+    return ComplianceReport(missing, rejected, issues, share)
+
+
+def splice_repair(worksheet, report, repair_answer=None):
+    """
+    Replace rejected exercises with the repaired ones and renumber the worksheet
+
+    Only as many repaired exercises per slot as were missing are taken;
+    they are inserted after the last kept exercise of their subtopic.
+
+    Args:
+        worksheet (Worksheet, dict or str): Original worksheet
+        report (ComplianceReport): Report of check_worksheet for this worksheet
+        repair_answer (Worksheet, dict or str): AI answer to the repair prompt (None: only drop rejected)
+
+    Returns:
+        Worksheet: Worksheet with renumbered exercise ids
+    """
+    worksheet = parse_worksheet(worksheet)
+    repair_exercises = parse_worksheet(repair_answer).exercises if repair_answer is not None else ()
+
+    # Canonical slot names, the repair answer may differ in case or whitespace
+    open_slots = {}
+    for subtopic, ex_type, count in report.missing:
+        open_slots[(normalize_name(subtopic) if subtopic else None, normalize_name(ex_type))] = [
+            subtopic,
+            ex_type,
+            count,
+        ]
+
+    rejected = set(report.rejected)
+    exercises = [exercise for position, exercise in enumerate(worksheet.exercises) if position not in rejected]
+
+    for exercise in repair_exercises:
+        slot = open_slots.get((normalize_name(exercise.subtopic), normalize_name(exercise.type))) or open_slots.get(
+            (None, normalize_name(exercise.type))
+        )
+        if slot is None or slot[2] == 0 or exercise_problem(exercise):
+            continue
+        slot[2] -= 1
+
+        subtopic = slot[0] or exercise.subtopic
+        insert_at = len(exercises)
+        for position in range(len(exercises) - 1, -1, -1):
+            if normalize_name(exercises[position].subtopic) == normalize_name(subtopic):
+                insert_at = position + 1
+                break
+        exercises.insert(insert_at, with_id(exercise, 0, subtopic=subtopic, ex_type=slot[1]))
+
+    metadata = worksheet.metadata
+    return Worksheet(
+        Metadata(metadata.topic, metadata.grade, metadata.subject, metadata.subtopics),
+        [with_id(exercise, number) for number, exercise in enumerate(exercises, 1)],
+    )
+
+
+def with_id(exercise, new_id, subtopic=None, ex_type=None):
+    """Copy of an exercise with a new id (and optionally canonical subtopic and type)"""
+    return Exercise(
+        id=new_id,
+        type=ex_type or exercise.type,
+        question=exercise.question,
+        subtopic=subtopic or exercise.subtopic,
+        sub_questions=exercise.sub_questions,
+        answer=exercise.answer,
+        explanation=exercise.explanation,
+        multiple_choice=exercise.multiple_choice,
+    )
+
+
+async def repair_worksheet(client, worksheet, plan, grade, subject, main_topic, max_rounds=2):
+    """
+    Check a worksheet and request only the missing exercises until it complies
+
+    Args:
+        client (llm_client.LLMClient): LLM client
+        worksheet (Worksheet, dict or str): Worksheet returned by the AI
+        plan (list): Plan from plan_for_request
+        grade (str): Grade/class level
+        subject (str): Subject area
+        main_topic (str): Main topic
+        max_rounds (int): Maximum number of repair requests
+
+    Returns:
+        tuple: (worksheet, report) - the (repaired) worksheet and its final compliance report
+    """
+    from llm_client import extract_json
+
+    generator = PromptGenerator()
+    worksheet = parse_worksheet(worksheet)
+    report = check_worksheet(worksheet, plan)
+
+    for _ in range(max_rounds):
+        if not report.missing:
+            break
+        prompt = generator.create_repair_prompt(grade, subject, main_topic, report.missing)
+        answer = extract_json(await client.complete(prompt))
+        worksheet = splice_repair(worksheet, report, answer)
+        report = check_worksheet(worksheet, plan)
+
+    if report.rejected and not report.missing:
+        # Only surplus or broken extras left, dropping them needs no new exercises
+        worksheet = splice_repair(worksheet, report)
+        report = check_worksheet(worksheet, plan)
+
+    return worksheet, report
@@ -136,6 +136,29 @@ DEFAULT_NUM_QUESTIONS = "5"
 MIN_QUESTIONS = 1
 MAX_QUESTIONS = 50
 
+# PDF render cache (content-addressed, LRU eviction)
+PDF_CACHE_DIR = "~/.cache/school_exercises/pdf"
+PDF_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# AI response cache (prompt -> worksheet JSON, TTL and LRU eviction)
+RESPONSE_CACHE_DIR = "~/.cache/school_exercises/responses"
+RESPONSE_CACHE_MAX_ENTRIES = 1000
+RESPONSE_CACHE_TTL_SECONDS = 30 * 24 * 3600
+
+# Question bank with all validated exercises (SQLite with full-text search)
+QUESTION_BANK_PATH = "~/.local/share/school_exercises/question_bank.sqlite3"
+
+# Streaming render of very large worksheets: pages per document segment, written and freed when full
+STREAM_SEGMENT_PAGES = 50
+
+# LLM endpoint (OpenAI-compatible chat completions API), overridable via LLM_API_URL / LLM_MODEL
+LLM_API_URL = "https://api.openai.com/v1/chat/completions"
+LLM_MODEL = "gpt-4o-mini"
+LLM_API_KEY_ENV_VARS = ("LLM_API_KEY", "OPENAI_API_KEY")
+LLM_MAX_CONCURRENCY = 4
+LLM_MAX_RETRIES = 3
+LLM_TIMEOUT_SECONDS = 300
+
 # JSON Prompt Template for generating structured exercise data
 JSON_PROMPT_TEMPLATE = """Ziel:
 Erstelle strukturierte Übungsaufgaben zum Thema {topic_text} für {grade} {subject} im JSON-Format.
@@ -241,3 +264,53 @@ WICHTIG - Qualitätskontrolle:
 • Alle Strings müssen in Anführungszeichen
 • Jede Hauptaufgabe sollte 3-5 Unteraufgaben haben
 • Gleichmäßige Verteilung pro Unterthema ist wichtiger als strikte Aufgabentyp-Reihenfolge"""
+
+# Compact JSON prompt: every rule stated once, the distribution as a dense plan table
+COMPACT_PROMPT_TEMPLATE = """Erstelle Übungsaufgaben zum Thema {topic_text} für {grade} {subject}. Ablauf automatisch, keine Rückfragen; eine interne Recherche zu typischen Aufgaben ist erlaubt, zeige keine Quellen.
+
+Aufgabentypen (im Feld "type" den vollen Namen verwenden):
+{type_legend}
+
+Plan ({total_exercises} Aufgaben; Anzahl je Unterthema und Typ):
+{plan_table}
+
+Regeln:
+• Jede Aufgabe: Hauptfrage + 3-5 sub_questions mit question, answer, explanation
+• Multiple Choice höchstens 30% der Aufgaben, mit options statt sub_questions; answer ist eine der options
+• Alle Beispiele passen zum Unterthema, typische Fehlerquellen einbauen, Typen abwechseln
+• Klare, {grade_level} und kurze Formulierung; {language_instruction}
+
+Gib NUR valides JSON aus:
+{{"metadata": {{"topic": "...", "grade": "{grade}", "subject": "{subject}", "subtopics": ["..."]}},
+ "exercises": [
+  {{"id": 1, "type": "...", "subtopic": "...", "question": "...", "sub_questions": [{{"question": "...", "answer": "...", "explanation": "..."}}], "explanation": "..."}},
+  {{"id": 2, "type": "{multiple_choice_type}", "subtopic": "...", "question": "...", "options": ["...", "...", "..."], "answer": "...", "explanation": "..."}}
+ ]}}"""
+
+# Repair prompt: asks only for the exercises a returned worksheet is missing
+REPAIR_PROMPT_TEMPLATE = """Ein Arbeitsblatt zum Thema {topic_text} für {grade} {subject} ist unvollständig. Erstelle NUR die folgenden fehlenden Aufgaben, keine weiteren. Ablauf automatisch, keine Rückfragen.
+
+Aufgabentypen (im Feld "type" den vollen Namen verwenden):
+{type_legend}
+
+Fehlende Aufgaben ({total_exercises}; im Feld "subtopic" das Unterthema exakt übernehmen):
+{slot_table}
+
+Regeln:
+• Jede Aufgabe: Hauptfrage + 3-5 sub_questions mit question, answer, explanation
+• Multiple Choice mit options statt sub_questions; answer ist eine der options
+• Alle Beispiele passen zum Unterthema, typische Fehlerquellen einbauen
+• Klare, {grade_level} und kurze Formulierung; {language_instruction}
+
+Gib NUR valides JSON aus:
+{{"metadata": {{"topic": "...", "grade": "{grade}", "subject": "{subject}"}},
+ "exercises": [
+  {{"id": 1, "type": "...", "subtopic": "...", "question": "...", "sub_questions": [{{"question": "...", "answer": "...", "explanation": "..."}}], "explanation": "..."}},
+  {{"id": 2, "type": "{multiple_choice_type}", "subtopic": "...", "question": "...", "options": ["...", "...", "..."], "answer": "...", "explanation": "..."}}
+ ]}}"""
+
+# Rules checked on returned worksheets (as stated in the prompts)
+MULTIPLE_CHOICE_TYPE = "Ankreuzen (Multiple Choice)"
+MIN_SUB_QUESTIONS = 3
+MAX_SUB_QUESTIONS = 5
+MAX_MULTIPLE_CHOICE_SHARE = 0.3
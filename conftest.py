@@ -0,0 +1,39 @@
+"""
+Gemeinsame Fixtures für die Tests
+
+Stellt den lokalen LLM-Stub-Server und das Projektverzeichnis bereit,
+damit sich die Testmodule nicht gegenseitig importieren müssen
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from llm_stub_server import StubLLMServer
+
+
+def _run_with_stub(coroutine_factory, **stub_options):
+    """Starte den Stub-Server, führe die Coroutine mit dessen URL aus und gib (Ergebnis, Server) zurück"""
+
+    async def main():
+        server = await StubLLMServer(**stub_options).start(port=0)
+        try:
+            url = f"http://127.0.0.1:{server.port}/v1/chat/completions"
+            return await coroutine_factory(url), server
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def run_with_stub():
+    """Funktion run_with_stub(coroutine_factory, **stub_options) für Tests gegen den Stub-Server"""
+    return _run_with_stub
+
+
+@pytest.fixture
+def project_dir():
+    """Verzeichnis des Projekts (Arbeitsverzeichnis für Unterprozesse)"""
+    return os.path.dirname(os.path.abspath(__file__))
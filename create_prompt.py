@@ -8,17 +8,193 @@ Author: Toni Kleinfeld
 Date: October 2025
 """
 
-from config import JSON_PROMPT_TEMPLATE, EXERCISE_TYPE_DESCRIPTIONS
+import math
+import re
+import string
+from functools import lru_cache
+
+from config import (
+    COMPACT_PROMPT_TEMPLATE,
+    EXERCISE_TYPE_DESCRIPTIONS,
+    JSON_PROMPT_TEMPLATE,
+    MULTIPLE_CHOICE_TYPE,
+    REPAIR_PROMPT_TEMPLATE,
+)
+
+# Bound for the memoized per-subject, per-type-set and per-grade sections
+SECTION_CACHE_SIZE = 256
+
+
+def compile_template(template):
+    """
+    Split a str.format template into static text and placeholder segments
+
+    Args:
+        template (str): Template with {name} placeholders ({{ and }} for literal braces)
+
+    Returns:
+        tuple: ((literal_text, field_name_or_None), ...) in template order
+    """
+    segments = []
+    for literal_text, field_name, format_spec, conversion in string.Formatter().parse(template):
+        if format_spec or conversion:
+            raise ValueError(f"Platzhalter mit Format-Angabe werden nicht unterstützt: {field_name}")
+        segments.append((literal_text, field_name))
+    return tuple(segments)
+
+
+def render_template(segments, values):
+    """Fill precompiled template segments (same result as template.format(**values))"""
+    parts = []
+    for literal_text, field_name in segments:
+        parts.append(literal_text)
+        if field_name is not None:
+            parts.append(str(values[field_name]))
+    return "".join(parts)
+
+
+# JSON prompt templates, compiled once at import time
+JSON_PROMPT_SEGMENTS = compile_template(JSON_PROMPT_TEMPLATE)
+COMPACT_PROMPT_SEGMENTS = compile_template(COMPACT_PROMPT_TEMPLATE)
+REPAIR_PROMPT_SEGMENTS = compile_template(REPAIR_PROMPT_TEMPLATE)
+
+# Words and single non-space symbols, the units of the token estimate
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Average characters per token of a word for German text in common LLM tokenizers
+CHARS_PER_WORD_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """
+    Estimate the LLM token count of a text without a tokenizer
+
+    Every symbol counts as one token, every word as one token per
+    CHARS_PER_WORD_TOKEN characters (rounded up). Good enough to compare
+    prompt variants, not an exact billing count.
+
+    Args:
+        text (str): Prompt text
+
+    Returns:
+        int: Estimated number of tokens
+    """
+    return sum(math.ceil(len(piece) / CHARS_PER_WORD_TOKEN) for piece in _TOKEN_PATTERN.findall(text))
+
+
+def create_distribution_plan(subtopic_list, exercises_per_subtopic, exercise_types):
+    """
+    Distribute the exercises of every subtopic evenly over the exercise types
+
+    The first types get one more exercise if the count does not divide evenly.
+
+    Args:
+        subtopic_list (list): Subtopics
+        exercises_per_subtopic (int): Number of exercises per subtopic
+        exercise_types (list): Exercise types
+
+    Returns:
+        list: [(subtopic, [(exercise_type, count), ...]), ...]
+    """
+    exercises_per_type, remainder = divmod(exercises_per_subtopic, len(exercise_types))
+    type_counts = [
+        (ex_type, exercises_per_type + (1 if j < remainder else 0)) for j, ex_type in enumerate(exercise_types)
+    ]
+    return [(subtopic, list(type_counts)) for subtopic in subtopic_list]
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _exercise_type_details(exercise_types):
+    """Exercise type list with descriptions for a tuple of types"""
+    details = []
+    for ex_type in exercise_types:
+        if ex_type in EXERCISE_TYPE_DESCRIPTIONS:
+            details.append(f"• {ex_type}: {EXERCISE_TYPE_DESCRIPTIONS[ex_type]}")
+        else:
+            details.append(f"• {ex_type}")
+
+    return "\n".join(details)
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _compact_type_legend(exercise_types):
+    """Numbered exercise type legend (T1, T2, ...) for the compact prompt"""
+    legend = []
+    for i, ex_type in enumerate(exercise_types, 1):
+        description = EXERCISE_TYPE_DESCRIPTIONS.get(ex_type)
+        legend.append(f"T{i} {ex_type}: {description}" if description else f"T{i} {ex_type}")
+
+    return "\n".join(legend)
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _grade_level(grade):
+    """Language level for a grade"""
+    grade_lower = grade.lower()
+    if any(x in grade_lower for x in ["1.", "2.", "3.", "4."]):
+        return "kindgerechte"
+    elif any(x in grade_lower for x in ["5.", "6.", "7.", "8."]):
+        return "altersgerechte"
+    elif any(x in grade_lower for x in ["9.", "10.", "11.", "12.", "13.", "oberstufe"]):
+        return "angemessene"
+    else:
+        return "verständliche"
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _language_instruction(subject, grade_level):
+    """Subject-specific language instruction"""
+    subject_lower = subject.lower()
+
+    if "deutsch" in subject_lower:
+        if grade_level == "kindgerechte":
+            return f"Sprache: Deutsch ({grade_level} Niveau für Grundschule)"
+        else:
+            return f"Sprache: Deutsch ({grade_level} Niveau)"
+    elif any(lang in subject_lower for lang in ["englisch", "französisch", "spanisch", "latein"]):
+        return f"Sprache: {subject} ({grade_level} Sprachniveau)"
+    else:
+        return f"Sprache: Deutsch ({grade_level} Fachsprache für {subject})"
+
+
+def split_subtopics(subtopic_list, num_shards):
+    """
+    Split subtopics into at most num_shards contiguous, evenly sized groups
+
+    Args:
+        subtopic_list (list): Subtopics in prompt order
+        num_shards (int): Requested number of groups
+
+    Returns:
+        list: Non-empty subtopic lists, the first groups get one more subtopic if needed
+    """
+    num_shards = max(1, min(num_shards, len(subtopic_list)))
+    per_shard, remainder = divmod(len(subtopic_list), num_shards)
+
+    groups, start = [], 0
+    for i in range(num_shards):
+        end = start + per_shard + (1 if i < remainder else 0)
+        groups.append(subtopic_list[start:end])
+        start = end
+    return groups
 
 
 class PromptGenerator:
     """Class responsible for generating AI prompts based on input parameters"""
 
-    def __init__(self):
-        """Initialize the prompt generator"""
-        pass
+    def __init__(self, prompt_cache_size=0):
+        """
+        Initialize the prompt generator
 
-    def create_json_prompt_template(self, num_questions, grade, subject, main_topic, subtopics, exercise_types):
+        Args:
+            prompt_cache_size (int): Number of complete prompts to keep in an LRU cache
+                keyed on the normalized inputs (0 = no whole-prompt cache)
+        """
+        self._cached_prompt = lru_cache(maxsize=prompt_cache_size)(self._build_prompt) if prompt_cache_size else None
+
+    def create_json_prompt_template(
+        self, num_questions, grade, subject, main_topic, subtopics, exercise_types, compact=False
+    ):
         """
         Create the JSON-formatted prompt template for AI models that output JSON
 
@@ -29,10 +205,67 @@ class PromptGenerator:
             main_topic (str): Main topic
             subtopics (str): Subtopics separated by commas
             exercise_types (list): List of exercise types
+            compact (bool): Compact variant - every rule once, distribution as plan table (fewer tokens)
 
         Returns:
             str: Formatted JSON prompt for AI
         """
+        if self._cached_prompt is None:
+            return self._build_prompt(num_questions, grade, subject, main_topic, subtopics, exercise_types, compact)
+
+        # Normalize the inputs for the cache key; stripping cannot change the prompt
+        # because the topic fields are only ever used stripped
+        if isinstance(exercise_types, list):
+            exercise_types = tuple(exercise_types)
+        return self._cached_prompt(
+            str(num_questions), grade, subject, main_topic.strip(), subtopics.strip(), exercise_types, compact
+        )
+
+    def create_sharded_prompts(
+        self, num_questions, grade, subject, main_topic, subtopics, exercise_types, num_shards, compact=False
+    ):
+        """
+        Split the subtopics into several smaller prompts with the same grade, subject and type context
+
+        Every shard asks for the exercises of its own subtopics only, so the
+        answers stay short, can be requested concurrently and a failed shard
+        can be retried alone. Join the answers with exercise_model.merge_worksheets.
+
+        Args:
+            num_questions (str): Number of questions per subtopic
+            grade (str): Grade/class level
+            subject (str): Subject area
+            main_topic (str): Main topic
+            subtopics (str): Subtopics separated by commas
+            exercise_types (list): List of exercise types
+            num_shards (int): Maximum number of prompts (at most one per subtopic)
+            compact (bool): Create the compact prompt variant
+
+        Returns:
+            list: [(subtopic_list, prompt), ...] in subtopic order
+        """
+        _, subtopic_list = self._format_topic_structure_with_list(main_topic, subtopics)
+        if not subtopic_list:
+            prompt = self.create_json_prompt_template(
+                num_questions, grade, subject, main_topic, subtopics, exercise_types, compact=compact
+            )
+            return [([], prompt)]
+
+        shards = []
+        for group in split_subtopics(subtopic_list, num_shards):
+            prompt = self.create_json_prompt_template(
+                num_questions, grade, subject, main_topic, ", ".join(group), exercise_types, compact=compact
+            )
+            shards.append((group, prompt))
+        return shards
+
+    def _build_prompt(self, num_questions, grade, subject, main_topic, subtopics, exercise_types, compact=False):
+        """Build the prompt (exercise_types as list or tuple, see create_json_prompt_template)"""
+        if isinstance(exercise_types, tuple):
+            exercise_types = list(exercise_types)
+        if compact:
+            return self._build_compact_prompt(num_questions, grade, subject, main_topic, subtopics, exercise_types)
+
         # Create structured topic text and subtopic analysis
         topic_text, subtopic_list = self._format_topic_structure_with_list(main_topic, subtopics)
 
@@ -65,34 +298,96 @@ class PromptGenerator:
         # Prepare subtopic instructions
         subtopic_instructions = self._create_subtopic_instructions(subtopic_list, questions_per_type, exercise_types)
 
-        # Use JSON template from config with all dynamic values
-        prompt = JSON_PROMPT_TEMPLATE.format(
-            topic_text=topic_text,
-            grade=grade,
-            subject=subject,
-            exercise_type_details=exercise_type_details,
-            distribution_info=distribution_info,
-            language_instruction=language_instruction,
-            subtopic_instructions=subtopic_instructions,
-            grade_level=grade_level,
-            num_questions=num_questions,
-        )
+        # Fill the precompiled JSON template from config with all dynamic values
+        values = {
+            "topic_text": topic_text,
+            "grade": grade,
+            "subject": subject,
+            "exercise_type_details": exercise_type_details,
+            "distribution_info": distribution_info,
+            "language_instruction": language_instruction,
+            "subtopic_instructions": subtopic_instructions,
+            "grade_level": grade_level,
+            "num_questions": num_questions,
+        }
+        prompt = render_template(JSON_PROMPT_SEGMENTS, values)
 
         return prompt
 
+    def _build_compact_prompt(self, num_questions, grade, subject, main_topic, subtopics, exercise_types):
+        """Build the compact prompt variant with the distribution as plan table"""
+        if not isinstance(exercise_types, list):
+            exercise_types = [exercise_types]
+
+        topic_text, subtopic_list = self._format_topic_structure_with_list(main_topic, subtopics)
+        questions_per_type = int(num_questions)
+
+        if subtopic_list:
+            plan = create_distribution_plan(subtopic_list, questions_per_type, exercise_types)
+        else:
+            # Without subtopics num_questions applies to every exercise type (as in the full prompt)
+            plan = [("Gesamt", [(ex_type, questions_per_type) for ex_type in exercise_types])]
+
+        grade_level = self._get_grade_level(grade)
+        values = {
+            "topic_text": topic_text,
+            "grade": grade,
+            "subject": subject,
+            "type_legend": _compact_type_legend(tuple(exercise_types)),
+            "total_exercises": sum(count for _, type_counts in plan for _, count in type_counts),
+            "plan_table": self._format_plan_table(plan),
+            "multiple_choice_type": MULTIPLE_CHOICE_TYPE,
+            "grade_level": grade_level,
+            "language_instruction": self._get_language_instruction(subject, grade_level),
+        }
+        return render_template(COMPACT_PROMPT_SEGMENTS, values)
+
+    def create_repair_prompt(self, grade, subject, main_topic, missing_slots):
+        """
+        Create a prompt that asks only for the missing exercises of a worksheet
+
+        Args:
+            grade (str): Grade/class level
+            subject (str): Subject area
+            main_topic (str): Main topic
+            missing_slots (list): [(subtopic, exercise_type, count), ...] as found by the compliance check
+
+        Returns:
+            str: Repair prompt
+        """
+        exercise_types = tuple(dict.fromkeys(ex_type for _, ex_type, _ in missing_slots))
+        rows = ["Unterthema | Aufgabentyp | Anzahl"]
+        for subtopic, ex_type, count in missing_slots:
+            rows.append(f"{subtopic or 'beliebig'} | {ex_type} | {count}")
+
+        grade_level = self._get_grade_level(grade)
+        values = {
+            "topic_text": f'„{main_topic.strip()}"' if main_topic.strip() else "Unbekanntes Thema",
+            "grade": grade,
+            "subject": subject,
+            "type_legend": _compact_type_legend(exercise_types),
+            "total_exercises": sum(count for _, _, count in missing_slots),
+            "slot_table": "\n".join(rows),
+            "multiple_choice_type": MULTIPLE_CHOICE_TYPE,
+            "grade_level": grade_level,
+            "language_instruction": self._get_language_instruction(subject, grade_level),
+        }
+        return render_template(REPAIR_PROMPT_SEGMENTS, values)
+
+    def _format_plan_table(self, plan):
+        """Format a distribution plan as dense table (one row per subtopic, one column per type)"""
+        type_codes = [f"T{i}" for i in range(1, len(plan[0][1]) + 1)]
+        rows = [" | ".join(["Unterthema"] + type_codes)]
+        for subtopic, type_counts in plan:
+            rows.append(" | ".join([subtopic] + [str(count) for _, count in type_counts]))
+        return "\n".join(rows)
+
     def _format_exercise_type_details(self, exercise_types):
         """Format exercise types with their detailed descriptions"""
         if not isinstance(exercise_types, list):
             return exercise_types
 
-        details = []
-        for ex_type in exercise_types:
-            if ex_type in EXERCISE_TYPE_DESCRIPTIONS:
-                details.append(f"• {ex_type}: {EXERCISE_TYPE_DESCRIPTIONS[ex_type]}")
-            else:
-                details.append(f"• {ex_type}")
-
-        return "\n".join(details)
+        return _exercise_type_details(tuple(exercise_types))
 
     def _format_topic_structure_with_list(self, main_topic, subtopics):
         """Format the topic structure and return both formatted text and subtopic list"""
@@ -158,19 +453,15 @@ class PromptGenerator:
         instructions.append("DETAILLIERTE VERTEILUNG PRO UNTERTHEMA:")
 
         # Erstelle detaillierte Anweisungen für jedes Unterthema
-        for i, subtopic in enumerate(subtopic_list, 1):
+        plan = create_distribution_plan(subtopic_list, exercises_per_subtopic, exercise_types)
+        for i, (subtopic, type_counts) in enumerate(plan, 1):
             instructions.append(f"\nUnterthema {i}: {subtopic}")
             instructions.append(f"   → Erstelle genau {exercises_per_subtopic} Aufgaben für dieses Unterthema")
             instructions.append(
                 f"   → Verteile die {exercises_per_subtopic} Aufgaben gleichmäßig auf die Aufgabentypen:"
             )
 
-            # Berechne Verteilung der Aufgabentypen für dieses Unterthema
-            exercises_per_type = exercises_per_subtopic // len(exercise_types)
-            remainder = exercises_per_subtopic % len(exercise_types)
-
-            for j, ex_type in enumerate(exercise_types):
-                count = exercises_per_type + (1 if j < remainder else 0)
+            for ex_type, count in type_counts:
                 if count > 0:
                     instructions.append(f"     • {count}x {ex_type}")
 
@@ -193,29 +484,11 @@ class PromptGenerator:
 
     def _get_grade_level(self, grade):
         """Determine appropriate language level based on grade"""
-        grade_lower = grade.lower()
-        if any(x in grade_lower for x in ["1.", "2.", "3.", "4."]):
-            return "kindgerechte"
-        elif any(x in grade_lower for x in ["5.", "6.", "7.", "8."]):
-            return "altersgerechte"
-        elif any(x in grade_lower for x in ["9.", "10.", "11.", "12.", "13.", "oberstufe"]):
-            return "angemessene"
-        else:
-            return "verständliche"
+        return _grade_level(grade)
 
     def _get_language_instruction(self, subject, grade_level):
         """Get subject-specific language instructions"""
-        subject_lower = subject.lower()
-
-        if "deutsch" in subject_lower:
-            if grade_level == "kindgerechte":
-                return f"Sprache: Deutsch ({grade_level} Niveau für Grundschule)"
-            else:
-                return f"Sprache: Deutsch ({grade_level} Niveau)"
-        elif any(lang in subject_lower for lang in ["englisch", "französisch", "spanisch", "latein"]):
-            return f"Sprache: {subject} ({grade_level} Sprachniveau)"
-        else:
-            return f"Sprache: Deutsch ({grade_level} Fachsprache für {subject})"
+        return _language_instruction(subject, grade_level)
 
     def validate_inputs(self, grade, subject, main_topic, subtopics, exercise_type, num_questions):
         """
@@ -0,0 +1,263 @@
+"""
+Exercise Model Module
+
+This module contains the typed document model for exercise worksheets.
+The raw JSON (as returned by the AI) is parsed and validated once into
+compact slotted objects that are shared by the PDF generator, the UI and
+any other consumer.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import json
+
+from worksheet_schema import WorksheetValidationError, validate_worksheet
+
+DEFAULT_SUBTOPIC = "Allgemein"
+
+
+class Metadata:
+    """Worksheet metadata (topic, grade, subject and subtopics)"""
+
+    __slots__ = ("topic", "grade", "subject", "subtopics")
+
+    def __init__(self, topic, grade, subject, subtopics=()):
+        self.topic = topic
+        self.grade = grade
+        self.subject = subject
+        self.subtopics = tuple(subtopics)
+
+    def to_dict(self):
+        """Convert back to the JSON structure"""
+        data = {"topic": self.topic, "grade": self.grade, "subject": self.subject}
+        if self.subtopics:
+            data["subtopics"] = list(self.subtopics)
+        return data
+
+
+class SubQuestion:
+    """Single sub-question of an exercise"""
+
+    __slots__ = ("question", "answer", "explanation")
+
+    def __init__(self, question, answer, explanation=None):
+        self.question = question
+        self.answer = answer
+        self.explanation = explanation
+
+    def to_dict(self):
+        """Convert back to the JSON structure"""
+        data = {"question": self.question, "answer": self.answer}
+        if self.explanation:
+            data["explanation"] = self.explanation
+        return data
+
+
+class MultipleChoice:
+    """Answer options of a multiple choice exercise"""
+
+    __slots__ = ("options",)
+
+    def __init__(self, options):
+        self.options = tuple(options)
+
+
+class Exercise:
+    """Exercise in either the sub-question format or the legacy single-question format"""
+
+    __slots__ = ("id", "type", "subtopic", "question", "sub_questions", "answer", "explanation", "multiple_choice")
+
+    def __init__(
+        self,
+        id,
+        type,
+        question,
+        subtopic=DEFAULT_SUBTOPIC,
+        sub_questions=(),
+        answer=None,
+        explanation=None,
+        multiple_choice=None,
+    ):
+        self.id = id
+        self.type = type
+        self.subtopic = subtopic
+        self.question = question
+        self.sub_questions = tuple(sub_questions)
+        self.answer = answer
+        self.explanation = explanation
+        self.multiple_choice = multiple_choice
+
+    @property
+    def has_sub_questions(self):
+        """True if the exercise uses the sub-question format"""
+        return bool(self.sub_questions)
+
+    def to_dict(self):
+        """Convert back to the JSON structure"""
+        data = {"id": self.id, "type": self.type, "subtopic": self.subtopic, "question": self.question}
+        if self.sub_questions:
+            data["sub_questions"] = [sub_q.to_dict() for sub_q in self.sub_questions]
+        if self.multiple_choice:
+            data["options"] = list(self.multiple_choice.options)
+        if self.answer is not None:
+            data["answer"] = self.answer
+        if self.explanation:
+            data["explanation"] = self.explanation
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build an exercise from an already validated JSON dictionary"""
+        return _build_exercise(data)
+
+
+class Worksheet:
+    """Complete exercise document"""
+
+    __slots__ = ("metadata", "exercises")
+
+    def __init__(self, metadata, exercises):
+        self.metadata = metadata
+        self.exercises = list(exercises)
+
+    def exercises_by_subtopic(self):
+        """
+        Group exercises by subtopic, keeping the order of first appearance
+
+        Returns:
+            dict: Subtopic name -> list of exercises
+        """
+        groups = {}
+        for exercise in self.exercises:
+            groups.setdefault(exercise.subtopic, []).append(exercise)
+        return groups
+
+    def to_dict(self):
+        """Convert back to the (normalized) JSON structure"""
+        return {"metadata": self.metadata.to_dict(), "exercises": [exercise.to_dict() for exercise in self.exercises]}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Validate a JSON dictionary against the worksheet schema and build the worksheet
+
+        Args:
+            data (dict): Parsed JSON document
+
+        Returns:
+            Worksheet: The typed worksheet
+
+        Raises:
+            WorksheetValidationError: If the structure is invalid (lists all errors)
+        """
+        errors = validate_worksheet(data)
+        if errors:
+            raise WorksheetValidationError(errors)
+
+        metadata = data["metadata"]
+        return cls(
+            Metadata(metadata["topic"], metadata["grade"], metadata["subject"], metadata.get("subtopics") or ()),
+            [_build_exercise(exercise) for exercise in data["exercises"]],
+        )
+
+
+def merge_worksheets(worksheets):
+    """
+    Merge worksheets (e.g. the answers to sharded prompts) into one document
+
+    Metadata (topic, grade, subject) is taken from the first worksheet,
+    subtopics are merged in order of first appearance and the exercises
+    are renumbered 1..n in document order.
+
+    Args:
+        worksheets (list): Worksheets, parsed JSON dictionaries or JSON strings
+
+    Returns:
+        Worksheet: The merged worksheet
+
+    Raises:
+        ValueError: If no worksheet is given or one of them is invalid
+    """
+    worksheets = [parse_worksheet(worksheet) for worksheet in worksheets]
+    if not worksheets:
+        raise ValueError("Keine Arbeitsblätter zum Zusammenführen")
+
+    subtopics = {}
+    for worksheet in worksheets:
+        for subtopic in worksheet.metadata.subtopics or [exercise.subtopic for exercise in worksheet.exercises]:
+            subtopics.setdefault(subtopic, None)
+
+    exercises = []
+    for worksheet in worksheets:
+        for exercise in worksheet.exercises:
+            exercises.append(
+                Exercise(
+                    id=len(exercises) + 1,
+                    type=exercise.type,
+                    question=exercise.question,
+                    subtopic=exercise.subtopic,
+                    sub_questions=exercise.sub_questions,
+                    answer=exercise.answer,
+                    explanation=exercise.explanation,
+                    multiple_choice=exercise.multiple_choice,
+                )
+            )
+
+    first = worksheets[0].metadata
+    return Worksheet(Metadata(first.topic, first.grade, first.subject, subtopics), exercises)
+
+
+def _build_exercise(exercise):
+    """Build a single (already validated) exercise"""
+    sub_questions = [
+        SubQuestion(sub_q["question"], sub_q["answer"], sub_q.get("explanation"))
+        for sub_q in exercise.get("sub_questions", ())
+    ]
+    options = exercise.get("options")
+
+    return Exercise(
+        id=exercise["id"],
+        type=exercise["type"],
+        question=exercise["question"],
+        subtopic=exercise.get("subtopic", DEFAULT_SUBTOPIC),
+        sub_questions=sub_questions,
+        answer=exercise.get("answer"),
+        explanation=exercise.get("explanation"),
+        multiple_choice=MultipleChoice(options) if options else None,
+    )
+
+
+def parse_worksheet(json_data):
+    """
+    Parse exercise data into a Worksheet
+
+    Args:
+        json_data (Worksheet, dict or str): Worksheet, parsed JSON dictionary or JSON string
+
+    Returns:
+        Worksheet: The typed worksheet (returned unchanged if already parsed)
+
+    Raises:
+        ValueError: If the JSON is malformed or the structure is invalid
+    """
+    if isinstance(json_data, Worksheet):
+        return json_data
+
+    if isinstance(json_data, str):
+        json_data = load_json(json_data)
+
+    return Worksheet.from_dict(json_data)
+
+
+def load_json(json_string):
+    """
+    Parse a JSON string
+
+    Raises:
+        ValueError: If the JSON is malformed
+    """
+    try:
+        return json.loads(json_string)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON format: {str(e)}")
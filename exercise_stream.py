@@ -0,0 +1,181 @@
+"""
+Exercise Stream Module
+
+This module reads very large exercise documents one exercise at a time
+instead of loading the whole JSON. A worksheet file (.json) is scanned
+with a small incremental reader that decodes the metadata and then every
+entry of the "exercises" array on its own; a record file (.jsonl) holds
+the metadata in its first line ({"metadata": {...}}) and one exercise per
+following line. Every exercise is validated against the exercise schema
+when it is read, so memory stays bounded by a single exercise.
+
+Has no dependency on reportlab, like exercise_model.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import json
+
+from exercise_model import Exercise, Metadata
+from worksheet_schema import SchemaError, WorksheetValidationError, validate_part
+
+# Characters read from the file per refill of the reader buffer
+READ_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\r\n"
+
+
+class _JsonReader:
+    """Decodes consecutive JSON values from a text stream through a bounded buffer"""
+
+    __slots__ = ("stream", "buffer", "pos", "eof", "decoder")
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Drop the consumed part of the buffer and read the next chunk"""
+        chunk = self.stream.read(READ_CHUNK_SIZE)
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        self.eof = not chunk
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it (None at the end)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                return None
+            self._fill()
+
+    def expect(self, char):
+        """Consume the next non-whitespace character, which must be char"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Invalid JSON format: '{char}' erwartet, '{found or 'Dateiende'}' gefunden")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next JSON value, reading more of the file until it is complete"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ValueError(f"Invalid JSON format: {str(e)}")
+            else:
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            self._fill()
+
+
+def _read_worksheet_records(path):
+    """Yield ("metadata", value) and ("exercise", value) records from a worksheet JSON file"""
+    with open(path, encoding="utf-8") as f:
+        reader = _JsonReader(f)
+        reader.expect("{")
+        while reader.peek() != "}":
+            key = reader.value()
+            reader.expect(":")
+            if key != "exercises":
+                value = reader.value()
+                if key == "metadata":
+                    yield "metadata", value
+            else:
+                reader.expect("[")
+                while reader.peek() != "]":
+                    yield "exercise", reader.value()
+                    if reader.peek() == ",":
+                        reader.expect(",")
+                reader.expect("]")
+            if reader.peek() == ",":
+                reader.expect(",")
+        reader.expect("}")
+
+
+def _read_jsonl_records(path):
+    """Yield records from a JSONL file: metadata in the first line, then one exercise per line"""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON format in Zeile {line_number}: {str(e)}")
+            if isinstance(record, dict) and "metadata" in record:
+                yield "metadata", record["metadata"]
+                # A complete worksheet line contributes its exercises as well
+                for exercise in record.get("exercises", ()):
+                    yield "exercise", exercise
+            else:
+                yield "exercise", record
+
+
+def open_exercise_stream(path):
+    """
+    Open a worksheet for reading one exercise at a time
+
+    Exercises listed before the metadata (unusual key order) are kept in
+    memory until the metadata is found; documents written by this
+    application always start with the metadata.
+
+    Args:
+        path (str): Worksheet (.json) or exercise records (.jsonl)
+
+    Returns:
+        tuple: (Metadata, iterator of Exercise in document order)
+
+    Raises:
+        ValueError: If the file is malformed or has no metadata
+        WorksheetValidationError: If the metadata or an exercise is invalid (raised while iterating for exercises)
+    """
+    reader = _read_jsonl_records if path.lower().endswith(".jsonl") else _read_worksheet_records
+    records = reader(path)
+
+    early = []
+    for kind, value in records:
+        if kind == "metadata":
+            metadata = value
+            break
+        early.append(value)
+    else:
+        raise WorksheetValidationError([SchemaError("$", "missing required field 'metadata'")])
+
+    errors = validate_part("metadata", metadata, "$.metadata")
+    if errors:
+        raise WorksheetValidationError(errors)
+
+    def exercises():
+        number = 0
+        for value in _chain_exercises(early, records):
+            errors = validate_part("exercise", value, f"$.exercises[{number}]")
+            if errors:
+                raise WorksheetValidationError(errors)
+            number += 1
+            yield Exercise.from_dict(value)
+
+    return (
+        Metadata(metadata["topic"], metadata["grade"], metadata["subject"], metadata.get("subtopics") or ()),
+        exercises(),
+    )
+
+
+def _chain_exercises(early, records):
+    """Exercises read before the metadata, then the remaining exercise records"""
+    yield from early
+    early.clear()
+    for kind, value in records:
+        if kind == "exercise":
+            yield value
@@ -0,0 +1,107 @@
+"""
+Flowable Factory Module
+
+This module creates the paragraphs and spacers of the exercise and
+solution sheets. Spacers never change during layout, so one instance per
+height is shared by the whole story. Paragraph instances cannot be shared
+(layout stores its line breaks on them), but parsing their markup is the
+expensive part: the parsed fragments are kept in a bounded LRU cache per
+(text, style) and reused for repeated text such as subtopic headers,
+multiple choice options, short answers and the questions that appear on
+both sheets. Styles are looked up in the stylesheet once.
+
+Layout sets and deletes canv and _frame on every flowable it draws, so
+spacers are only shared between the stories of one thread; the cache is
+shared by all threads and guarded by a lock.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import threading
+from collections import OrderedDict
+
+# Check if reportlab is available
+try:
+    from reportlab.platypus import Paragraph, Spacer
+
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+    Spacer = object
+
+# Parsed paragraphs kept for reuse (enough for both sheets of a typical worksheet)
+PARAGRAPH_CACHE_SIZE = 4096
+
+
+class _SharedSpacer(Spacer):
+    """
+    Spacer that may appear any number of times in a story
+
+    doc.build marks a flowable that did not fit at the bottom of a frame
+    with _postponed and raises a LayoutError if the same object does not fit
+    again. For a shared spacer that mark would carry over to its next use,
+    so it is ignored; a spacer always fits on a fresh page.
+    """
+
+    def __setattr__(self, name, value):
+        if name != "_postponed":
+            super().__setattr__(name, value)
+
+
+class FlowableFactory:
+    """Creates sheet flowables with shared spacers, cached paragraph parses and pre-resolved styles"""
+
+    __slots__ = ("styles", "cache_size", "_local", "_parsed", "_lock")
+
+    def __init__(self, styles, cache_size=PARAGRAPH_CACHE_SIZE):
+        """
+        Initialize the factory
+
+        Args:
+            styles (StyleSheet1): Stylesheet with all styles used by the sheets
+            cache_size (int): Maximum number of cached paragraph parses
+        """
+        self.styles = {name: styles[name] for name in styles.byName}
+        self.cache_size = cache_size
+        self._local = threading.local()
+        self._parsed = OrderedDict()
+        self._lock = threading.Lock()
+
+    def spacer(self, height):
+        """Return the spacer of the given height shared by all stories of the current thread"""
+        spacers = getattr(self._local, "spacers", None)
+        if spacers is None:
+            spacers = self._local.spacers = {}
+        spacer = spacers.get(height)
+        if spacer is None:
+            spacer = spacers[height] = _SharedSpacer(1, height)
+        return spacer
+
+    def paragraph(self, text, style_name):
+        """
+        Create a paragraph, reusing the parsed fragments of an earlier paragraph with the same text and style
+
+        Args:
+            text (str): Paragraph markup
+            style_name (str): Name of the paragraph style
+
+        Returns:
+            Paragraph: New paragraph instance
+        """
+        key = (text, style_name)
+        with self._lock:
+            parsed = self._parsed.get(key)
+            if parsed is not None:
+                self._parsed.move_to_end(key)
+        if parsed is not None:
+            cleaned, style, frags, bullet_text = parsed
+            return Paragraph(cleaned, style, bullet_text, frags=frags)
+
+        # Parse outside the lock, other threads keep using the cache meanwhile
+        paragraph = Paragraph(text, self.styles[style_name])
+        with self._lock:
+            self._parsed[key] = (paragraph.text, paragraph.style, paragraph.frags, paragraph.bulletText)
+            if len(self._parsed) > self.cache_size:
+                self._parsed.popitem(last=False)
+        return paragraph
@@ -10,34 +10,91 @@ Date: October 2025
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
+import importlib.util
 import json
-
-# Check if PDF generation is available
-try:
-    from pdf_generator import PDFGenerator, REPORTLAB_AVAILABLE
-except ImportError:
-    REPORTLAB_AVAILABLE = False
-    PDFGenerator = None
+import queue
+import threading
+import time
+from exercise_model import parse_worksheet
+from render_cache import RenderCache
+from worksheet_schema import WorksheetValidationError
+
+# Check if PDF generation is available (without importing reportlab, it is loaded on first use)
+REPORTLAB_AVAILABLE = importlib.util.find_spec("reportlab") is not None
+
+# Maximum number of validation errors listed in the error dialog
+MAX_SHOWN_ERRORS = 15
+
+# Background rendering: queue poll interval and minimum interval between progress updates
+RENDER_POLL_MS = 100
+PROGRESS_UPDATE_SECONDS = 0.05
+
+# Share of the progress bar per phase (parse, validate, story build and layout of both sheets)
+PROGRESS_WEIGHTS = (
+    ("parse", None, 5),
+    ("validate", None, 5),
+    ("story", "exercise", 10),
+    ("layout", "exercise", 35),
+    ("story", "solution", 10),
+    ("layout", "solution", 35),
+)
+
+PHASE_LABELS = {
+    "parse": "Parsen",
+    "validate": "Validieren",
+    "story": "Aufbau",
+    "layout": "Layout",
+    "page": "Seiten",
+}
+
+SHEET_LABELS = {"exercise": "Übungsblatt", "solution": "Lösungsblatt"}
 
 
 class JSONImportUI:
     """UI class for JSON import and PDF generation"""
 
-    def __init__(self, parent_frame):
+    def __init__(self, parent_frame, on_valid_json=None):
         """
         Initialize the JSON import UI
 
         Args:
             parent_frame: Parent tkinter frame
+            on_valid_json (callable): Optional callback with every JSON string that validated or rendered
+                successfully (e.g. to store it in the response cache)
         """
         self.parent = parent_frame
+        self.on_valid_json = on_valid_json
+        # Created on first use, so reportlab is only imported when PDFs are generated
         self.pdf_generator = None
-        if REPORTLAB_AVAILABLE and PDFGenerator:
+        self.render_cache = None
+
+        # Background rendering state
+        self.render_thread = None
+        self.render_json = None
+        self.render_queue = None
+        self.cancel_event = None
+        self.create_widgets()
+
+    def get_pdf_generator(self):
+        """
+        Get the PDF generator, importing reportlab and building the styles on first use
+
+        Returns:
+            PDFGenerator or None: The generator, or None if reportlab is not installed
+        """
+        if self.pdf_generator is None and REPORTLAB_AVAILABLE:
             try:
+                from pdf_generator import PDFGenerator
+
                 self.pdf_generator = PDFGenerator()
             except ImportError:
-                self.pdf_generator = None
-        self.create_widgets()
+                return None
+            try:
+                self.render_cache = RenderCache()
+            except OSError:
+                # Rendering still works without a writable cache directory
+                self.render_cache = None
+        return self.pdf_generator
 
     def create_widgets(self):
         """Create all UI widgets"""
@@ -46,7 +103,7 @@ class JSONImportUI:
         title_label.pack(pady=10)
 
         # Warning if reportlab is not available
-        if not REPORTLAB_AVAILABLE or not self.pdf_generator:
+        if not REPORTLAB_AVAILABLE:
             warning_label = ttk.Label(
                 self.parent,
                 text="⚠️ WARNUNG: reportlab ist nicht installiert. PDF-Generierung nicht verfügbar.\n"
@@ -121,51 +178,72 @@ class JSONImportUI:
         )
         self.sample_button.pack(side=tk.LEFT, padx=5)
 
+        # Cancel Button (only active while rendering)
+        self.cancel_button = tk.Button(
+            button_frame,
+            text="Cancel",
+            command=self.cancel_generation,
+            font=("Arial", 11, "bold"),
+            relief="raised",
+            bd=2,
+            state=tk.DISABLED,
+        )
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+
+        # Progress Bar
+        self.progress_bar = ttk.Progressbar(self.parent, mode="determinate", maximum=100)
+        self.progress_bar.pack(fill=tk.X, padx=10, pady=(0, 5))
+
         # Status Label
         self.status_label = ttk.Label(self.parent, text="", font=("Arial", 10), foreground="gray")
         self.status_label.pack(pady=5)
 
     def validate_json(self):
-        """Validate the JSON input"""
+        """
+        Validate the JSON input
+
+        Returns:
+            Worksheet or None: The parsed worksheet if valid, otherwise None
+        """
         json_string = self.json_text.get(1.0, tk.END).strip()
 
         if not json_string:
             messagebox.showwarning("Warnung", "Bitte fügen Sie JSON-Daten ein.")
-            return False
+            return None
 
         try:
-            data = json.loads(json_string)
-
-            # Basic validation even without reportlab
-            if not isinstance(data, dict):
-                raise ValueError("JSON muss ein Objekt sein")
-            if "metadata" not in data or "exercises" not in data:
-                raise ValueError("JSON muss 'metadata' und 'exercises' enthalten")
-            if not isinstance(data["exercises"], list):
-                raise ValueError("'exercises' muss eine Liste sein")
+            # Parse once and validate while building the worksheet model (works without reportlab)
+            worksheet = parse_worksheet(json.loads(json_string))
 
-            # Advanced validation if reportlab is available
-            if self.pdf_generator:
-                self.pdf_generator._validate_json_structure(data)
+            if self.on_valid_json:
+                self.on_valid_json(json_string)
 
             # Show success feedback
             self.show_validation_success()
-            messagebox.showinfo(
-                "Erfolg", f"✓ JSON ist valide!\n\n" f"Gefunden: {len(data.get('exercises', []))} Aufgaben"
-            )
-            return True
+            messagebox.showinfo("Erfolg", f"✓ JSON ist valide!\n\n" f"Gefunden: {len(worksheet.exercises)} Aufgaben")
+            return worksheet
 
         except json.JSONDecodeError as e:
             messagebox.showerror("JSON-Fehler", f"Ungültiges JSON-Format:\n\n{str(e)}")
-            return False
+            return None
+        except WorksheetValidationError as e:
+            messagebox.showerror("Validierungsfehler", self._format_validation_errors(e))
+            return None
         except ValueError as e:
             messagebox.showerror("Validierungsfehler", f"JSON-Struktur ist ungültig:\n\n{str(e)}")
-            return False
+            return None
+
+    def _format_validation_errors(self, error):
+        """Format all schema errors (with JSON path), shortened for very long lists"""
+        lines = [str(schema_error) for schema_error in error.errors[:MAX_SHOWN_ERRORS]]
+        if len(error.errors) > MAX_SHOWN_ERRORS:
+            lines.append(f"... und {len(error.errors) - MAX_SHOWN_ERRORS} weitere Fehler")
+        return f"JSON-Struktur ist ungültig ({len(error.errors)} Fehler):\n\n" + "\n".join(lines)
 
     def generate_pdfs(self):
-        """Generate PDF files from JSON input"""
+        """Generate PDF files from JSON input in a background thread"""
         # Check if PDF generator is available
-        if not self.pdf_generator:
+        if not self.get_pdf_generator():
             messagebox.showerror(
                 "Fehler",
                 "PDF-Generierung nicht verfügbar!\n\n"
@@ -175,37 +253,152 @@ class JSONImportUI:
             )
             return
 
+        if self.render_thread and self.render_thread.is_alive():
+            return
+
         json_string = self.json_text.get(1.0, tk.END).strip()
 
         if not json_string:
             messagebox.showwarning("Warnung", "Bitte fügen Sie JSON-Daten ein.")
             return
 
-        # Validate first
-        if not self.validate_json():
+        # Ask for output directory
+        output_dir = filedialog.askdirectory(title="Wähle Speicherort für PDFs")
+
+        if not output_dir:
             return
 
+        # Parsing, validation and rendering run in the worker, the main thread only polls the queue
+        self.render_json = json_string
+        self.render_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.render_thread = threading.Thread(target=self._render_worker, args=(json_string, output_dir), daemon=True)
+
+        self.generate_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress_bar["value"] = 0
+        self.status_label.config(text="Generiere PDFs...", foreground="blue")
+
+        self.render_thread.start()
+        self.parent.after(RENDER_POLL_MS, self._poll_render_queue)
+
+    def cancel_generation(self):
+        """Request cancellation of the running PDF generation"""
+        if self.cancel_event:
+            self.cancel_event.set()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.status_label.config(text="Breche ab...", foreground="orange")
+
+    def _render_worker(self, json_string, output_dir):
+        """Parse, validate and render in the background, reporting through the render queue"""
+        from pdf_generator import RenderCancelled
+
+        post = self.render_queue.put
+        timings = {}
+        state = {"key": None, "started": time.perf_counter(), "last_post": 0.0, "last_phase": None}
+
+        def report(phase, sheet=None, done=0, total=None):
+            if self.cancel_event.is_set() and phase != "done":
+                raise RenderCancelled()
+
+            # Phase timing: time spent until the next (phase, sheet) starts
+            key = (phase if phase != "page" else "layout", sheet)
+            now = time.perf_counter()
+            if key != state["key"]:
+                if state["key"]:
+                    timings[state["key"]] = timings.get(state["key"], 0.0) + now - state["started"]
+                state["key"], state["started"] = key, now
+
+            if phase == "done":
+                return
+
+            # Throttle queue traffic, the main thread only needs a few updates per second
+            if (phase, sheet) != state["last_phase"] or now - state["last_post"] >= PROGRESS_UPDATE_SECONDS:
+                state["last_post"], state["last_phase"] = now, (phase, sheet)
+                post(("progress", phase, sheet, done, total))
+
         try:
+            report("parse")
             data = json.loads(json_string)
 
-            # Ask for output directory
-            output_dir = filedialog.askdirectory(title="Wähle Speicherort für PDFs")
-
-            if not output_dir:
-                return
+            report("validate")
+            worksheet = parse_worksheet(data)
 
             # Generate filename prefix from metadata
-            topic = data["metadata"].get("topic", "exercise")
+            topic = str(worksheet.metadata.topic or "exercise")
             safe_topic = "".join(c for c in topic if c.isalnum() or c in (" ", "_")).strip()
             safe_topic = safe_topic.replace(" ", "_")
-
             output_prefix = f"{output_dir}/{safe_topic}"
 
-            # Generate PDFs
-            self.status_label.config(text="Generiere PDFs...", foreground="blue")
-            self.parent.update()
+            exercise_pdf, solution_pdf = self.pdf_generator.generate_pdfs_from_json(
+                worksheet, output_prefix, cache=self.render_cache, progress=report
+            )
+            report("done")
+            post(("done", exercise_pdf, solution_pdf, timings))
+
+        except RenderCancelled:
+            post(("cancelled",))
+        except json.JSONDecodeError as e:
+            post(("error", "JSON-Fehler", f"Ungültiges JSON-Format:\n\n{str(e)}"))
+        except WorksheetValidationError as e:
+            post(("error", "Validierungsfehler", self._format_validation_errors(e)))
+        except Exception as e:
+            post(("error", "Fehler", f"Fehler beim Generieren der PDFs:\n\n{str(e)}"))
 
-            exercise_pdf, solution_pdf = self.pdf_generator.generate_pdfs_from_json(data, output_prefix)
+    def _poll_render_queue(self):
+        """Apply queued progress messages on the Tk main thread"""
+        try:
+            while True:
+                message = self.render_queue.get_nowait()
+                if message[0] == "progress":
+                    self._show_progress(*message[1:])
+                else:
+                    self._finish_generation(message)
+                    return
+        except queue.Empty:
+            pass
+
+        self.parent.after(RENDER_POLL_MS, self._poll_render_queue)
+
+    def _show_progress(self, phase, sheet, done, total):
+        """Update progress bar and status label for a progress message"""
+        percent = 0.0
+        for weight_phase, weight_sheet, weight in PROGRESS_WEIGHTS:
+            if (weight_phase, weight_sheet) == (phase, sheet):
+                percent += weight * (done / total if total else 0.0)
+                break
+            percent += weight
+        if phase != "page":
+            self.progress_bar["value"] = percent
+
+        label = PHASE_LABELS.get(phase, phase)
+        if sheet:
+            label = f"{SHEET_LABELS[sheet]}: {label}"
+        if phase == "page":
+            label += f" ({done} geschrieben)"
+        elif total:
+            label += f" ({done}/{total})"
+        self.status_label.config(text=f"Generiere PDFs... {label}", foreground="blue")
+
+    def _finish_generation(self, message):
+        """Handle the final worker message (done, cancelled or error)"""
+        self.generate_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+
+        if message[0] == "done":
+            _, exercise_pdf, solution_pdf, timings = message
+            self.progress_bar["value"] = 100
+            if self.on_valid_json:
+                self.on_valid_json(self.render_json)
+
+            # Timing breakdown per phase
+            parts = []
+            for (phase, sheet), seconds in timings.items():
+                label = PHASE_LABELS.get(phase, phase)
+                if sheet:
+                    label = f"{SHEET_LABELS[sheet]} {label}"
+                parts.append(f"{label} {seconds:.2f}s")
+            total_seconds = sum(timings.values())
 
             # Show success message
             self.show_generate_success()
@@ -213,13 +406,26 @@ class JSONImportUI:
                 "Erfolg",
                 f"✓ PDFs erfolgreich erstellt!\n\n" f"Übungsblatt: {exercise_pdf}\n" f"Lösungsblatt: {solution_pdf}",
             )
+            self.status_label.config(
+                text=f"✓ PDFs erstellt in {total_seconds:.2f}s ({', '.join(parts)})", foreground="green"
+            )
 
-            self.status_label.config(text=f"✓ PDFs erstellt: {exercise_pdf}", foreground="green")
+        elif message[0] == "cancelled":
+            self.progress_bar["value"] = 0
+            self.status_label.config(text="Generierung abgebrochen", foreground="orange")
 
-        except Exception as e:
-            messagebox.showerror("Fehler", f"Fehler beim Generieren der PDFs:\n\n{str(e)}")
+        else:
+            _, title, text = message
+            self.progress_bar["value"] = 0
+            messagebox.showerror(title, text)
             self.status_label.config(text="✗ Fehler beim Generieren", foreground="red")
 
+    def set_json(self, json_string):
+        """Replace the JSON input field content (e.g. with a cached AI response)"""
+        self.json_text.delete(1.0, tk.END)
+        self.json_text.insert(1.0, json_string)
+        self.status_label.config(text="Antwort aus dem Cache geladen", foreground="green")
+
     def clear_input(self):
         """Clear the JSON input field"""
         self.json_text.delete(1.0, tk.END)
@@ -0,0 +1,444 @@
+"""
+LLM Client Module
+
+This module sends prompts to an OpenAI-compatible chat completions
+endpoint with asyncio and feeds the answers straight into the PDF
+pipeline. It speaks plain HTTP/1.1 (no extra dependency) over pooled
+keep-alive connections, limits concurrent requests with a semaphore,
+retries transient failures with exponential backoff and accumulates
+streamed (server-sent events) answers.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import asyncio
+import json
+import os
+import ssl
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from config import (
+    LLM_API_KEY_ENV_VARS,
+    LLM_API_URL,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_MODEL,
+    LLM_TIMEOUT_SECONDS,
+)
+from exercise_model import merge_worksheets, parse_worksheet
+
+# HTTP status codes that are worth a retry (rate limit and temporary server errors)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# PDF generator of the current render worker (one per process or thread, never shared between builds)
+_worker_state = threading.local()
+
+
+class LLMError(Exception):
+    """Raised when a prompt could not be answered (after all retries)"""
+
+
+class _RetryableError(Exception):
+    """Transient HTTP error, retried with backoff"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to a single host"""
+
+    def __init__(self, host, port, use_ssl=False, max_idle=LLM_MAX_CONCURRENCY):
+        """
+        Initialize the pool
+
+        Args:
+            host (str): Host name
+            port (int): Port
+            use_ssl (bool): Use TLS (https)
+            max_idle (int): Maximum number of idle connections kept open
+        """
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl.create_default_context() if use_ssl else None
+        self.max_idle = max_idle
+        self.opened = 0
+        self._idle = []
+
+    async def acquire(self):
+        """Return an idle connection or open a new one (reader, writer)"""
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl_context)
+        self.opened += 1
+        return reader, writer
+
+    def release(self, connection, reusable):
+        """Return a connection to the pool, or close it if it cannot be reused"""
+        reader, writer = connection
+        if reusable and not writer.is_closing() and len(self._idle) < self.max_idle:
+            self._idle.append(connection)
+        else:
+            writer.close()
+
+    def close(self):
+        """Close all idle connections"""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+async def _read_headers(reader):
+    """Read status line and headers of an HTTP/1.1 response"""
+    status_line = await reader.readline()
+    if not status_line:
+        # Server closed an idle keep-alive connection
+        raise ConnectionResetError("Verbindung vom Server geschlossen")
+
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return status, headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _iter_body(reader, headers):
+    """Yield the response body in pieces (chunked, Content-Length or until EOF)"""
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                # Skip optional trailers up to the final empty line
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            yield await reader.readexactly(size)
+            await reader.readexactly(2)
+    elif "content-length" in headers:
+        yield await reader.readexactly(int(headers["content-length"]))
+    else:
+        yield await reader.read()
+
+
+def _content_from_events(buffer):
+    """
+    Split complete server-sent event lines off the buffer
+
+    Returns:
+        tuple: (content pieces, remaining buffer, done flag)
+    """
+    pieces = []
+    *lines, buffer = buffer.split(b"\n")
+    for line in lines:
+        line = line.strip()
+        if not line.startswith(b"data:"):
+            continue
+        data = line[len(b"data:") :].strip()
+        if data == b"[DONE]":
+            return pieces, b"", True
+        delta = json.loads(data)["choices"][0].get("delta", {})
+        if delta.get("content"):
+            pieces.append(delta["content"])
+    return pieces, buffer, False
+
+
+def extract_json(text):
+    """
+    Cut the JSON document out of an LLM answer (drops code fences and surrounding text)
+
+    Raises:
+        ValueError: If the answer contains no JSON object
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("Die Antwort enthält kein JSON-Objekt")
+    return text[start : end + 1]
+
+
+class LLMClient:
+    """Asynchronous client for an OpenAI-compatible chat completions endpoint"""
+
+    def __init__(
+        self,
+        url=None,
+        model=None,
+        api_key=None,
+        max_concurrency=LLM_MAX_CONCURRENCY,
+        max_retries=LLM_MAX_RETRIES,
+        backoff_seconds=1.0,
+        timeout=LLM_TIMEOUT_SECONDS,
+        stream=True,
+        cache=None,
+    ):
+        """
+        Initialize the client (no connection is opened before the first request)
+
+        Args:
+            url (str): Endpoint URL (default: LLM_API_URL environment variable or config)
+            model (str): Model name (default: LLM_MODEL environment variable or config)
+            api_key (str): API key (default: first set variable of LLM_API_KEY_ENV_VARS)
+            max_concurrency (int): Maximum number of requests in flight
+            max_retries (int): Retries per prompt for transient errors
+            backoff_seconds (float): First retry delay, doubled with every retry
+            timeout (float): Timeout per request in seconds
+            stream (bool): Request streamed answers (server-sent events)
+            cache (response_cache.ResponseCache): Optional response cache; valid answers are stored,
+                repeated prompts are answered from it without a request
+        """
+        self.url = url or os.environ.get("LLM_API_URL", LLM_API_URL)
+        self.model = model or os.environ.get("LLM_MODEL", LLM_MODEL)
+        self.api_key = api_key or next(filter(None, map(os.environ.get, LLM_API_KEY_ENV_VARS)), None)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self.stream = stream
+        self.cache = cache
+        self.cache_hits = 0
+
+        parts = urlsplit(self.url)
+        use_ssl = parts.scheme == "https"
+        self.host = parts.hostname
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.pool = ConnectionPool(self.host, parts.port or (443 if use_ssl else 80), use_ssl, max_concurrency)
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close all pooled connections"""
+        self.pool.close()
+
+    async def complete(self, prompt):
+        """
+        Send a prompt and return the complete answer text
+
+        Args:
+            prompt (str): Prompt (user message)
+
+        Returns:
+            str: Answer of the model
+
+        Raises:
+            LLMError: If the prompt could not be answered after all retries
+        """
+        if self._semaphore is None:
+            # Created lazily so it belongs to the running event loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        body = json.dumps(
+            {"model": self.model, "messages": [{"role": "user", "content": prompt}], "stream": self.stream}
+        ).encode("utf-8")
+
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    return await asyncio.wait_for(self._send(body), self.timeout)
+                except (_RetryableError, OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                    if attempt == self.max_retries:
+                        raise LLMError(f"Anfrage nach {attempt + 1} Versuchen fehlgeschlagen: {e}") from e
+                    retry_after = getattr(e, "retry_after", None)
+                    await asyncio.sleep(retry_after if retry_after is not None else self.backoff_seconds * 2**attempt)
+
+    async def _send(self, body):
+        """Send one request over a pooled connection and read the answer"""
+        request_headers = [
+            f"POST {self.path} HTTP/1.1",
+            f"Host: {self.host}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive",
+            f"Accept: {'text/event-stream' if self.stream else 'application/json'}",
+        ]
+        if self.api_key:
+            request_headers.append(f"Authorization: Bearer {self.api_key}")
+
+        connection = await self.pool.acquire()
+        reader, writer = connection
+        reusable = False
+        try:
+            writer.write(("\r\n".join(request_headers) + "\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+
+            status, headers = await _read_headers(reader)
+            framed = "content-length" in headers or headers.get("transfer-encoding", "").lower() == "chunked"
+
+            if status >= 400:
+                error_body = b"".join([piece async for piece in _iter_body(reader, headers)])
+                reusable = framed and headers.get("connection", "").lower() != "close"
+                message = f"HTTP {status}: {error_body[:200].decode('utf-8', 'replace')}"
+                if status in RETRY_STATUSES:
+                    raise _RetryableError(message, _parse_retry_after(headers.get("retry-after")))
+                raise LLMError(message)
+
+            if "text/event-stream" in headers.get("content-type", ""):
+                content = await self._read_event_stream(reader, headers)
+            else:
+                answer = json.loads(b"".join([piece async for piece in _iter_body(reader, headers)]))
+                content = answer["choices"][0]["message"]["content"]
+
+            reusable = framed and headers.get("connection", "").lower() != "close"
+            return content
+        finally:
+            self.pool.release(connection, reusable)
+
+    async def _read_event_stream(self, reader, headers):
+        """Accumulate the content deltas of a streamed answer"""
+        pieces, buffer, done = [], b"", False
+        async for chunk in _iter_body(reader, headers):
+            if done:
+                # Drain the rest of the body so the connection can be reused
+                continue
+            new_pieces, buffer, done = _content_from_events(buffer + chunk)
+            pieces.extend(new_pieces)
+        return "".join(pieces)
+
+    async def complete_many(self, prompts):
+        """
+        Send many prompts concurrently (bounded by max_concurrency)
+
+        Returns:
+            list: Answer text or exception per prompt, in prompt order
+        """
+        return await asyncio.gather(*(self.complete(prompt) for prompt in prompts), return_exceptions=True)
+
+    async def generate_worksheet(self, prompt):
+        """
+        Send a prompt (or look it up in the response cache) and parse the answer into a Worksheet
+
+        Raises:
+            LLMError: If the request failed
+            ValueError: If the answer is not a valid worksheet
+        """
+        # Cache lookups and writes are file I/O and run in the default executor, not on the event loop
+        loop = asyncio.get_running_loop()
+        key = self.cache.make_key(prompt, self.model) if self.cache is not None else None
+        if key is not None:
+            cached = await loop.run_in_executor(None, self.cache.get, key)
+            if cached is not None:
+                self.cache_hits += 1
+                return parse_worksheet(cached[0])
+
+        answer = extract_json(await self.complete(prompt))
+        worksheet = parse_worksheet(answer)
+        if key is not None:
+            # Only valid worksheets are cached, a broken answer is requested again next time
+            await loop.run_in_executor(None, self.cache.put, key, answer)
+        return worksheet
+
+    async def generate_sharded_worksheet(self, prompts):
+        """
+        Send sharded prompts concurrently and merge the answers into one Worksheet
+
+        Every shard is retried on its own, a transient failure only repeats that shard.
+
+        Args:
+            prompts (list): Prompts from PromptGenerator.create_sharded_prompts (in order)
+
+        Returns:
+            Worksheet: Merged worksheet with renumbered exercises
+        """
+        worksheets = await asyncio.gather(*(self.generate_worksheet(prompt) for prompt in prompts))
+        return merge_worksheets(worksheets)
+
+
+def _parse_retry_after(value):
+    """
+    Seconds to wait from a Retry-After header (delay in seconds or HTTP-date)
+
+    Returns:
+        float or None: Delay, or None if the header is missing or unparseable (normal backoff)
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _render_in_worker(worksheet, output_prefix):
+    """Render both sheets with the PDF generator of the current worker process or thread"""
+    generator = getattr(_worker_state, "generator", None)
+    if generator is None:
+        from pdf_generator import PDFGenerator
+
+        generator = _worker_state.generator = PDFGenerator()
+    return generator.generate_pdfs_from_json(worksheet, output_prefix)
+
+
+async def generate_pdfs_from_prompts(client, prompts, output_dir, executor=None, on_result=None, bank=None):
+    """
+    Send prompts to the LLM and render every answer to PDFs as soon as it arrives
+
+    Args:
+        client (LLMClient): LLM client
+        prompts (iterable): (name, prompt) pairs, or (name, [shard prompts]) for sharded worksheets
+        output_dir (str): Directory for the generated PDFs
+        executor (concurrent.futures.Executor): Executor for rendering (default: new process pool); every
+            worker renders with its own PDF generator
+        on_result (callable): Optional callback invoked with every per-prompt result
+        bank (question_bank.QuestionBank): Optional question bank that stores every valid answer
+
+    Returns:
+        list: Per-prompt result dicts (as in batch_render) in prompt order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    loop = asyncio.get_running_loop()
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    bank_executor = ThreadPoolExecutor(max_workers=1) if bank is not None else None
+
+    async def process(name, prompt):
+        start = time.perf_counter()
+        result = {"name": name, "ok": False, "exercise_pdf": None, "solution_pdf": None, "error": None}
+        try:
+            if isinstance(prompt, (list, tuple)):
+                worksheet = await client.generate_sharded_worksheet(prompt)
+            else:
+                worksheet = await client.generate_worksheet(prompt)
+            if bank is not None:
+                # SQLite writes block, one writer thread keeps them off the loop and in order
+                await loop.run_in_executor(bank_executor, bank.add_worksheet, worksheet)
+            exercise_pdf, solution_pdf = await loop.run_in_executor(
+                executor, _render_in_worker, worksheet, os.path.join(output_dir, name)
+            )
+            result.update(ok=True, exercise_pdf=exercise_pdf, solution_pdf=solution_pdf)
+        except Exception as e:
+            # One broken worksheet (LLM, layout, disk or bank error) must not abort the batch
+            result["error"] = str(e)
+        result["seconds"] = time.perf_counter() - start
+        if on_result:
+            on_result(result)
+        return result
+
+    try:
+        return await asyncio.gather(*(process(name, prompt) for name, prompt in prompts))
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False)
+        if bank_executor is not None:
+            bank_executor.shutdown()
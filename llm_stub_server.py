@@ -0,0 +1,198 @@
+"""
+LLM Stub Server
+
+Local stand-in for an OpenAI-compatible chat completions endpoint, for
+testing throughput and latency of the LLM client offline. Answers are
+synthetic worksheets from benchmark_corpus (seeded by the prompt, so the
+same prompt gets the same worksheet) or a canned JSON file. Supports
+keep-alive, streamed answers (server-sent events, chunked), an
+artificial latency and failing the first requests to exercise retries.
+
+Usage:
+    python llm_stub_server.py [--port 8808] [--exercises 10] [--latency 0.5] [--response antwort.json]
+    LLM_API_URL=http://127.0.0.1:8808/v1/chat/completions python -m cli generate prompts.jsonl -o pdf/
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import zlib
+
+from benchmark_corpus import generate_worksheet
+
+DEFAULT_PORT = 8808
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 503: "Service Unavailable"}
+
+
+class StubLLMServer:
+    """Minimal HTTP/1.1 chat completions server with synthetic worksheet answers"""
+
+    def __init__(self, response=None, exercises=10, latency=0.0, fail_first=0, chunk_size=256):
+        """
+        Initialize the stub server
+
+        Args:
+            response (str): Canned answer text (default: synthetic worksheet JSON per prompt)
+            exercises (int): Number of exercises in synthetic worksheets
+            latency (float): Delay before every answer in seconds
+            fail_first (int): Answer the first N requests with 503 (to test retries)
+            chunk_size (int): Characters per streamed delta
+        """
+        self.response = response
+        self.exercises = exercises
+        self.latency = latency
+        self.fail_first = fail_first
+        self.chunk_size = chunk_size
+        self.connections = 0
+        self.requests = 0
+        self.port = None
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Start listening (port 0 picks a free port, see self.port)"""
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        """Serve until cancelled"""
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stop the server"""
+        self._server.close()
+        await self._server.wait_closed()
+
+    def answer_for(self, prompt):
+        """Answer text for a prompt"""
+        if self.response is not None:
+            return self.response
+        seed = zlib.crc32(prompt.encode("utf-8"))
+        return json.dumps(generate_worksheet(self.exercises, seed=seed), ensure_ascii=False)
+
+    async def _handle_connection(self, reader, writer):
+        """Serve requests on one keep-alive connection until the client closes it"""
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                await self._handle_request(request_line.split()[1].decode("latin-1"), body, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(self, path, body, writer):
+        """Answer a single request"""
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if not path.endswith("/chat/completions"):
+            self._write_response(writer, 404, b'{"error": "not found"}')
+            return
+        if self.requests <= self.fail_first:
+            self._write_response(writer, 503, b'{"error": "overloaded"}', extra_headers=["Retry-After: 0"])
+            return
+
+        try:
+            request = json.loads(body)
+            prompt = request["messages"][-1]["content"]
+        except (ValueError, KeyError, IndexError):
+            self._write_response(writer, 400, b'{"error": "invalid request"}')
+            return
+
+        answer = self.answer_for(prompt)
+        if request.get("stream"):
+            await self._write_stream(writer, answer)
+        else:
+            payload = {"object": "chat.completion", "choices": [{"message": {"role": "assistant", "content": answer}}]}
+            self._write_response(writer, 200, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        await writer.drain()
+
+    def _write_response(self, writer, status, body, extra_headers=()):
+        """Write a complete response with Content-Length"""
+        head = [
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive",
+            *extra_headers,
+        ]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def _write_stream(self, writer, answer):
+        """Write the answer as server-sent events with chunked transfer encoding"""
+        head = [
+            "HTTP/1.1 200 OK",
+            "Content-Type: text/event-stream",
+            "Transfer-Encoding: chunked",
+            "Connection: keep-alive",
+        ]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+
+        for start in range(0, len(answer), self.chunk_size):
+            delta = {"choices": [{"delta": {"content": answer[start : start + self.chunk_size]}}]}
+            self._write_chunk(writer, f"data: {json.dumps(delta, ensure_ascii=False)}\n\n".encode("utf-8"))
+            await writer.drain()
+        self._write_chunk(writer, b"data: [DONE]\n\n")
+        writer.write(b"0\r\n\r\n")
+
+    @staticmethod
+    def _write_chunk(writer, data):
+        """Write one chunk of a chunked response"""
+        writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+
+
+async def serve(args):
+    """Run the stub server until interrupted"""
+    response = None
+    if args.response:
+        with open(args.response, encoding="utf-8") as f:
+            response = f.read()
+
+    server = StubLLMServer(response, args.exercises, args.latency, args.fail_first)
+    await server.start(args.host, args.port)
+    print(f"LLM-Stub läuft auf http://{args.host}:{server.port}/v1/chat/completions", flush=True)
+    await server.serve_forever()
+
+
+def main(argv=None):
+    """Run the stub server from the command line"""
+    parser = argparse.ArgumentParser(description="Lokaler LLM-Stub (OpenAI-kompatibel) für Tests ohne Internet")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port")
+    parser.add_argument("--exercises", type=int, default=10, help="Aufgaben pro synthetischem Arbeitsblatt")
+    parser.add_argument("--latency", type=float, default=0.0, help="Verzögerung pro Antwort in Sekunden")
+    parser.add_argument("--fail-first", type=int, default=0, help="Die ersten N Anfragen mit 503 beantworten")
+    parser.add_argument("--response", default=None, help="Feste Antwort aus Datei statt synthetischer Blätter")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,24 +8,57 @@ Author: Toni Kleinfeld
 Date: October 2025
 """
 
+import cProfile
+import hashlib
+import io
+import itertools
 import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from operator import attrgetter
+from xml.sax.saxutils import escape
+
+from config import STREAM_SEGMENT_PAGES
+from exercise_model import Worksheet, load_json, parse_worksheet
+from exercise_stream import open_exercise_stream
+from flowable_factory import FlowableFactory
+from pdf_merge import merge_pdfs
+from render_profiler import RenderProfiler, profile_phase
 
 # Check if reportlab is available
 try:
     from reportlab.lib.pagesizes import A4
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.units import cm
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+    from reportlab.platypus import SimpleDocTemplate, PageBreak
+    from reportlab.platypus.doctemplate import PageBegin
     from reportlab.lib.enums import TA_LEFT, TA_CENTER
     from reportlab.pdfbase import pdfmetrics
     from reportlab.pdfbase.ttfonts import TTFont
 
+    from reportlab import Version as REPORTLAB_VERSION
+
     REPORTLAB_AVAILABLE = True
 except ImportError:
     REPORTLAB_AVAILABLE = False
 
 
+class RenderCancelled(Exception):
+    """Raised from a progress callback to abort rendering"""
+
+
+# Environment variable naming a file for a cProfile dump of generate_pdfs_from_json
+PROFILE_ENV_VAR = "PDF_PROFILE_OUTPUT"
+
+# Bump whenever the layout code changes, so cached PDFs are not reused
+RENDER_LAYOUT_VERSION = 1
+
+# Streaming mode: flowables created ahead of the layout (must exceed any keepWithNext chain)
+STREAM_WINDOW = 64
+
+
 class PDFGenerator:
     """Class responsible for generating PDF files from exercise data"""
 
@@ -35,6 +68,11 @@ class PDFGenerator:
             raise ImportError("reportlab ist nicht installiert. Bitte installiere es mit: pip install reportlab")
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
+        self.factory = FlowableFactory(self.styles)
+
+        # Page layout
+        self.pagesize = A4
+        self.margin = 2 * cm
 
     def _setup_custom_styles(self):
         """Setup custom paragraph styles for the PDF"""
@@ -102,217 +140,519 @@ class PDFGenerator:
             )
         )
 
-    def generate_pdfs_from_json(self, json_data, output_prefix="exercise"):
+    def _create_document(self, output_path):
+        """
+        Create the document template (invariant mode for byte-deterministic output)
+
+        Args:
+            output_path (str or file-like): Target filename or writable binary file-like object
+        """
+        return SimpleDocTemplate(
+            output_path,
+            pagesize=self.pagesize,
+            rightMargin=self.margin,
+            leftMargin=self.margin,
+            topMargin=self.margin,
+            bottomMargin=self.margin,
+            invariant=1,
+        )
+
+    def render_fingerprint(self):
+        """
+        Fingerprint of all style and layout settings that influence the PDF output
+
+        Returns:
+            str: Hex digest that changes whenever the rendered bytes could change
+        """
+        settings = {
+            "layout_version": RENDER_LAYOUT_VERSION,
+            "reportlab": REPORTLAB_VERSION,
+            "pagesize": list(self.pagesize),
+            "margin": self.margin,
+            "styles": {
+                name: {key: repr(getattr(style, key)) for key in sorted(style.defaults)}
+                for name, style in sorted(self.styles.byName.items())
+            },
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def generate_pdfs_from_json(
+        self, json_data, output_prefix="exercise", parallel=False, cache=None, progress=None, profile=False
+    ):
         """
         Generate both exercise and solution PDFs from JSON data
 
         Args:
-            json_data (dict or str): Exercise data as dictionary or JSON string
+            json_data (Worksheet, dict or str): Parsed worksheet, dictionary or JSON string
             output_prefix (str): Prefix for output filenames
+            parallel (bool): Render both sheets concurrently in two worker processes
+            cache (RenderCache): Optional render cache; a hit returns the cached PDFs without rendering
+            progress (callable): Optional callback progress(phase, sheet, done, total), see _build_document.
+                Not called in parallel mode. May raise RenderCancelled to abort.
+            profile (bool): Record wall time, CPU time and peak memory per phase and sheet
 
         Returns:
-            tuple: (exercise_pdf_path, solution_pdf_path)
+            tuple: (exercise_pdf_path, solution_pdf_path), with profile=True
+                (exercise_pdf_path, solution_pdf_path, report) where report is a RenderProfiler report dict
+
+        If the environment variable PDF_PROFILE_OUTPUT is set, a cProfile dump of the
+        whole call is written to that path.
         """
-        # Parse JSON if string
+        profiler = RenderProfiler() if profile else None
+        cprofile_path = os.environ.get(PROFILE_ENV_VAR)
+        cprofiler = cProfile.Profile() if cprofile_path else None
+
+        if profiler:
+            profiler.start()
+        if cprofiler:
+            cprofiler.enable()
+
+        try:
+            # Parse and validate data structure
+            worksheet = self._parse_profiled(json_data, profiler)
+
+            if cache is not None:
+                paths = self._generate_cached(worksheet, output_prefix, parallel, cache, progress, profiler)
+            else:
+                paths = self._build_output_paths(output_prefix)
+
+                # Generate PDFs
+                self._render_to_paths(worksheet, *paths, parallel, progress, profiler)
+        finally:
+            if cprofiler:
+                cprofiler.disable()
+                cprofiler.dump_stats(cprofile_path)
+            if profiler:
+                profiler.stop()
+
+        if profiler:
+            return paths + (profiler.report(),)
+        return paths
+
+    def _parse_profiled(self, json_data, profiler):
+        """Parse and validate, measuring both phases separately when profiling"""
+        if profiler is None:
+            return parse_worksheet(json_data)
+
         if isinstance(json_data, str):
-            try:
-                data = json.loads(json_data)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON format: {str(e)}")
+            with profiler.phase("parse"):
+                json_data = load_json(json_data)
+
+        with profiler.phase("validate"):
+            return parse_worksheet(json_data)
+
+    def _render_to_paths(self, worksheet, exercise_path, solution_path, parallel=False, progress=None, profiler=None):
+        """Render both sheets to the given paths, optionally in two worker processes"""
+        if parallel:
+            with profile_phase(profiler, "render_parallel"):
+                futures = self._submit_sheets(worksheet, exercise_path, solution_path)
+                _wait_for_sheets(futures, (exercise_path, solution_path))
         else:
-            data = json_data
+            try:
+                self._generate_exercise_sheet(worksheet, exercise_path, progress, profiler)
+                self._generate_solution_sheet(worksheet, solution_path, progress, profiler)
+            except BaseException:
+                # Cancelled (RenderCancelled) or failed: never leave one sheet without the other
+                for path in (exercise_path, solution_path):
+                    _remove_if_exists(path)
+                raise
+
+    def _generate_cached(self, worksheet, output_prefix, parallel, cache, progress=None, profiler=None):
+        """Serve both PDFs from the render cache or render and store them"""
+        with profile_phase(profiler, "cache_lookup"):
+            key = cache.make_key(worksheet.to_dict(), self.render_fingerprint())
+
+            # Deterministic filenames: same document and settings -> same files
+            exercise_path, solution_path = self._build_output_paths(output_prefix, suffix=key[:12])
+
+            cached = cache.get(key)
+            if cached:
+                try:
+                    for cached_path, output_path in zip(cached, (exercise_path, solution_path)):
+                        shutil.copyfile(cached_path, output_path)
+                except FileNotFoundError:
+                    # Evicted between lookup and copy: render as on a miss
+                    cached = None
+
+        if cached:
+            return exercise_path, solution_path
+
+        self._render_to_paths(worksheet, exercise_path, solution_path, parallel, progress, profiler)
+        with profile_phase(profiler, "cache_store"):
+            cache.put(key, exercise_path, solution_path)
+
+        return exercise_path, solution_path
+
+    def render_pdfs_to_bytes(self, json_data):
+        """
+        Render both sheets in memory without touching the filesystem
+
+        Args:
+            json_data (Worksheet, dict or str): Parsed worksheet, dictionary or JSON string
+
+        Returns:
+            tuple: (exercise_pdf_bytes, solution_pdf_bytes)
+        """
+        exercise_buffer = io.BytesIO()
+        solution_buffer = io.BytesIO()
+        self.write_pdfs_to_streams(json_data, exercise_buffer, solution_buffer)
+        return exercise_buffer.getvalue(), solution_buffer.getvalue()
+
+    def write_pdfs_to_streams(self, json_data, exercise_stream, solution_stream):
+        """
+        Render both sheets into caller-supplied binary file-like objects
+
+        Args:
+            json_data (Worksheet, dict or str): Parsed worksheet, dictionary or JSON string
+            exercise_stream: Writable binary file-like object for the exercise sheet
+            solution_stream: Writable binary file-like object for the solution sheet
+        """
+        worksheet = parse_worksheet(json_data)
+
+        self._generate_exercise_sheet(worksheet, exercise_stream)
+        self._generate_solution_sheet(worksheet, solution_stream)
+
+    def generate_pdfs_concurrently(self, json_data, output_prefix="exercise", executor=None):
+        """
+        Parse and validate once, then render both sheets in parallel worker processes
+
+        Returns as soon as the exercise sheet is written, so the caller can open it
+        while the solution sheet is still rendering.
+
+        Args:
+            json_data (Worksheet, dict or str): Parsed worksheet, dictionary or JSON string
+            output_prefix (str): Prefix for output filenames
+            executor (concurrent.futures.Executor): Optional executor to reuse (default: new process pool)
+
+        Returns:
+            tuple: (exercise_pdf_path, solution_future) - the future resolves to the solution PDF path
+        """
+        worksheet = parse_worksheet(json_data)
+
+        exercise_path, solution_path = self._build_output_paths(output_prefix)
+        exercise_future, solution_future = self._submit_sheets(worksheet, exercise_path, solution_path, executor)
+        _wait_for_sheets((exercise_future,), (exercise_path,), others=((solution_future, solution_path),))
+
+        return exercise_path, solution_future
+
+    def generate_pdfs_in_chunks(self, json_data, output_prefix="exercise", chunks=None, executor=None):
+        """
+        Render a large worksheet with several processes per sheet
+
+        The exercises are split at subtopic boundaries into chunks of similar size,
+        every chunk of both sheets is rendered in its own worker process and the
+        chunks are joined with pdf_merge. Exercise numbers continue across chunks,
+        the merged page tree keeps the pages in order. Every chunk starts on a new
+        page, so the page breaks can differ from generate_pdfs_from_json.
 
-        # Validate data structure
-        self._validate_json_structure(data)
+        Args:
+            json_data (Worksheet, dict or str): Parsed worksheet, dictionary or JSON string
+            output_prefix (str): Prefix for output filenames
+            chunks (int): Number of chunks per sheet (default: number of CPU cores)
+            executor (concurrent.futures.Executor): Optional executor to reuse (default: new process pool)
+
+        Returns:
+            tuple: (exercise_pdf_path, solution_pdf_path)
+        """
+        worksheet = parse_worksheet(json_data)
+        parts = split_at_subtopics(worksheet, chunks or os.cpu_count() or 1)
+        exercise_path, solution_path = self._build_output_paths(output_prefix)
+
+        if len(parts) == 1:
+            self._render_to_paths(worksheet, exercise_path, solution_path)
+            return exercise_path, solution_path
+
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=min(2 * len(parts), os.cpu_count() or 1))
+
+        futures = {}
+        try:
+            for sheet in ("exercise", "solution"):
+                futures[sheet] = [
+                    executor.submit(_render_chunk_in_process, sheet, part, number) for part, number in parts
+                ]
+            for sheet, output_path in (("exercise", exercise_path), ("solution", solution_path)):
+                merge_pdfs([future.result() for future in futures[sheet]], output_path)
+        finally:
+            if own_executor:
+                # Drop chunks that have not started yet (like shutdown(cancel_futures=True), Python 3.9+)
+                for future in itertools.chain.from_iterable(futures.values()):
+                    future.cancel()
+                executor.shutdown()
+
+        return exercise_path, solution_path
+
+    def generate_pdfs_streaming(self, path, output_prefix="exercise", segment_pages=STREAM_SEGMENT_PAGES):
+        """
+        Render a very large worksheet file with bounded memory
+
+        The file is read one exercise at a time (see exercise_stream) and the
+        flowables are created lazily, only a window of STREAM_WINDOW flowables
+        waits for the layout. Every segment_pages pages the document segment is
+        finished and appended to the output with pdf_merge, so finished pages do
+        not stay in memory either. Segments end exactly at page breaks, the pages
+        look the same as in a single pass.
+
+        Unlike generate_pdfs_from_json, exercises are not regrouped: a subtopic
+        header starts whenever the subtopic changes (documents written by this
+        application are already grouped).
+
+        Args:
+            path (str): Worksheet (.json) or exercise records (.jsonl, metadata in the first line)
+            output_prefix (str): Prefix for output filenames
+            segment_pages (int): Pages per document segment
 
-        # Generate filenames with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        exercise_path = f"{output_prefix}_uebungsblatt_{timestamp}.pdf"
-        solution_path = f"{output_prefix}_loesungsblatt_{timestamp}.pdf"
+        Returns:
+            tuple: (exercise_pdf_path, solution_pdf_path)
+
+        Raises:
+            ValueError: If the file is malformed or contains an invalid exercise
+        """
+        exercise_path, solution_path = self._build_output_paths(output_prefix)
+
+        for build_flowables, output_path in (
+            (self._exercise_flowables, exercise_path),
+            (self._solution_flowables, solution_path),
+        ):
+            metadata, exercises = open_exercise_stream(path)
+            groups = itertools.groupby(exercises, key=attrgetter("subtopic"))
+            try:
+                self._stream_to_pdf(build_flowables(metadata, groups), output_path, segment_pages)
+            except BaseException:
+                # Do not leave a truncated PDF behind
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                raise
 
-        # Generate PDFs
-        self._generate_exercise_sheet(data, exercise_path)
-        self._generate_solution_sheet(data, solution_path)
+        return exercise_path, solution_path
 
+    def _stream_to_pdf(self, flowables, output_path, segment_pages):
+        """Lay out lazily created flowables in document segments and append each segment to the output"""
+        story = _FlowableWindow(flowables, STREAM_WINDOW)
+
+        def segments():
+            while story:
+                buffer = io.BytesIO()
+                doc = self._create_document(buffer)
+                story.doc, story.max_pages = doc, segment_pages
+                doc.build(story)
+                story.doc = None
+                yield buffer.getvalue()
+
+        merge_pdfs(segments(), output_path)
+
+    def _submit_sheets(self, worksheet, exercise_path, solution_path, executor=None):
+        """Submit both sheets to worker processes and return their futures"""
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=2)
+
+        try:
+            exercise_future = executor.submit(_render_sheet_in_process, "exercise", worksheet, exercise_path)
+            solution_future = executor.submit(_render_sheet_in_process, "solution", worksheet, solution_path)
+        finally:
+            # Running sheets still finish, the pool just shuts down afterwards
+            if own_executor:
+                executor.shutdown(wait=False)
+
+        return exercise_future, solution_future
+
+    def _build_output_paths(self, output_prefix, suffix=None):
+        """Generate output filenames with the given suffix (default: timestamp)"""
+        suffix = suffix or datetime.now().strftime("%Y%m%d_%H%M%S")
+        exercise_path = f"{output_prefix}_uebungsblatt_{suffix}.pdf"
+        solution_path = f"{output_prefix}_loesungsblatt_{suffix}.pdf"
         return exercise_path, solution_path
 
     def _validate_json_structure(self, data):
         """Validate that JSON has required structure"""
-        if not isinstance(data, dict):
-            raise ValueError("JSON data must be a dictionary")
-
-        if "metadata" not in data:
-            raise ValueError("JSON must contain 'metadata' field")
-
-        if "exercises" not in data:
-            raise ValueError("JSON must contain 'exercises' field")
-
-        if not isinstance(data["exercises"], list):
-            raise ValueError("'exercises' must be a list")
-
-        # Validate metadata
-        self._validate_metadata(data["metadata"])
-
-        # Validate exercises
-        self._validate_exercises(data["exercises"])
-
-    def _validate_metadata(self, metadata):
-        """Validate metadata structure"""
-        required_metadata = ["topic", "grade", "subject"]
-        for field in required_metadata:
-            if field not in metadata:
-                raise ValueError(f"Metadata must contain '{field}' field")
-
-    def _validate_exercises(self, exercises):
-        """Validate exercises structure"""
-        for i, exercise in enumerate(exercises, 1):
-            # Support both old format (single question) and new format (with sub-questions)
-            if "sub_questions" in exercise:
-                # New format with sub-questions
-                self._validate_exercise_with_subquestions(exercise, i)
-            else:
-                # Legacy format (single question)
-                self._validate_legacy_exercise(exercise, i)
-
-    def _validate_exercise_with_subquestions(self, exercise, exercise_num):
-        """Validate exercise with sub-questions format"""
-        required_fields = ["id", "type", "question", "sub_questions"]
-        for field in required_fields:
-            if field not in exercise:
-                raise ValueError(f"Exercise {exercise_num} must contain '{field}' field")
-
-        # Validate sub-questions
-        if not isinstance(exercise["sub_questions"], list):
-            raise ValueError(f"Exercise {exercise_num}: 'sub_questions' must be a list")
-
-        for j, sub_q in enumerate(exercise["sub_questions"], 1):
-            sub_required = ["question", "answer"]
-            for field in sub_required:
-                if field not in sub_q:
-                    raise ValueError(f"Exercise {exercise_num}, sub-question {j} must contain '{field}' field")
-
-    def _validate_legacy_exercise(self, exercise, exercise_num):
-        """Validate legacy exercise format"""
-        required_fields = ["id", "type", "question", "answer"]
-        for field in required_fields:
-            if field not in exercise:
-                raise ValueError(f"Exercise {exercise_num} must contain '{field}' field")
-
-    def _generate_exercise_sheet(self, data, output_path):
+        parse_worksheet(data)
+
+    def _build_document(self, doc, story, sheet, progress=None):
+        """
+        Lay out the story and write the pages, reporting progress
+
+        The progress callback is called as progress(phase, sheet, done, total) with the phases
+        "story" (exercises added to the story), "layout" (flowables laid out) and
+        "page" (pages written, total is None).
+        """
+        if progress:
+            total = len(story)
+
+            def on_progress(event, value):
+                if event == "PROGRESS":
+                    progress("layout", sheet, value, total)
+                elif event == "PAGE":
+                    progress("page", sheet, value, None)
+
+            doc.setProgressCallBack(on_progress)
+
+        doc.build(story)
+
+    def _generate_exercise_sheet(self, worksheet, output_path, progress=None, profiler=None):
         """Generate exercise sheet (without solutions)"""
-        doc = SimpleDocTemplate(
-            output_path, pagesize=A4, rightMargin=2 * cm, leftMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm
+        self._generate_sheet(self._build_exercise_story, "exercise", worksheet, output_path, progress, profiler)
+
+    def _generate_solution_sheet(self, worksheet, output_path, progress=None, profiler=None):
+        """Generate solution sheet (with answers and explanations)"""
+        self._generate_sheet(self._build_solution_story, "solution", worksheet, output_path, progress, profiler)
+
+    def _generate_sheet(self, build_story, sheet, worksheet, output_path, progress=None, profiler=None):
+        """Build the story of a sheet and lay it out into the document"""
+        doc = self._create_document(output_path)
+
+        with profile_phase(profiler, "story", sheet):
+            story = build_story(worksheet, progress)
+        if profiler:
+            profiler.count("flowables", len(story), sheet)
+
+        with profile_phase(profiler, "build", sheet):
+            self._build_document(doc, story, sheet, progress)
+        if profiler:
+            profiler.count("pages", doc.page, sheet)
+
+    def _build_exercise_story(self, worksheet, progress=None, name_field=None, first_number=1, header=True):
+        """
+        Build the flowables of the exercise sheet
+
+        Args:
+            worksheet (Worksheet): Worksheet
+            progress (callable): Optional progress callback (see _build_document)
+            name_field (Flowable): Optional flowable used instead of the blank name line
+            first_number (int): Number of the first exercise (chunks of a split sheet continue the numbering)
+            header (bool): Add title, name and date line (False for all chunks but the first)
+        """
+        groups = worksheet.exercises_by_subtopic().items()
+        return list(
+            self._exercise_flowables(
+                worksheet.metadata, groups, progress, len(worksheet.exercises), name_field, first_number, header
+            )
         )
 
-        story = []
-        metadata = data["metadata"]
-
-        # Title
-        title = f"{metadata['topic']} – Übungsblatt ({metadata['grade']} {metadata['subject']})"
-        story.append(Paragraph(title, self.styles["CustomTitle"]))
-        story.append(Spacer(1, 0.5 * cm))
-
-        # Name and Date fields
-        story.append(Paragraph("Name: _______________________________", self.styles["Normal"]))
-        story.append(Spacer(1, 0.3 * cm))
-        story.append(Paragraph("Datum: _______________________________", self.styles["Normal"]))
-        story.append(Spacer(1, 1 * cm))
-
-        # Group exercises by subtopic
-        exercises_by_subtopic = {}
-        for exercise in data["exercises"]:
-            subtopic = exercise.get("subtopic", "Allgemein")
-            if subtopic not in exercises_by_subtopic:
-                exercises_by_subtopic[subtopic] = []
-            exercises_by_subtopic[subtopic].append(exercise)
-
-        # Add exercises with continuous numbering
-        exercise_counter = 1
-        for subtopic, exercises in exercises_by_subtopic.items():
+    def _exercise_flowables(
+        self, metadata, groups, progress=None, total=None, name_field=None, first_number=1, header=True
+    ):
+        """
+        Yield the flowables of the exercise sheet one after another
+
+        Args:
+            metadata (Metadata): Worksheet metadata
+            groups (iterable): (subtopic, exercises) pairs in sheet order
+            total (int): Number of exercises reported to the progress callback
+            progress, name_field, first_number, header: As for _build_exercise_story
+        """
+        if header:
+            # Title
+            title = f"{metadata.topic} – Übungsblatt ({metadata.grade} {metadata.subject})"
+            yield self.factory.paragraph(title, "CustomTitle")
+            yield self.factory.spacer(0.5 * cm)
+
+            # Name and Date fields
+            yield name_field or self.create_name_line()
+            yield self.factory.spacer(0.3 * cm)
+            yield self.factory.paragraph("Datum: _______________________________", "Normal")
+            yield self.factory.spacer(1 * cm)
+
+        # Add exercises grouped by subtopic with continuous numbering
+        exercise_counter = first_number
+        for subtopic, exercises in groups:
             # Subtopic header
-            story.append(Paragraph(f"<b>{subtopic}</b>", self.styles["CustomSubtitle"]))
-            story.append(Spacer(1, 0.3 * cm))
+            yield self.factory.paragraph(f"<b>{subtopic}</b>", "CustomSubtitle")
+            yield self.factory.spacer(0.3 * cm)
 
             for exercise in exercises:
                 # Check if exercise has sub-questions (new format)
-                if "sub_questions" in exercise and exercise["sub_questions"]:
+                if exercise.has_sub_questions:
                     # New format: Main question with sub-questions
                     # Main question with continuous numbering
-                    main_question = f"<b>{exercise_counter}.</b> {exercise['question']}"
-                    story.append(Paragraph(main_question, self.styles["Question"]))
+                    main_question = f"<b>{exercise_counter}.</b> {exercise.question}"
+                    yield self.factory.paragraph(main_question, "Question")
 
                     # Line break between main question and sub-questions
-                    story.append(Spacer(1, 0.2 * cm))
+                    yield self.factory.spacer(0.2 * cm)
 
                     # Sub-questions with bullet points
-                    for sub_q in exercise["sub_questions"]:
-                        sub_question_text = f"– {sub_q['question']}"
-                        story.append(Paragraph(sub_question_text, self.styles["Normal"]))
-                        story.append(Spacer(1, 0.1 * cm))
+                    for sub_q in exercise.sub_questions:
+                        sub_question_text = f"– {sub_q.question}"
+                        yield self.factory.paragraph(sub_question_text, "Normal")
+                        yield self.factory.spacer(0.1 * cm)
 
                     # Additional space after all sub-questions
-                    story.append(Spacer(1, 0.6 * cm))
+                    yield self.factory.spacer(0.6 * cm)
                 else:
                     # Legacy format: Single question
-                    question_text = f"<b>{exercise_counter}.</b> {exercise['question']}"
-                    story.append(Paragraph(question_text, self.styles["Question"]))
+                    question_text = f"<b>{exercise_counter}.</b> {exercise.question}"
+                    yield self.factory.paragraph(question_text, "Question")
 
                     # Add options for Multiple Choice
-                    if exercise.get("options") and isinstance(exercise["options"], list):
-                        for option in exercise["options"]:
-                            story.append(Paragraph(f"   ☐ {option}", self.styles["Normal"]))
+                    if exercise.multiple_choice:
+                        for option in exercise.multiple_choice.options:
+                            yield self.factory.paragraph(f"   ☐ {option}", "Normal")
 
                     # Add space for answer
-                    story.append(Spacer(1, 0.8 * cm))
+                    yield self.factory.spacer(0.8 * cm)
+
+                if progress:
+                    progress("story", "exercise", exercise_counter, total)
 
                 # Increment counter for next exercise
                 exercise_counter += 1
 
-            story.append(Spacer(1, 0.5 * cm))
+            yield self.factory.spacer(0.5 * cm)
 
-        doc.build(story)
+    def create_name_line(self, name=None):
+        """
+        Create the name line of the exercise sheet
 
-    def _generate_solution_sheet(self, data, output_path):
-        """Generate solution sheet (with answers and explanations)"""
-        doc = SimpleDocTemplate(
-            output_path, pagesize=A4, rightMargin=2 * cm, leftMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm
+        Args:
+            name (str): Student name (None: blank line to fill in)
+
+        Returns:
+            Paragraph: The name line
+        """
+        if name is None:
+            return self.factory.paragraph("Name: _______________________________", "Normal")
+        return self.factory.paragraph(f"Name: <b>{escape(name)}</b>", "Normal")
+
+    def _build_solution_story(self, worksheet, progress=None, first_number=1, header=True):
+        """Build the flowables of the solution sheet (first_number and header as for the exercise sheet)"""
+        groups = worksheet.exercises_by_subtopic().items()
+        return list(
+            self._solution_flowables(
+                worksheet.metadata, groups, progress, len(worksheet.exercises), first_number, header
+            )
         )
 
-        story = []
-        metadata = data["metadata"]
-
-        # Title
-        title = f"{metadata['topic']} – Lösungsblatt ({metadata['grade']} {metadata['subject']})"
-        story.append(Paragraph(title, self.styles["CustomTitle"]))
-        story.append(Spacer(1, 1 * cm))
-
-        # Group exercises by subtopic
-        exercises_by_subtopic = {}
-        for exercise in data["exercises"]:
-            subtopic = exercise.get("subtopic", "Allgemein")
-            if subtopic not in exercises_by_subtopic:
-                exercises_by_subtopic[subtopic] = []
-            exercises_by_subtopic[subtopic].append(exercise)
-
-        # Add exercises with solutions and continuous numbering
-        exercise_counter = 1
-        for subtopic, exercises in exercises_by_subtopic.items():
+    def _solution_flowables(self, metadata, groups, progress=None, total=None, first_number=1, header=True):
+        """Yield the flowables of the solution sheet one after another (arguments as for _exercise_flowables)"""
+        if header:
+            # Title
+            title = f"{metadata.topic} – Lösungsblatt ({metadata.grade} {metadata.subject})"
+            yield self.factory.paragraph(title, "CustomTitle")
+            yield self.factory.spacer(1 * cm)
+
+        # Add exercises with solutions grouped by subtopic and continuous numbering
+        exercise_counter = first_number
+        for subtopic, exercises in groups:
             # Subtopic header
-            story.append(Paragraph(f"<b>{subtopic}</b>", self.styles["CustomSubtitle"]))
-            story.append(Spacer(1, 0.3 * cm))
+            yield self.factory.paragraph(f"<b>{subtopic}</b>", "CustomSubtitle")
+            yield self.factory.spacer(0.3 * cm)
 
             for exercise in exercises:
-                self._add_solution_exercise(story, exercise, exercise_counter)
+                flowables = []
+                self._add_solution_exercise(flowables, exercise, exercise_counter)
+                yield from flowables
+                if progress:
+                    progress("story", "solution", exercise_counter, total)
                 exercise_counter += 1
 
-            story.append(Spacer(1, 0.3 * cm))
-
-        doc.build(story)
+            yield self.factory.spacer(0.3 * cm)
 
     def _add_solution_exercise(self, story, exercise, exercise_number):
         """Add a single exercise with solutions to the story"""
         # Check if exercise has sub-questions (new format)
-        if "sub_questions" in exercise and exercise["sub_questions"]:
+        if exercise.has_sub_questions:
             self._add_solution_exercise_with_subquestions(story, exercise, exercise_number)
         else:
             self._add_solution_legacy_exercise(story, exercise, exercise_number)
@@ -320,59 +660,184 @@ class PDFGenerator:
     def _add_solution_exercise_with_subquestions(self, story, exercise, exercise_number):
         """Add exercise with sub-questions and solutions"""
         # Main question with continuous numbering
-        main_question = f"<b>{exercise_number}.</b> {exercise['question']}"
-        story.append(Paragraph(main_question, self.styles["Question"]))
+        main_question = f"<b>{exercise_number}.</b> {exercise.question}"
+        story.append(self.factory.paragraph(main_question, "Question"))
 
         # Line break between main question and sub-questions
-        story.append(Spacer(1, 0.2 * cm))
+        story.append(self.factory.spacer(0.2 * cm))
 
         # Sub-questions with answers
-        for sub_q in exercise["sub_questions"]:
+        for sub_q in exercise.sub_questions:
             # Sub-question
-            sub_question_text = f"– {sub_q['question']}"
-            story.append(Paragraph(sub_question_text, self.styles["Normal"]))
+            sub_question_text = f"– {sub_q.question}"
+            story.append(self.factory.paragraph(sub_question_text, "Normal"))
 
             # Answer for sub-question
-            answer_text = f"<b>Lösung:</b> {sub_q['answer']}"
-            story.append(Paragraph(answer_text, self.styles["Answer"]))
+            answer_text = f"<b>Lösung:</b> {sub_q.answer}"
+            story.append(self.factory.paragraph(answer_text, "Answer"))
 
             # Explanation for sub-question (if available)
-            if sub_q.get("explanation"):
-                explanation_text = f"<i>Erklärung:</i> {sub_q['explanation']}"
-                story.append(Paragraph(explanation_text, self.styles["Explanation"]))
+            if sub_q.explanation:
+                explanation_text = f"<i>Erklärung:</i> {sub_q.explanation}"
+                story.append(self.factory.paragraph(explanation_text, "Explanation"))
 
-            story.append(Spacer(1, 0.2 * cm))
+            story.append(self.factory.spacer(0.2 * cm))
 
         # General explanation for the whole exercise (if available)
-        if exercise.get("explanation"):
-            general_explanation = f"<i>Allgemeine Erklärung:</i> {exercise['explanation']}"
-            story.append(Paragraph(general_explanation, self.styles["Explanation"]))
+        if exercise.explanation:
+            general_explanation = f"<i>Allgemeine Erklärung:</i> {exercise.explanation}"
+            story.append(self.factory.paragraph(general_explanation, "Explanation"))
 
         # Additional space after exercise
-        story.append(Spacer(1, 0.4 * cm))
+        story.append(self.factory.spacer(0.4 * cm))
 
     def _add_solution_legacy_exercise(self, story, exercise, exercise_number):
         """Add legacy format exercise with solution"""
         # Question with continuous numbering
-        question_text = f"<b>{exercise_number}.</b> {exercise['question']}"
-        story.append(Paragraph(question_text, self.styles["Question"]))
+        question_text = f"<b>{exercise_number}.</b> {exercise.question}"
+        story.append(self.factory.paragraph(question_text, "Question"))
 
         # Show options for Multiple Choice
-        if exercise.get("options") and isinstance(exercise["options"], list):
-            for option in exercise["options"]:
-                marker = "✓" if option == exercise["answer"] else "☐"
-                story.append(Paragraph(f"   {marker} {option}", self.styles["Normal"]))
+        if exercise.multiple_choice:
+            for option in exercise.multiple_choice.options:
+                marker = "✓" if option == exercise.answer else "☐"
+                story.append(self.factory.paragraph(f"   {marker} {option}", "Normal"))
 
         # Answer
-        answer_text = f"<b>Lösung:</b> {exercise['answer']}"
-        story.append(Paragraph(answer_text, self.styles["Answer"]))
+        answer_text = f"<b>Lösung:</b> {exercise.answer}"
+        story.append(self.factory.paragraph(answer_text, "Answer"))
 
         # Explanation
-        if exercise.get("explanation"):
-            explanation_text = f"<i>Erklärung:</i> {exercise['explanation']}"
-            story.append(Paragraph(explanation_text, self.styles["Explanation"]))
-
-        story.append(Spacer(1, 0.5 * cm))
+        if exercise.explanation:
+            explanation_text = f"<i>Erklärung:</i> {exercise.explanation}"
+            story.append(self.factory.paragraph(explanation_text, "Explanation"))
+
+        story.append(self.factory.spacer(0.5 * cm))
+
+
+class _FlowableWindow(list):
+    """
+    Story list for doc.build that is refilled lazily from a flowable iterator
+
+    doc.build checks len(story) before every flowable; that check refills the
+    window and reports an empty story once the current document segment has
+    max_pages finished pages and the next page has not been started yet. The
+    flowables that are left over start the next segment.
+    """
+
+    def __init__(self, flowables, size):
+        super().__init__()
+        self.source = iter(flowables)
+        self.size = size
+        self.doc = None
+        self.max_pages = None
+
+    def __len__(self):
+        doc = self.doc
+        # doc.page is only set once the build has started
+        if doc is not None and getattr(doc, "page", 0) >= self.max_pages and doc._hanging[-1:] == [PageBegin]:
+            return 0
+        missing = self.size - super().__len__()
+        if missing > 0:
+            self.extend(itertools.islice(self.source, missing))
+        return super().__len__()
+
+
+def _wait_for_sheets(futures, paths, others=()):
+    """
+    Wait for sheet futures; if one fails, discard all sheets and raise its error
+
+    Args:
+        futures (iterable): Futures of the sheets to wait for
+        paths (iterable): Output paths of these sheets
+        others (iterable): (future, path) pairs of sheets that are not waited for but discarded on failure
+    """
+    pairs = list(zip(futures, paths))
+    try:
+        for future, _ in pairs:
+            future.result()
+    except BaseException:
+        for future, path in pairs + list(others):
+            _discard_sheet(future, path)
+        raise
+
+
+def _discard_sheet(future, path):
+    """Cancel a sheet that has not started yet, otherwise remove its PDF once the worker is done"""
+    if not future.cancel():
+        future.add_done_callback(lambda _: _remove_if_exists(path))
+
+
+def _remove_if_exists(path):
+    """Remove a file if it exists"""
+    if os.path.exists(path):
+        os.remove(path)
+
+
+# PDF generator of the current worker process (created on first use)
+_process_generator = None
+
+
+def _render_sheet_in_process(sheet, worksheet, output_path):
+    """Render a single sheet inside a worker process"""
+    global _process_generator
+    if _process_generator is None:
+        _process_generator = PDFGenerator()
+
+    if sheet == "exercise":
+        _process_generator._generate_exercise_sheet(worksheet, output_path)
+    else:
+        _process_generator._generate_solution_sheet(worksheet, output_path)
+
+    return output_path
+
+
+def split_at_subtopics(worksheet, chunks):
+    """
+    Split a worksheet at subtopic boundaries into chunks of similar size
+
+    A subtopic is never split, so there are at most as many chunks as subtopics.
+
+    Args:
+        worksheet (Worksheet): Worksheet
+        chunks (int): Desired number of chunks
+
+    Returns:
+        list: [(chunk worksheet, number of its first exercise), ...] in sheet order
+    """
+    total = len(worksheet.exercises)
+    groups, current, done = [], [], 0
+    for exercises in worksheet.exercises_by_subtopic().values():
+        # Close the current chunk once it holds its share of the exercises
+        if current and done >= total * (len(groups) + 1) / chunks:
+            groups.append(current)
+            current = []
+        current.extend(exercises)
+        done += len(exercises)
+    groups.append(current)
+
+    parts, first_number = [], 1
+    for exercises in groups:
+        parts.append((Worksheet(worksheet.metadata, exercises), first_number))
+        first_number += len(exercises)
+    return parts
+
+
+def _render_chunk_in_process(sheet, worksheet, first_number):
+    """Render one chunk of a sheet inside a worker process and return the PDF bytes"""
+    global _process_generator
+    if _process_generator is None:
+        _process_generator = PDFGenerator()
+
+    if sheet == "exercise":
+        build_story = _process_generator._build_exercise_story
+    else:
+        build_story = _process_generator._build_solution_story
+
+    buffer = io.BytesIO()
+    story = build_story(worksheet, first_number=first_number, header=first_number == 1)
+    _process_generator._create_document(buffer).build(story)
+    return buffer.getvalue()
 
 
 def create_sample_json():
@@ -0,0 +1,326 @@
+"""
+PDF Merge Module
+
+This module joins PDF files into one document using only the standard
+library. Objects are located through the cross-reference table, stream
+data is copied byte for byte using its /Length, and every object that is
+reachable from a page is copied with a new object number. The pages of
+all inputs end up in one page tree in input order, so page numbers run
+on continuously.
+
+Supported are unencrypted files with classic cross-reference tables whose
+pages carry their own /MediaBox and /Resources, as written by ReportLab.
+Cross-reference streams (PDF 1.5 object streams) are not supported.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import io
+import os
+import re
+from array import array
+
+# Indirect reference "12 0 R"
+_REFERENCE = re.compile(rb"(\d+)\s+(\d+)\s+R\b")
+# Start of a literal string or comment, or an object body keyword
+_BODY_TOKEN = re.compile(rb"[(%]|\bstream\b|\bendobj\b")
+_LENGTH = re.compile(rb"/Length\s+(\d+)(?:\s+(\d+)\s+R\b)?")
+_PARENT = re.compile(rb"/Parent\s+(\d+)\s+\d+\s+R\b")
+_KIDS = re.compile(rb"/Kids\s*\[([^\]]*)\]")
+_TYPE_PAGES = re.compile(rb"/Type\s*/Pages\b")
+_WHITESPACE = b" \t\r\n\f\0"
+
+
+def _skip_string(data, pos):
+    """Return the position after the literal string starting at data[pos] == '('"""
+    depth = 0
+    while pos < len(data):
+        char = data[pos]
+        if char == 0x5C:  # backslash escapes the next byte
+            pos += 2
+            continue
+        if char == 0x28:
+            depth += 1
+        elif char == 0x29:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    raise ValueError("PDF: Zeichenkette ohne Ende")
+
+
+def _split_strings(body):
+    """Split an object body into (is_string, segment) parts, so references are only searched outside strings"""
+    pos = start = 0
+    while True:
+        pos = body.find(b"(", pos)
+        if pos < 0:
+            yield False, body[start:]
+            return
+        end = _skip_string(body, pos)
+        yield False, body[start:pos]
+        yield True, body[pos:end]
+        pos = start = end
+
+
+def _references(body):
+    """Object numbers referenced in an object body"""
+    return [
+        int(match.group(1))
+        for is_string, segment in _split_strings(body)
+        if not is_string
+        for match in _REFERENCE.finditer(segment)
+    ]
+
+
+def _renumber(body, numbers):
+    """Rewrite all references of an object body with the new object numbers"""
+    replace = lambda match: b"%d 0 R" % numbers[int(match.group(1))]  # noqa: E731
+    return b"".join(
+        segment if is_string else _REFERENCE.sub(replace, segment) for is_string, segment in _split_strings(body)
+    )
+
+
+class _PdfSource:
+    """Object access to one input PDF through its cross-reference table"""
+
+    __slots__ = ("data", "offsets", "root", "info")
+
+    def __init__(self, data):
+        """
+        Read the cross-reference table and trailer
+
+        Args:
+            data (bytes): Complete PDF file
+
+        Raises:
+            ValueError: If the file is no PDF, encrypted or uses cross-reference streams
+        """
+        if not data.startswith(b"%PDF-"):
+            raise ValueError("Keine PDF-Datei")
+        self.data = data
+        self.offsets = {}
+        self.root = self.info = None
+
+        startxref = data.rfind(b"startxref")
+        if startxref < 0:
+            raise ValueError("PDF: startxref fehlt")
+        xref = int(data[startxref + 9 :].split(None, 1)[0])
+
+        # Newest section first, older sections (/Prev of incremental updates) never override
+        while xref is not None:
+            trailer = self._read_xref(xref)
+            if b"/Encrypt" in trailer:
+                raise ValueError("Verschlüsselte PDF-Dateien werden nicht unterstützt")
+            root = re.search(rb"/Root\s+(\d+)\s+\d+\s+R\b", trailer)
+            info = re.search(rb"/Info\s+(\d+)\s+\d+\s+R\b", trailer)
+            if self.root is None and root:
+                self.root = int(root.group(1))
+            if self.info is None and info:
+                self.info = int(info.group(1))
+            previous = re.search(rb"/Prev\s+(\d+)", trailer)
+            xref = int(previous.group(1)) if previous else None
+
+        if self.root is None:
+            raise ValueError("PDF: Katalog (/Root) fehlt")
+
+    def _read_xref(self, pos):
+        """Read one cross-reference section into offsets and return its trailer dictionary"""
+        data = self.data
+        if not data.startswith(b"xref", pos):
+            raise ValueError("PDF: Querverweis-Streams (PDF 1.5) werden nicht unterstützt")
+        pos += 4
+        while True:
+            while data[pos] in _WHITESPACE:
+                pos += 1
+            if data.startswith(b"trailer", pos):
+                break
+            line_end = data.index(b"\n", pos)
+            first, count = (int(value) for value in data[pos:line_end].split())
+            pos = line_end + 1
+            # Entries are exactly 20 bytes: 10-digit offset, 5-digit generation, type, 2-byte line end
+            for number in range(first, first + count):
+                offset, _, kind = data[pos : pos + 20].split()
+                if kind == b"n":
+                    self.offsets.setdefault(number, int(offset))
+                pos += 20
+
+        end = data.find(b"startxref", pos)
+        return data[pos : end if end >= 0 else len(data)]
+
+    def read_object(self, number):
+        """
+        Read an indirect object
+
+        Args:
+            number (int): Object number
+
+        Returns:
+            tuple: (body, stream data or None)
+        """
+        data = self.data
+        if number not in self.offsets:
+            raise ValueError(f"PDF: Objekt {number} fehlt")
+        pos = data.index(b"obj", self.offsets[number]) + 3
+        start = pos
+
+        while True:
+            match = _BODY_TOKEN.search(data, pos)
+            if match is None:
+                raise ValueError(f"PDF: Objekt {number} ohne endobj")
+            token = match.group()
+            if token == b"(":
+                pos = _skip_string(data, match.start())
+            elif token == b"%":
+                pos = data.find(b"\n", match.start())
+                pos = len(data) if pos < 0 else pos
+            elif token == b"endobj":
+                return data[start : match.start()].strip(), None
+            else:
+                body = data[start : match.start()].strip()
+                break
+
+        # Stream data starts after the end of line following "stream", its length comes from /Length
+        pos = match.end()
+        pos += 2 if data.startswith(b"\r\n", pos) else 1
+        length = _LENGTH.search(body)
+        if length is None:
+            raise ValueError(f"PDF: Stream {number} ohne /Length")
+        if length.group(2) is None:
+            size = int(length.group(1))
+        else:
+            size = int(self.read_object(int(length.group(1)))[0])
+        return body, data[pos : pos + size]
+
+    def pages(self):
+        """Object numbers of all pages in page tree order"""
+        catalog, _ = self.read_object(self.root)
+        pages_ref = re.search(rb"/Pages\s+(\d+)\s+\d+\s+R\b", catalog)
+        if pages_ref is None:
+            raise ValueError("PDF: Seitenbaum (/Pages) fehlt")
+
+        pages, stack = [], [int(pages_ref.group(1))]
+        while stack:
+            number = stack.pop()
+            body, _ = self.read_object(number)
+            if _TYPE_PAGES.search(body):
+                kids = _KIDS.search(body)
+                stack.extend(reversed(_references(kids.group(1)) if kids else []))
+            else:
+                if b"/MediaBox" not in body or b"/Resources" not in body:
+                    raise ValueError("PDF: Vom Seitenbaum geerbte Seitenattribute werden nicht unterstützt")
+                pages.append(number)
+        return pages
+
+
+class _PdfWriter:
+    """Writes numbered objects and the cross-reference table"""
+
+    __slots__ = ("output", "position", "offsets")
+
+    def __init__(self, output):
+        self.output = output
+        self.position = 0
+        # Offset per object number, compact so that huge documents stay small in memory
+        self.offsets = array("Q")
+        self._write(b"%PDF-1.4\n%\x93\x8c\x8b\x9e\n")
+
+    def _write(self, data):
+        self.output.write(data)
+        self.position += len(data)
+
+    def add(self, number, body, stream=None):
+        """Write object number with the given body and optional stream data"""
+        if number >= len(self.offsets):
+            self.offsets.extend([0] * (number + 1 - len(self.offsets)))
+        self.offsets[number] = self.position
+        self._write(b"%d 0 obj\n%s\n" % (number, body))
+        if stream is not None:
+            self._write(b"stream\n%s\nendstream\n" % stream)
+        self._write(b"endobj\n")
+
+    def finish(self, root, info=None):
+        """Write the cross-reference table and trailer"""
+        size = len(self.offsets)
+        xref = self.position
+        trailer = b"/Size %d /Root %d 0 R" % (size, root)
+        if info is not None:
+            trailer += b" /Info %d 0 R" % info
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for offset in self.offsets[1:]:
+            self._write(b"%010d 00000 n \n" % offset)
+        self._write(b"trailer\n<<\n%s\n>>\nstartxref\n%d\n%%%%EOF\n" % (trailer, xref))
+
+
+def merge_pdfs(sources, output):
+    """
+    Concatenate PDF files, the pages of every source follow the pages of the previous one
+
+    Args:
+        sources (iterable): PDFs as bytes or file paths, read one at a time (may be a generator)
+        output (str or file-like): Target filename or writable binary file-like object
+
+    Returns:
+        int: Number of pages of the merged PDF
+
+    Raises:
+        ValueError: If there is no source or a source cannot be read
+    """
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, "wb") as f:
+            return merge_pdfs(sources, f)
+
+    # Object 1 is the catalog, object 2 the page tree, copied objects follow
+    writer = _PdfWriter(output)
+    next_number = 3
+    page_numbers, info, index = array("Q"), None, None
+
+    for index, source in enumerate(sources):
+        if not isinstance(source, (bytes, bytearray)):
+            with open(source, "rb") as f:
+                source = f.read()
+        pdf = _PdfSource(bytes(source))
+        pages = pdf.pages()
+
+        # Pages and everything they reference; /Parent points to the new page tree (placeholder object 0)
+        page_set = set(pages)
+        numbers, order, objects, stack = {0: 2}, [], {}, list(reversed(pages))
+        if index == 0 and pdf.info is not None:
+            stack.insert(0, pdf.info)
+        while stack:
+            number = stack.pop()
+            if number in numbers:
+                continue
+            numbers[number] = next_number
+            next_number += 1
+            order.append(number)
+            body, stream = pdf.read_object(number)
+            if number in page_set:
+                body = _PARENT.sub(b"/Parent 0 0 R", body, count=1)
+            objects[number] = body, stream
+            stack.extend(reversed(_references(body)))
+
+        for number in order:
+            body, stream = objects.pop(number)
+            writer.add(numbers[number], _renumber(body, numbers), stream)
+
+        page_numbers.extend(numbers[page] for page in pages)
+        if index == 0 and pdf.info is not None:
+            info = numbers[pdf.info]
+
+    if index is None:
+        raise ValueError("Keine PDF-Dateien zum Zusammenfügen")
+
+    kids = b" ".join(b"%d 0 R" % number for number in page_numbers)
+    writer.add(1, b"<<\n/Pages 2 0 R /Type /Catalog\n>>")
+    writer.add(2, b"<<\n/Count %d /Kids [ %s ] /Type /Pages\n>>" % (len(page_numbers), kids))
+    writer.finish(root=1, info=info)
+    return len(page_numbers)
+
+
+def merge_pdf_bytes(sources):
+    """Concatenate PDFs given as bytes and return the merged PDF as bytes"""
+    buffer = io.BytesIO()
+    merge_pdfs(sources, buffer)
+    return buffer.getvalue()
@@ -0,0 +1,280 @@
+"""
+Prompt Batch Module
+
+This module expands a curriculum spec (grades × subjects × topics) lazily
+into prompt requests, skips subject/type combinations that are not in
+EXERCISE_MAPPINGS and streams one prompt per line to JSONL. Every request
+gets a stable ID derived from its inputs, so reruns produce the same IDs.
+
+Curriculum spec (JSON or YAML):
+    {
+        "grades": ["3. Klasse", "4. Klasse"],      # optional, default: config.GRADES
+        "subjects": ["Deutsch"],                   # optional, default: config.SUBJECTS
+        "types": ["Erkennen/Unterstreichen"],      # optional, default: all types of the subject
+        "count": 5,                                # optional, default: DEFAULT_NUM_QUESTIONS
+        "topics": [
+            {"topic": "Nomen", "subtopics": ["Plural", "Artikel"], "subjects": ["Deutsch"]}
+        ]
+    }
+Topic entries may override grades, subjects, types and count.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+from itertools import islice
+
+from config import DEFAULT_EXERCISE_TYPES, DEFAULT_NUM_QUESTIONS, EXERCISE_MAPPINGS, GRADES, SUBJECTS
+from create_prompt import PromptGenerator, estimate_tokens
+
+# Check if PyYAML is available (only needed for YAML specs)
+try:
+    import yaml
+
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+# Requests handed to the pool at once, keeps memory flat for huge matrices
+POOL_WINDOW_SIZE = 2048
+POOL_CHUNK_SIZE = 64
+
+# Prompt generator and prompt variant of the current worker process (set once per process)
+_worker_generator = None
+_worker_compact = False
+
+
+def _as_text(value, separator=", "):
+    """Join list values, pass strings through"""
+    if isinstance(value, (list, tuple)):
+        return separator.join(str(item) for item in value)
+    return "" if value is None else str(value)
+
+
+def _as_list(value, separator=";"):
+    """Split string values, pass lists through"""
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in _as_text(value).split(separator) if item.strip()]
+
+
+def validate_record(generator, record):
+    """
+    Validate a prompt request and normalize it to the PromptGenerator arguments
+
+    Args:
+        generator (PromptGenerator): Prompt generator
+        record (dict): Request with grade, subject, topic, subtopics, types and count
+
+    Returns:
+        tuple: (num_questions, grade, subject, main_topic, subtopics, exercise_types)
+
+    Raises:
+        ValueError: If the inputs are invalid (message as shown in the GUI)
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Die Anfrage muss ein JSON-Objekt sein.")
+
+    grade = _as_text(record.get("grade"))
+    subject = _as_text(record.get("subject"))
+    main_topic = _as_text(record.get("topic"))
+    subtopics = _as_text(record.get("subtopics"))
+    exercise_types = _as_list(record.get("types"))
+    num_questions = _as_text(record.get("count", DEFAULT_NUM_QUESTIONS))
+
+    is_valid, error_message = generator.validate_inputs(
+        grade, subject, main_topic, subtopics, ", ".join(exercise_types), num_questions
+    )
+    if not is_valid:
+        raise ValueError(error_message)
+
+    allowed_types = EXERCISE_MAPPINGS.get(subject, DEFAULT_EXERCISE_TYPES)
+    unknown_types = [exercise_type for exercise_type in exercise_types if exercise_type not in allowed_types]
+    if unknown_types:
+        raise ValueError(f"Aufgabentypen passen nicht zum Fach '{subject}': {', '.join(unknown_types)}")
+
+    return num_questions, grade, subject, main_topic, subtopics, exercise_types
+
+
+def prompt_from_record(generator, record, compact=False):
+    """
+    Validate a prompt request and create the prompt
+
+    Args:
+        generator (PromptGenerator): Prompt generator
+        record (dict): Request with grade, subject, topic, subtopics, types and count
+        compact (bool): Create the compact prompt variant
+
+    Returns:
+        str: The generated prompt
+
+    Raises:
+        ValueError: If the inputs are invalid (message as shown in the GUI)
+    """
+    return generator.create_json_prompt_template(*validate_record(generator, record), compact=compact)
+
+
+def load_curriculum_spec(path):
+    """
+    Load a curriculum spec from a JSON or YAML file
+
+    Args:
+        path (str): Path to a .json, .yaml or .yml file
+
+    Returns:
+        dict: The curriculum spec
+
+    Raises:
+        ImportError: If a YAML spec is given but PyYAML is not installed
+        ValueError: If the spec has no topics
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            if not YAML_AVAILABLE:
+                raise ImportError("Für YAML-Lehrpläne wird PyYAML benötigt: pip install pyyaml")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+
+    if not isinstance(spec, dict) or not spec.get("topics"):
+        raise ValueError("Der Lehrplan muss eine nicht-leere Liste 'topics' enthalten.")
+    return spec
+
+
+def make_request_id(grade, subject, topic, subtopics, exercise_types, count):
+    """Create a stable ID from the request inputs (same inputs -> same ID)"""
+    key = json.dumps([grade, subject, topic, list(subtopics), list(exercise_types), str(count)], ensure_ascii=False)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def iter_prompt_requests(spec):
+    """
+    Lazily expand a curriculum spec into prompt requests
+
+    Subject/type combinations missing from EXERCISE_MAPPINGS are filtered
+    out; a request whose type list ends up empty is skipped entirely.
+
+    Args:
+        spec (dict): Curriculum spec
+
+    Yields:
+        dict: Request with id, grade, subject, topic, subtopics, types and count
+    """
+    for entry in spec["topics"]:
+        if isinstance(entry, str):
+            entry = {"topic": entry}
+
+        topic = str(entry.get("topic", "")).strip()
+        subtopics = _as_list(entry.get("subtopics", ()), separator=",")
+        count = entry.get("count", spec.get("count", DEFAULT_NUM_QUESTIONS))
+        requested_types = entry.get("types", spec.get("types"))
+
+        for grade in entry.get("grades", spec.get("grades", GRADES)):
+            for subject in entry.get("subjects", spec.get("subjects", SUBJECTS)):
+                allowed_types = EXERCISE_MAPPINGS.get(subject, DEFAULT_EXERCISE_TYPES)
+                if requested_types is None:
+                    exercise_types = list(allowed_types)
+                else:
+                    exercise_types = [t for t in _as_list(requested_types) if t in allowed_types]
+                if not exercise_types:
+                    continue
+
+                yield {
+                    "id": make_request_id(grade, subject, topic, subtopics, exercise_types, count),
+                    "grade": grade,
+                    "subject": subject,
+                    "topic": topic,
+                    "subtopics": subtopics,
+                    "types": exercise_types,
+                    "count": count,
+                }
+
+
+def _init_worker(compact=False):
+    """Create the prompt generator once per worker process"""
+    global _worker_generator, _worker_compact
+    _worker_generator = PromptGenerator()
+    _worker_compact = compact
+
+
+def _generate_prompt(request):
+    """
+    Generate the prompt for one request
+
+    Args:
+        request (dict): Request as produced by iter_prompt_requests
+
+    Returns:
+        dict: The request with added "prompt" and "tokens" (or "error") fields
+    """
+    result = dict(request)
+    try:
+        result["prompt"] = prompt_from_record(_worker_generator, request, _worker_compact)
+        result["tokens"] = estimate_tokens(result["prompt"])
+    except ValueError as e:
+        result["error"] = str(e)
+    return result
+
+
+def _windows(iterable, size):
+    """Yield lists of at most size items without materializing the iterable"""
+    iterator = iter(iterable)
+    while True:
+        window = list(islice(iterator, size))
+        if not window:
+            return
+        yield window
+
+
+def generate_prompts(requests, workers=1, compact=False):
+    """
+    Generate prompts for a stream of requests, in input order
+
+    Args:
+        requests (iterable): Requests as produced by iter_prompt_requests
+        workers (int): Number of worker processes (1 = in-process)
+        compact (bool): Create the compact prompt variant
+
+    Yields:
+        dict: Request with added "prompt" and "tokens" (or "error") fields
+    """
+    if workers == 1:
+        _init_worker(compact)
+        for request in requests:
+            yield _generate_prompt(request)
+        return
+
+    with multiprocessing.Pool(processes=workers, initializer=_init_worker, initargs=(compact,)) as pool:
+        # Bounded windows instead of one imap over everything: the pool's task
+        # feeder would otherwise drain the whole matrix into its queue
+        for window in _windows(requests, POOL_WINDOW_SIZE):
+            yield from pool.imap(_generate_prompt, window, chunksize=POOL_CHUNK_SIZE)
+
+
+def write_prompt_matrix(spec, output, workers=None, compact=False):
+    """
+    Expand a curriculum spec and stream the prompts to JSONL
+
+    Args:
+        spec (dict): Curriculum spec
+        output: Writable text stream, one JSON object per line
+        workers (int): Number of worker processes (default: number of CPU cores)
+        compact (bool): Create the compact prompt variant
+
+    Returns:
+        dict: Summary with total, succeeded and failed counts and the estimated total tokens
+    """
+    workers = workers or os.cpu_count() or 1
+    total = failed = tokens = 0
+
+    for result in generate_prompts(iter_prompt_requests(spec), workers, compact):
+        total += 1
+        failed += "error" in result
+        tokens += result.get("tokens", 0)
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    return {"total": total, "succeeded": total - failed, "failed": failed, "tokens": tokens}
@@ -0,0 +1,256 @@
+"""
+Question Bank Module
+
+This module stores every validated exercise in a SQLite database, so
+content that was generated once can be reused instead of asking the AI
+again. Exercises are indexed by subject, grade, topic, subtopic and
+type, searchable with an FTS5 full-text index over question and answer
+text and deduplicated by a hash of their content.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from config import MULTIPLE_CHOICE_TYPE, QUESTION_BANK_PATH
+from exercise_model import Exercise, parse_worksheet
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS exercises (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    subject TEXT NOT NULL COLLATE NOCASE,
+    grade TEXT NOT NULL COLLATE NOCASE,
+    topic TEXT NOT NULL COLLATE NOCASE,
+    subtopic TEXT NOT NULL COLLATE NOCASE,
+    type TEXT NOT NULL COLLATE NOCASE,
+    is_multiple_choice INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_exercises_slot ON exercises (subject, grade, topic, subtopic, type);
+CREATE INDEX IF NOT EXISTS idx_exercises_type ON exercises (subject, grade, type);
+CREATE VIRTUAL TABLE IF NOT EXISTS exercises_fts USING fts5 (question, answers, tokenize = 'unicode61');
+"""
+
+# Filter arguments of query/count and their columns
+FILTER_COLUMNS = {
+    "subject": "subject",
+    "grade": "grade",
+    "topic": "topic",
+    "subtopic": "subtopic",
+    "exercise_type": "type",
+}
+
+
+def content_hash(exercise):
+    """
+    Hash of the exercise content (everything except the id)
+
+    Args:
+        exercise (Exercise): Exercise
+
+    Returns:
+        str: Hex digest, equal for exercises with the same content
+    """
+    data = exercise.to_dict()
+    del data["id"]
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _answer_text(exercise):
+    """All answer and explanation texts of an exercise for the full-text index"""
+    parts = [exercise.answer or "", exercise.explanation or ""]
+    for sub_q in exercise.sub_questions:
+        parts.extend((sub_q.question, sub_q.answer, sub_q.explanation or ""))
+    if exercise.multiple_choice:
+        parts.extend(exercise.multiple_choice.options)
+    return " ".join(str(part) for part in parts if part)
+
+
+def _fts_query(text):
+    """Quote every search word, so user input can never be FTS5 syntax"""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class QuestionBank:
+    """SQLite question bank with indexed lookup and full-text search"""
+
+    def __init__(self, path=QUESTION_BANK_PATH):
+        """
+        Open (and create if needed) the question bank
+
+        Args:
+            path (str): Database file (":memory:" for a temporary bank)
+        """
+        if path != ":memory:":
+            path = os.path.expanduser(path)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        # llm_client writes from a single worker thread, so the connection may leave its creating thread
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+    def add_worksheet(self, json_data):
+        """
+        Validate a worksheet and store all exercises that are not in the bank yet
+
+        Args:
+            json_data (Worksheet, dict or str): Worksheet
+
+        Returns:
+            tuple: (added, duplicates) - number of new and of already known exercises
+
+        Raises:
+            ValueError: If the worksheet is invalid
+        """
+        worksheet = parse_worksheet(json_data)
+        metadata = worksheet.metadata
+        added = 0
+        now = time.time()
+
+        with self.connection:
+            for exercise in worksheet.exercises:
+                data = exercise.to_dict()
+                del data["id"]
+                cursor = self.connection.execute(
+                    "INSERT OR IGNORE INTO exercises "
+                    "(content_hash, subject, grade, topic, subtopic, type, is_multiple_choice, data, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        content_hash(exercise),
+                        metadata.subject,
+                        metadata.grade,
+                        metadata.topic,
+                        exercise.subtopic,
+                        exercise.type,
+                        int(exercise.multiple_choice is not None or exercise.type == MULTIPLE_CHOICE_TYPE),
+                        json.dumps(data, ensure_ascii=False),
+                        now,
+                    ),
+                )
+                if cursor.rowcount:
+                    self.connection.execute(
+                        "INSERT INTO exercises_fts (rowid, question, answers) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, exercise.question, _answer_text(exercise)),
+                    )
+                    added += 1
+
+        return added, len(worksheet.exercises) - added
+
+    def _where(self, text, filters):
+        """Build the WHERE clause and parameters for the given filters"""
+        clauses, params = [], []
+        for name, value in filters.items():
+            if value is not None:
+                clauses.append(f"e.{FILTER_COLUMNS[name]} = ?")
+                params.append(value)
+        if text:
+            clauses.append("e.id IN (SELECT rowid FROM exercises_fts WHERE exercises_fts MATCH ?)")
+            params.append(_fts_query(text))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, subject=None, grade=None, topic=None, subtopic=None, exercise_type=None, text=None, limit=None):
+        """
+        Find stored exercises (all filters optional, compared case-insensitively)
+
+        Args:
+            subject (str): Subject
+            grade (str): Grade
+            topic (str): Main topic
+            subtopic (str): Subtopic
+            exercise_type (str): Exercise type
+            text (str): Words that must all occur in question or answers (full-text search)
+            limit (int): Maximum number of results
+
+        Returns:
+            list: Exercises (id = bank id), oldest first
+        """
+        where, params = self._where(
+            text, dict(subject=subject, grade=grade, topic=topic, subtopic=subtopic, exercise_type=exercise_type)
+        )
+        sql = f"SELECT e.id, e.data FROM exercises e{where} ORDER BY e.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        exercises = []
+        for bank_id, data in self.connection.execute(sql, params):
+            data = json.loads(data)
+            data["id"] = bank_id
+            exercises.append(Exercise.from_dict(data))
+        return exercises
+
+    def count(self, subject=None, grade=None, topic=None, subtopic=None, exercise_type=None, text=None):
+        """Number of stored exercises matching the filters (see query)"""
+        where, params = self._where(
+            text, dict(subject=subject, grade=grade, topic=topic, subtopic=subtopic, exercise_type=exercise_type)
+        )
+        return self.connection.execute(f"SELECT COUNT(*) FROM exercises e{where}", params).fetchone()[0]
+
+    def slot_counts(self, subject, grade, topic=None):
+        """
+        Count stored exercises per (subtopic, type) in one indexed query
+
+        Returns:
+            dict: (subtopic casefolded, type casefolded) -> count
+        """
+        where, params = self._where(None, dict(subject=subject, grade=grade, topic=topic))
+        rows = self.connection.execute(
+            f"SELECT e.subtopic, e.type, COUNT(*) FROM exercises e{where} GROUP BY e.subtopic, e.type", params
+        )
+        counts = {}
+        for subtopic, ex_type, count in rows:
+            key = (subtopic.casefold(), ex_type.casefold())
+            counts[key] = counts.get(key, 0) + count
+        return counts
+
+    def missing_slots(self, plan, subject, grade, topic=None):
+        """
+        Compare a distribution plan with the bank
+
+        Only the returned slots still have to be generated, e.g. with
+        PromptGenerator.create_repair_prompt; an empty list means the bank
+        can fill the whole worksheet.
+
+        Args:
+            plan (list): Plan from compliance.plan_for_request / create_distribution_plan
+            subject (str): Subject
+            grade (str): Grade
+            topic (str): Main topic (None: any topic)
+
+        Returns:
+            list: [(subtopic, exercise_type, missing count), ...]
+        """
+        counts = self.slot_counts(subject, grade, topic)
+        by_type = {}
+        for (_, ex_type), count in counts.items():
+            by_type[ex_type] = by_type.get(ex_type, 0) + count
+
+        missing = []
+        for subtopic, type_counts in plan:
+            for ex_type, needed in type_counts:
+                if subtopic is None:
+                    available = by_type.get(ex_type.casefold(), 0)
+                else:
+                    available = counts.get((subtopic.casefold(), ex_type.casefold()), 0)
+                if available < needed:
+                    missing.append((subtopic, ex_type, needed - available))
+        return missing
@@ -0,0 +1,137 @@
+"""
+Render Cache Module
+
+This module provides a content-addressed on-disk cache for rendered PDFs.
+Entries are keyed by a hash of the normalized exercise document plus the
+style and layout settings of the PDF generator, and evicted in LRU order
+once the cache grows beyond its size limit.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from config import PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES
+
+SHEET_NAMES = ("uebungsblatt", "loesungsblatt")
+
+
+class RenderCache:
+    """On-disk cache for exercise/solution PDF pairs with LRU eviction"""
+
+    def __init__(self, cache_dir=PDF_CACHE_DIR, max_bytes=PDF_CACHE_MAX_BYTES):
+        """
+        Initialize the render cache
+
+        Args:
+            cache_dir (str): Directory for cached PDFs (created if missing)
+            max_bytes (int): Maximum total size of all cached PDFs
+        """
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, data, settings_fingerprint):
+        """
+        Build the cache key for an exercise document
+
+        Args:
+            data (dict): Exercise document
+            settings_fingerprint (str): Fingerprint of the style and layout settings
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        normalized = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        digest = hashlib.sha256()
+        digest.update(settings_fingerprint.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalized.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_paths(self, key):
+        """Return the paths of both cached sheets for a key"""
+        return tuple(os.path.join(self.cache_dir, f"{key}_{sheet}.pdf") for sheet in SHEET_NAMES)
+
+    def get(self, key):
+        """
+        Look up a cached PDF pair
+
+        Args:
+            key (str): Cache key from make_key
+
+        Returns:
+            tuple or None: (exercise_pdf_path, solution_pdf_path) or None on a miss
+
+        The entry can still be evicted by a concurrent put (other thread or
+        process) after this returns; callers treat a missing file as a miss.
+        """
+        paths = self._entry_paths(key)
+        # Touch the entry so it counts as recently used; a file that is gone was evicted meanwhile
+        try:
+            for path in paths:
+                os.utime(path)
+        except FileNotFoundError:
+            return None
+        return paths
+
+    def put(self, key, exercise_pdf, solution_pdf):
+        """
+        Store a rendered PDF pair in the cache
+
+        Args:
+            key (str): Cache key from make_key
+            exercise_pdf (str): Path of the rendered exercise sheet
+            solution_pdf (str): Path of the rendered solution sheet
+
+        Returns:
+            tuple: Paths of the cached copies
+        """
+        paths = self._entry_paths(key)
+        for source, target in zip((exercise_pdf, solution_pdf), paths):
+            # Copy to a temp file first, so readers never see half-written PDFs
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            os.close(fd)
+            shutil.copyfile(source, temp_path)
+            os.replace(temp_path, target)
+
+        self.evict()
+        return paths
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits into max_bytes"""
+        entries = {}
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".pdf"):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Evicted by a concurrent put
+                continue
+            key = filename.rsplit("_", 1)[0]
+            size, last_used = entries.get(key, (0, 0.0))
+            entries[key] = (size + stat.st_size, max(last_used, stat.st_mtime))
+
+        total = sum(size for size, _ in entries.values())
+        for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            for path in self._entry_paths(key):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def clear(self):
+        """Remove all cached PDFs"""
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(".pdf"):
+                os.remove(os.path.join(self.cache_dir, filename))
@@ -0,0 +1,105 @@
+"""
+Render Profiler Module
+
+This module provides opt-in instrumentation for PDF generation. It records
+wall time, CPU time and peak traced memory per phase and sheet, plus
+flowable and page counts, and returns the result as a structured report.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+class RenderProfiler:
+    """Collects per-phase timings, peak memory and counters for one render"""
+
+    def __init__(self, trace_memory=True):
+        """
+        Initialize the profiler
+
+        Args:
+            trace_memory (bool): Record peak memory per phase with tracemalloc (slows rendering down)
+        """
+        self.trace_memory = trace_memory
+        self.phases = []
+        self.counters = {}
+        self._started_tracing = False
+
+    def start(self):
+        """Start memory tracing (if enabled and not already running)"""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        """Stop memory tracing if this profiler started it"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def phase(self, name, sheet=None):
+        """
+        Measure a phase
+
+        Args:
+            name (str): Phase name (e.g. "parse", "validate", "story", "build")
+            sheet (str): Sheet the phase belongs to ("exercise", "solution") or None
+        """
+        tracing = tracemalloc.is_tracing()
+        # reset_peak needs Python 3.9, before that the peak counts from the start of tracing
+        if tracing and hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield
+        finally:
+            entry = {
+                "phase": name,
+                "sheet": sheet,
+                "wall_seconds": time.perf_counter() - wall_start,
+                "cpu_seconds": time.process_time() - cpu_start,
+            }
+            if tracing:
+                entry["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+            self.phases.append(entry)
+
+    def count(self, name, value, sheet=None):
+        """Record a counter value (e.g. number of flowables or pages) for a sheet"""
+        self.counters.setdefault(sheet or "document", {})[name] = value
+
+    def report(self):
+        """
+        Build the structured report
+
+        Returns:
+            dict: Phases, per-sheet counters and totals
+        """
+        report = {
+            "phases": list(self.phases),
+            "counters": {sheet: dict(values) for sheet, values in self.counters.items()},
+            "total_wall_seconds": sum(entry["wall_seconds"] for entry in self.phases),
+            "total_cpu_seconds": sum(entry["cpu_seconds"] for entry in self.phases),
+        }
+        peaks = [entry["peak_memory_bytes"] for entry in self.phases if "peak_memory_bytes" in entry]
+        if peaks:
+            report["peak_memory_bytes"] = max(peaks)
+        return report
+
+    def to_json(self):
+        """Return the report as JSON string"""
+        return json.dumps(self.report(), indent=2)
+
+
+def profile_phase(profiler, name, sheet=None):
+    """Return the phase context of the profiler, or a no-op context if profiling is off"""
+    if profiler is None:
+        return nullcontext()
+    return profiler.phase(name, sheet)
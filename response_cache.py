@@ -0,0 +1,182 @@
+"""
+Response Cache Module
+
+This module stores the worksheet JSON the AI returned for a prompt, so
+the same prompt is answered locally instead of waiting for the model
+again. Entries are keyed by a hash of the normalized prompt text plus
+the generator settings (e.g. the model name), expire after a TTL and are
+evicted in LRU order once the cache holds more than its entry limit.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from config import RESPONSE_CACHE_DIR, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace, so reformatted copies of a prompt share one entry"""
+    return " ".join(prompt.split())
+
+
+def response_matches_prompt(json_string, grade, subject, main_topic):
+    """
+    Check that a worksheet JSON answers a prompt, so unrelated JSON (e.g. sample data) is never cached for it
+
+    Args:
+        json_string (str): Worksheet JSON
+        grade (str): Grade of the prompt
+        subject (str): Subject of the prompt
+        main_topic (str): Main topic of the prompt (the metadata topic may add the subtopics)
+
+    Returns:
+        bool: True if grade and subject are equal and the metadata topic contains the main topic
+    """
+    try:
+        metadata = json.loads(json_string)["metadata"]
+        return (
+            str(metadata["grade"]).strip() == grade.strip()
+            and str(metadata["subject"]).strip() == subject.strip()
+            and main_topic.strip().casefold() in str(metadata["topic"]).casefold()
+        )
+    except (ValueError, KeyError, TypeError):
+        return False
+
+
+class ResponseCache:
+    """On-disk prompt → response cache with TTL and LRU eviction"""
+
+    def __init__(
+        self, cache_dir=RESPONSE_CACHE_DIR, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL_SECONDS
+    ):
+        """
+        Initialize the response cache
+
+        Args:
+            cache_dir (str): Directory for cached responses (created if missing)
+            max_entries (int): Maximum number of cached responses
+            ttl (float): Lifetime of an entry in seconds
+        """
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, prompt, settings=""):
+        """
+        Build the cache key for a prompt
+
+        Args:
+            prompt (str): Prompt text
+            settings (str): Generator settings that change the answer (e.g. the model name)
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        digest = hashlib.sha256()
+        digest.update(settings.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_prompt(prompt).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        """Return the path of the cached response for a key"""
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """
+        Look up a cached response
+
+        Args:
+            key (str): Cache key from make_key
+
+        Returns:
+            tuple or None: (response, created timestamp) or None on a miss, expired or malformed entry
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except OSError:
+            return None
+        except ValueError:
+            # Truncated entry
+            self._remove(path)
+            return None
+
+        try:
+            response, created = entry["response"], float(entry["created"])
+        except (KeyError, TypeError, ValueError):
+            # Entry in an old or foreign format
+            self._remove(path)
+            return None
+
+        if time.time() - created > self.ttl:
+            self._remove(path)
+            return None
+
+        # Touch the entry so it counts as recently used (it may have been evicted meanwhile)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return response, created
+
+    def put(self, key, response):
+        """
+        Store a response in the cache
+
+        Args:
+            key (str): Cache key from make_key
+            response (str): Worksheet JSON returned for the prompt
+        """
+        # Write to a temp file first, so readers never see half-written entries
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "response": response}, f, ensure_ascii=False)
+        os.replace(temp_path, self._entry_path(key))
+
+        self.evict()
+
+    def evict(self):
+        """Remove expired entries and then least recently used ones until max_entries is reached"""
+        now = time.time()
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                last_used = os.stat(path).st_mtime
+            except FileNotFoundError:
+                # Removed by a concurrent get or put
+                continue
+            # The creation time is stored in the entry, but an entry unused for a whole TTL is expired as well
+            if now - last_used > self.ttl:
+                self._remove(path)
+            else:
+                entries.append((last_used, path))
+
+        entries.sort()
+        for _, path in entries[: max(len(entries) - self.max_entries, 0)]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        """Remove an entry, ignoring entries another process removed first"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Remove all cached responses"""
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(".json"):
+                self._remove(os.path.join(self.cache_dir, filename))
@@ -0,0 +1,44 @@
+"""
+Test Script für den Batch-Renderer
+
+Testet, ob Verzeichnisse und JSONL-Streams korrekt zu PDFs gerendert werden
+"""
+
+import json
+import os
+
+from batch_render import render_batch
+from pdf_generator import create_sample_json
+
+
+def test_batch_verzeichnis(tmp_path):
+    """Teste das Rendern eines Verzeichnisses mit einem fehlerhaften Dokument"""
+    source = tmp_path / "json"
+    source.mkdir()
+    for i in range(3):
+        (source / f"blatt{i}.json").write_text(json.dumps(create_sample_json()), encoding="utf-8")
+    (source / "kaputt.json").write_text("{kein json", encoding="utf-8")
+
+    results, summary = render_batch(str(source), str(tmp_path / "pdf"), workers=2)
+
+    assert summary["total"] == 4
+    assert summary["succeeded"] == 3
+    assert summary["failed"] == 1
+    assert summary["docs_per_second"] > 0
+    failed = [r for r in results if not r["ok"]]
+    assert failed[0]["name"] == "kaputt"
+    for result in results:
+        if result["ok"]:
+            assert os.path.exists(result["exercise_pdf"])
+            assert os.path.exists(result["solution_pdf"])
+
+
+def test_batch_jsonl(tmp_path):
+    """Teste das Rendern eines JSONL-Streams"""
+    source = tmp_path / "blaetter.jsonl"
+    source.write_text("\n".join(json.dumps(create_sample_json()) for _ in range(2)), encoding="utf-8")
+
+    results, summary = render_batch(str(source), str(tmp_path / "pdf"), workers=1)
+
+    assert [r["name"] for r in results] == ["blaetter_00001", "blaetter_00002"]
+    assert summary["failed"] == 0
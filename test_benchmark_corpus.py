@@ -0,0 +1,25 @@
+"""
+Test Script für den synthetischen Benchmark-Korpus
+
+Testet, ob die generierten Dokumente valide und reproduzierbar sind
+"""
+
+from benchmark_corpus import MULTIPLE_CHOICE_TYPE, generate_worksheet
+from config import EXERCISE_MAPPINGS
+from exercise_model import parse_worksheet
+
+
+def test_korpus_valide_und_reproduzierbar():
+    """Teste Größe, Aufgabentypen, Formatmischung und Reproduzierbarkeit"""
+    data = generate_worksheet(200, seed=7)
+    worksheet = parse_worksheet(data)
+
+    assert len(worksheet.exercises) == 200
+    assert {exercise.type for exercise in worksheet.exercises} <= set(EXERCISE_MAPPINGS["Deutsch"])
+
+    multiple_choice = [exercise for exercise in worksheet.exercises if exercise.type == MULTIPLE_CHOICE_TYPE]
+    assert 0 < len(multiple_choice) < 100
+    assert all(3 <= len(e.sub_questions) <= 5 for e in worksheet.exercises if e.has_sub_questions)
+    assert any(ch in worksheet.exercises[0].question + worksheet.exercises[1].question for ch in "äöüßÄÖÜ")
+
+    assert generate_worksheet(200, seed=7) == data
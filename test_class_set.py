@@ -0,0 +1,72 @@
+"""
+Test Script für den Klassensatz
+
+Testet das Einlesen der Klassenliste und dass das Blatt einmal gesetzt und pro Schüler nur gestempelt wird
+(die Laufzeit misst benchmark_pdf.py --class-set)
+"""
+
+import io
+import json
+
+import pytest
+
+from benchmark_corpus import generate_worksheet
+from class_set import _PageFormCanvas, generate_class_set, main, read_roster
+from pdf_generator import PDFGenerator, create_sample_json
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        ("Name;Klasse\nAnna Bäcker;4a\nBen Özdemir;4a\n", ["Anna Bäcker", "Ben Özdemir"]),
+        ("﻿Vorname,Nachname\nAnna,Bäcker\n\nBen,Özdemir\n", ["Anna Bäcker", "Ben Özdemir"]),
+        ("Anna Bäcker\nBen Özdemir\n", ["Anna Bäcker", "Ben Özdemir"]),
+    ],
+)
+def test_klassenliste(tmp_path, content, expected):
+    """Teste Spalte 'Name', Vorname/Nachname mit BOM und Listen ohne Kopfzeile"""
+    path = tmp_path / "klasse.csv"
+    path.write_text(content, encoding="utf-8")
+    assert read_roster(str(path)) == expected
+
+
+def test_einmal_setzen_oft_stempeln(tmp_path, monkeypatch):
+    """Teste, dass das Blatt einmal gesetzt und pro Schüler nur gestempelt wird und jeder Name genau einmal erscheint"""
+    generator = PDFGenerator()
+    worksheet = generate_worksheet(40, seed=3)
+    students = [f"Schüler {number:02d}" for number in range(30)]
+
+    single = io.BytesIO()
+    generate_class_set([worksheet], students[:1], single, generator)
+
+    # Aufrufe zählen: Story-Aufbau (Satz) und Form-Verweise (Stempeln)
+    stories, stamped = [], []
+    build_story = generator._build_exercise_story
+    monkeypatch.setattr(
+        generator, "_build_exercise_story", lambda *args, **kwargs: stories.append(1) or build_story(*args, **kwargs)
+    )
+    do_form = _PageFormCanvas.doForm
+    monkeypatch.setattr(_PageFormCanvas, "doForm", lambda canvas, name: stamped.append(name) or do_form(canvas, name))
+
+    whole = io.BytesIO()
+    summary = generate_class_set([worksheet], students, whole, generator)
+
+    pages_per_sheet = summary["pages"] // 30
+    assert summary == {"students": 30, "variants": 1, "pages": 30 * pages_per_sheet}
+    assert whole.getvalue().count(b"/Type /Page\n") == 30 * pages_per_sheet
+    # Einmal gesetzt, jede Schülerseite verweist auf eine der Formen der ersten Seiten
+    assert len(stories) == 1
+    assert len(stamped) == 30 * pages_per_sheet
+    assert stamped == stamped[:pages_per_sheet] * 30
+    # Der Blattinhalt steht einmal als Form in der PDF, pro Schüler kommen nur Seitenverweise und der Name hinzu
+    assert whole.getvalue().count(b"/Subtype /Form") == pages_per_sheet
+    assert len(whole.getvalue()) < 10 * len(single.getvalue())
+
+    # Varianten werden reihum verteilt, Kommandozeile mit Klassenliste
+    roster = tmp_path / "klasse.csv"
+    roster.write_text("Name\nAnna\nBen\nClara\n", encoding="utf-8")
+    worksheets = tmp_path / "varianten.jsonl"
+    lines = [json.dumps(data, ensure_ascii=False) for data in (create_sample_json(), worksheet)]
+    worksheets.write_text("\n".join(lines), encoding="utf-8")
+    assert main([str(worksheets), str(roster), "-o", str(tmp_path / "klasse.pdf")]) == 0
+    assert (tmp_path / "klasse.pdf").read_bytes().startswith(b"%PDF")
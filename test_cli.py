@@ -0,0 +1,161 @@
+"""
+Test Script für die Kommandozeile
+
+Testet die Prompt-Erzeugung ohne GUI (Argumente und JSONL) und dass dabei kein tkinter geladen wird
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from cli import iter_prompt_jobs, main
+from pdf_generator import create_sample_json
+
+
+def test_prompt_aus_argumenten(capsys):
+    """Teste einen einzelnen Prompt aus Kommandozeilenargumenten"""
+    exit_code = main(
+        [
+            "prompt",
+            "--grade",
+            "4. Klasse",
+            "--subject",
+            "Deutsch",
+            "--topic",
+            "Nomen",
+            "--subtopics",
+            "Plural, Artikel",
+            "--type",
+            "Erkennen/Unterstreichen",
+            "--count",
+            "4",
+        ]
+    )
+
+    assert exit_code == 0
+    assert '„Nomen" (Schwerpunkte: Plural, Artikel)' in capsys.readouterr().out
+
+    assert main(["prompt", "--subject", "Deutsch", "--topic", "Nomen"]) == 2
+    assert "Eingabefehler" in capsys.readouterr().err
+
+
+def test_prompt_jsonl(tmp_path):
+    """Teste JSONL-Anfragen mit gültigen und ungültigen Zeilen"""
+    requests = tmp_path / "anfragen.jsonl"
+    output = tmp_path / "prompts.jsonl"
+    valid = {"grade": "3. Klasse", "subject": "Mathematik", "topic": "Brüche", "types": ["Rechenaufgaben"], "count": 3}
+    wrong_type = dict(valid, types="Vokabeln übersetzen")
+    requests.write_text(f"{json.dumps(valid)}\n\n{json.dumps(wrong_type)}\n", encoding="utf-8")
+
+    assert main(["prompt", "--jsonl", str(requests), "-o", str(output)]) == 1
+
+    results = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert [result["line"] for result in results] == [1, 3]
+    assert "Brüche" in results[0]["prompt"]
+    assert "Vokabeln übersetzen" in results[1]["error"]
+
+
+def test_prompt_jsonl_kaputte_zeilen(tmp_path):
+    """Teste, dass ungültiges JSON und Nicht-Objekte nur ihre eigene Zeile betreffen"""
+    requests = tmp_path / "anfragen.jsonl"
+    output = tmp_path / "prompts.jsonl"
+    valid = {"grade": "3. Klasse", "subject": "Mathematik", "topic": "Brüche", "types": ["Rechenaufgaben"], "count": 3}
+    requests.write_text(f'{{"grade": "3. Kl\n[]\n"x"\n{json.dumps(valid)}\n', encoding="utf-8")
+
+    assert main(["prompt", "--jsonl", str(requests), "-o", str(output)]) == 1
+
+    results = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert [result["line"] for result in results] == [1, 2, 3, 4]
+    assert all("error" in result for result in results[:3])
+    assert "JSON-Objekt" in results[1]["error"] and "JSON-Objekt" in results[2]["error"]
+    assert "Brüche" in results[3]["prompt"]
+
+
+def test_cli_ohne_tkinter(project_dir):
+    """Teste, dass die Prompt-Erzeugung weder tkinter noch reportlab oder sqlite importiert"""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, cli; "
+            "cli.main(['prompt', '--grade', '1. Klasse', '--subject', 'Deutsch', '--topic', 'ABC', "
+            "'--type', 'Sortieren/Zuordnen']); "
+            "assert not {'tkinter', 'reportlab', 'sqlite3'} & set(sys.modules)",
+        ],
+        cwd=project_dir,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_teil_prompts_und_zusammenfuehren(tmp_path, capsys):
+    """Teste Teil-Prompts und das Zusammenführen der Antworten"""
+    exit_code = main(
+        ["prompt", "--grade", "4. Klasse", "--subject", "Deutsch", "--topic", "Nomen"]
+        + ["--subtopics", "Plural, Artikel, Merkwörter", "--type", "Sortieren/Zuordnen", "--shards", "2"]
+    )
+    shards = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    assert exit_code == 0
+    assert [shard["subtopics"] for shard in shards] == [["Plural", "Artikel"], ["Merkwörter"]]
+
+    answers = []
+    for number in (1, 2):
+        answer = tmp_path / f"teil{number}.json"
+        answer.write_text(json.dumps(create_sample_json()), encoding="utf-8")
+        answers.append(str(answer))
+
+    assert main(["merge", *answers, "-o", str(tmp_path / "blatt.json")]) == 0
+    merged = json.loads((tmp_path / "blatt.json").read_text(encoding="utf-8"))
+    assert [exercise["id"] for exercise in merged["exercises"]] == [1, 2, 3, 4]
+
+
+def test_prompt_jobs_je_arbeitsblatt(tmp_path):
+    """Teste, dass jede Zeile ein Auftrag ist und nur die Teile eines Arbeitsblatts zusammengehören"""
+    path = tmp_path / "prompts.jsonl"
+    records = [
+        {"shard": 1, "prompt": "A1"},
+        {"shard": 2, "prompt": "A2"},
+        {"line": 3, "error": "Eingabefehler"},
+        {"id": "einzeln", "prompt": "B"},
+        {"shard": 1, "prompt": "C1"},
+        {"shard": 2, "prompt": "C2"},
+        {"shard": 1, "prompt": "D1"},
+    ]
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+    assert list(iter_prompt_jobs(str(path))) == [
+        ("prompts_00001", ["A1", "A2"]),
+        ("einzeln", "B"),
+        ("prompts_00005", ["C1", "C2"]),
+        ("prompts_00007", ["D1"]),
+    ]
+
+
+def test_generate_kaputte_zeile(tmp_path, capsys, run_with_stub):
+    """Teste, dass eine kaputte Zeile als fehlgeschlagener Auftrag mit Zeilennummer zählt und die anderen laufen"""
+    path = tmp_path / "prompts.jsonl"
+    path.write_text(
+        '{"id": "gut", "prompt": "A"}\n{"prompt": "B"\n{"id": "auch_gut", "prompt": "C"}\n', encoding="utf-8"
+    )
+    output_dir = tmp_path / "pdfs"
+
+    async def generate(url):
+        arguments = ["generate", str(path), "-o", str(output_dir), "--url", url, "--no-cache"]
+        return await asyncio.to_thread(main, arguments)
+
+    exit_code, _ = run_with_stub(generate, exercises=2)
+
+    assert exit_code == 1
+    assert sorted(name.split("blatt_")[0] for name in os.listdir(output_dir)) == [
+        "auch_gut_loesungs",
+        "auch_gut_uebungs",
+        "gut_loesungs",
+        "gut_uebungs",
+    ]
+    out = capsys.readouterr().out
+    assert "✗ prompts_00002" in out and "Zeile 2:" in out
+    assert "2/3 Arbeitsblätter erzeugt, 1 fehlgeschlagen" in out
@@ -0,0 +1,110 @@
+"""
+Test Script für die Compliance-Prüfung
+
+Testet die Prüfung gegen den Verteilungsplan, den Reparatur-Prompt und das Einfügen der Antwort
+"""
+
+import asyncio
+import json
+
+from compliance import check_worksheet, plan_for_request, repair_worksheet, splice_repair
+from create_prompt import PromptGenerator
+from llm_client import LLMClient
+from llm_stub_server import StubLLMServer
+
+TYPES = ["Sortieren/Zuordnen", "Ankreuzen (Multiple Choice)"]
+
+
+def sub_exercise(subtopic, count=3):
+    """Aufgabe mit Unteraufgaben"""
+    return {
+        "id": 0,
+        "type": "Sortieren/Zuordnen",
+        "subtopic": subtopic,
+        "question": f"Sortiere ({subtopic})",
+        "sub_questions": [{"question": f"Wort {i}", "answer": "Nomen"} for i in range(count)],
+    }
+
+
+def mc_exercise(subtopic):
+    """Multiple-Choice-Aufgabe"""
+    return {
+        "id": 0,
+        "type": "Ankreuzen (Multiple Choice)",
+        "subtopic": subtopic,
+        "question": "Welcher Artikel?",
+        "options": ["der", "die", "das"],
+        "answer": "die",
+    }
+
+
+def worksheet(exercises):
+    """Arbeitsblatt mit fortlaufenden IDs"""
+    for number, exercise in enumerate(exercises, 1):
+        exercise["id"] = number
+    return {"metadata": {"topic": "Nomen", "grade": "4. Klasse", "subject": "Deutsch"}, "exercises": exercises}
+
+
+def test_plan_und_pruefung():
+    """Teste fehlende, überzählige und fehlerhafte Aufgaben"""
+    plan = plan_for_request("3", "Nomen", "Plural, Artikel", TYPES)
+    assert plan == [("Plural", [(TYPES[0], 2), (TYPES[1], 1)]), ("Artikel", [(TYPES[0], 2), (TYPES[1], 1)])]
+
+    complete = worksheet([sub_exercise("Plural"), sub_exercise("plural "), mc_exercise("Plural")] * 1)
+    complete["exercises"] += worksheet([sub_exercise("Artikel"), sub_exercise("Artikel", 5), mc_exercise("Artikel")])[
+        "exercises"
+    ]
+    assert check_worksheet(worksheet(complete["exercises"]), plan).is_compliant
+
+    broken = worksheet(
+        [sub_exercise("Plural"), sub_exercise("Plural", 2), mc_exercise("Plural"), mc_exercise("Plural")]
+        + [sub_exercise("Artikel"), sub_exercise("Verben")]
+    )
+    report = check_worksheet(broken, plan)
+
+    assert report.missing == [("Plural", TYPES[0], 1), ("Artikel", TYPES[0], 1), ("Artikel", TYPES[1], 1)]
+    assert report.rejected == [1, 3, 5]
+    assert len(report.issues) == 3
+
+
+def test_reparatur_prompt_und_einfuegen():
+    """Teste, dass nur die fehlenden Aufgaben angefordert und passend eingefügt werden"""
+    plan = plan_for_request("3", "Nomen", "Plural, Artikel", TYPES)
+    broken = worksheet(
+        [sub_exercise("Plural"), sub_exercise("Plural", 1), mc_exercise("Plural")] + [mc_exercise("Artikel")]
+    )
+    report = check_worksheet(broken, plan)
+
+    prompt = PromptGenerator().create_repair_prompt("4. Klasse", "Deutsch", "Nomen", report.missing)
+    assert "Plural | Sortieren/Zuordnen | 1\nArtikel | Sortieren/Zuordnen | 2" in prompt
+    assert "Fehlende Aufgaben (3;" in prompt
+
+    answer = worksheet(
+        [sub_exercise("Artikel"), sub_exercise("PLURAL"), sub_exercise("Artikel"), sub_exercise("Artikel")]
+    )
+    repaired = splice_repair(broken, report, answer)
+
+    assert [e.subtopic for e in repaired.exercises] == ["Plural", "Plural", "Plural", "Artikel", "Artikel", "Artikel"]
+    assert [e.id for e in repaired.exercises] == [1, 2, 3, 4, 5, 6]
+    assert check_worksheet(repaired, plan).is_compliant
+
+
+def test_reparatur_ueber_llm():
+    """Teste die Reparaturschleife mit dem Stub-Server"""
+    plan = plan_for_request("2", "Nomen", "", ["Sortieren/Zuordnen"])
+    answer = json.dumps(worksheet([sub_exercise("Allgemein")]))
+
+    async def repair(broken):
+        server = await StubLLMServer(response=answer).start(port=0)
+        try:
+            async with LLMClient(f"http://127.0.0.1:{server.port}/v1/chat/completions") as client:
+                result = await repair_worksheet(client, broken, plan, "4. Klasse", "Deutsch", "Nomen")
+            return result, server.requests
+        finally:
+            await server.close()
+
+    (repaired, report), requests = asyncio.run(repair(worksheet([sub_exercise("Allgemein", 7)])))
+
+    assert report.is_compliant
+    assert requests == 2
+    assert len(repaired.exercises) == 2
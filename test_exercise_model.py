@@ -0,0 +1,67 @@
+"""
+Test Script für das Aufgaben-Datenmodell
+
+Testet das einmalige Parsen und Validieren der JSON-Daten
+"""
+
+import json
+import pickle
+
+import pytest
+
+from exercise_model import Worksheet, merge_worksheets, parse_worksheet
+from pdf_generator import create_sample_json
+
+
+def test_parse_beispiel():
+    """Teste das Parsen des Beispiel-JSON"""
+    worksheet = parse_worksheet(create_sample_json())
+
+    assert worksheet.metadata.topic == "Nomen"
+    assert worksheet.metadata.subtopics == ("Plural", "Artikel", "Merkwörter")
+    first, second = worksheet.exercises
+    assert first.has_sub_questions
+    assert first.sub_questions[0].answer == "Katzen, Mäuse, Hunde (unterstrichen)"
+    assert not second.has_sub_questions
+    assert second.multiple_choice.options == ("der", "die", "das")
+    assert list(worksheet.exercises_by_subtopic()) == ["Plural", "Artikel"]
+
+
+def test_roundtrip_und_pickle():
+    """Teste, dass das Modell verlustfrei zurück in JSON und über Prozessgrenzen geht"""
+    data = create_sample_json()
+    worksheet = parse_worksheet(data)
+
+    assert worksheet.to_dict() == data
+    assert pickle.loads(pickle.dumps(worksheet)).to_dict() == data
+    assert parse_worksheet(worksheet) is worksheet
+
+
+def test_fehlermeldungen():
+    """Teste die Fehlermeldungen bei ungültigen Daten"""
+    data = create_sample_json()
+    del data["exercises"][1]["answer"]
+
+    with pytest.raises(ValueError, match=r"\$\.exercises\[1\]: missing required field 'answer'"):
+        Worksheet.from_dict(data)
+
+    with pytest.raises(ValueError, match="Invalid JSON format"):
+        parse_worksheet("{kein json")
+
+
+def test_arbeitsblaetter_zusammenfuehren():
+    """Teste das Zusammenführen von Teil-Arbeitsblättern mit neuer Nummerierung"""
+    first = create_sample_json()
+    second = create_sample_json()
+    second["metadata"]["subtopics"] = ["Artikel", "Wortfamilien"]
+    second["exercises"][0]["subtopic"] = "Wortfamilien"
+
+    merged = merge_worksheets([first, json.dumps(second)])
+
+    assert [exercise.id for exercise in merged.exercises] == [1, 2, 3, 4]
+    assert merged.metadata.subtopics == ("Plural", "Artikel", "Merkwörter", "Wortfamilien")
+    assert merged.exercises[2].subtopic == "Wortfamilien"
+    assert first["exercises"][0]["id"] == 1 and second["exercises"][1]["id"] == 2
+
+    with pytest.raises(ValueError):
+        merge_worksheets([])
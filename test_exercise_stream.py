@@ -0,0 +1,64 @@
+"""
+Test Script für das Einlesen großer Dokumente Aufgabe für Aufgabe
+
+Testet JSON- und JSONL-Dateien, ungewöhnliche Schlüsselreihenfolge und Fehler in einzelnen Aufgaben
+"""
+
+import json
+
+import pytest
+
+import exercise_stream
+from benchmark_corpus import generate_worksheet, write_worksheet_file
+from exercise_model import parse_worksheet
+from exercise_stream import open_exercise_stream
+from worksheet_schema import WorksheetValidationError
+
+
+@pytest.mark.parametrize("filename", ["blatt.json", "blatt.jsonl"])
+def test_aufgaben_wie_parse_worksheet(tmp_path, monkeypatch, filename):
+    """Teste, dass gestreamte Aufgaben denen von parse_worksheet entsprechen (auch mit winzigem Lesepuffer)"""
+    monkeypatch.setattr(exercise_stream, "READ_CHUNK_SIZE", 7)
+    path = str(tmp_path / filename)
+    write_worksheet_file(path, 40, seed=2)
+
+    metadata, exercises = open_exercise_stream(path)
+    streamed = [exercise.to_dict() for exercise in exercises]
+
+    if filename.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        expected = parse_worksheet({"metadata": lines[0]["metadata"], "exercises": lines[1:]})
+    else:
+        with open(path, encoding="utf-8") as f:
+            expected = parse_worksheet(f.read())
+    assert metadata.to_dict() == expected.metadata.to_dict()
+    assert streamed == [exercise.to_dict() for exercise in expected.exercises]
+
+
+def test_metadaten_nach_aufgaben(tmp_path):
+    """Teste Dokumente, in denen die Aufgaben vor den Metadaten stehen"""
+    data = generate_worksheet(5, seed=1)
+    path = tmp_path / "umgekehrt.json"
+    path.write_text(json.dumps({"exercises": data["exercises"], "metadata": data["metadata"]}), encoding="utf-8")
+
+    metadata, exercises = open_exercise_stream(str(path))
+
+    assert metadata.topic == data["metadata"]["topic"]
+    assert [exercise.id for exercise in exercises] == [1, 2, 3, 4, 5]
+
+
+def test_fehlerhafte_aufgabe(tmp_path):
+    """Teste, dass eine ungültige Aufgabe mit ihrem JSON-Pfad gemeldet wird"""
+    data = generate_worksheet(3, seed=1)
+    del data["exercises"][2]["question"]
+    path = tmp_path / "fehler.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    _, exercises = open_exercise_stream(str(path))
+    with pytest.raises(WorksheetValidationError, match=r"\$\.exercises\[2\]"):
+        list(exercises)
+
+    path.write_text('{"metadata": {"topic": "Nomen"}, "exercises": []}', encoding="utf-8")
+    with pytest.raises(WorksheetValidationError, match="grade"):
+        open_exercise_stream(str(path))
@@ -0,0 +1,65 @@
+"""
+Test Script für die Flowable-Fabrik
+
+Testet geteilte Abstände, den begrenzten Cache für geparste Absätze und
+dass das PDF mit Cache byte-gleich bleibt, auch bei gleichzeitigen Builds
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark_corpus import generate_worksheet
+from flowable_factory import FlowableFactory
+from pdf_generator import PDFGenerator, create_sample_json
+
+
+def test_geteilte_abstaende_und_absaetze():
+    """Teste, dass Abstände geteilt und Absätze neu erzeugt, aber nur einmal geparst werden"""
+    factory = FlowableFactory(PDFGenerator().styles, cache_size=2)
+    assert factory.spacer(10) is factory.spacer(10)
+    assert factory.spacer(10) is not factory.spacer(20)
+    # Jeder Thread hat eigene Abstände
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(factory.spacer, 10).result() is not factory.spacer(10)
+
+    first = factory.paragraph("<b>Lösung:</b> Hund", "Answer")
+    second = factory.paragraph("<b>Lösung:</b> Hund", "Answer")
+    assert first is not second
+    assert second.frags is first.frags
+    assert second.style is factory.styles["Answer"]
+    assert factory.paragraph("<b>Lösung:</b> Hund", "Normal").frags is not first.frags
+
+    # Der älteste Eintrag fällt aus dem Cache
+    factory.paragraph("Katze", "Normal")
+    assert factory.paragraph("<b>Lösung:</b> Hund", "Answer").frags is not first.frags
+
+
+def test_pdf_mit_cache_unveraendert():
+    """Teste, dass wiederverwendete Parse-Ergebnisse dasselbe PDF ergeben wie frisch geparste Absätze"""
+    json_data = create_sample_json()
+    generator = PDFGenerator()
+    generator.factory = FlowableFactory(generator.styles, cache_size=0)
+    uncached = generator.render_pdfs_to_bytes(json_data)
+
+    generator = PDFGenerator()
+    generator.render_pdfs_to_bytes(json_data)
+    # Zweiter Lauf mit gefülltem Cache
+    assert generator.render_pdfs_to_bytes(json_data) == uncached
+
+
+def test_gleichzeitige_builds():
+    """Teste, dass mehrere Threads mit einem Generator gleichzeitig dieselben PDFs rendern können"""
+    json_data = generate_worksheet(60, seed=3)
+    generator = PDFGenerator()
+    expected = generator.render_pdfs_to_bytes(json_data)
+
+    # Häufige Threadwechsel, damit sich die Builds wirklich überlappen
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(generator.render_pdfs_to_bytes, json_data) for _ in range(8)]
+            results = [future.result() for future in futures]
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert all(result == expected for result in results)
@@ -0,0 +1,81 @@
+"""
+Test Script für das Rendern im Hintergrund-Thread
+
+Testet den Render-Worker der JSON → PDF Oberfläche ohne Tk-Fenster
+"""
+
+import json
+import queue
+import threading
+from types import SimpleNamespace
+
+from json_import_ui import JSONImportUI
+from pdf_generator import PDFGenerator, create_sample_json
+
+
+def run_worker(tmp_path, json_string, cancel=False, cancel_before_solution=False):
+    """Führe den Render-Worker aus und gib alle Queue-Nachrichten zurück"""
+    ui = SimpleNamespace(
+        render_queue=queue.Queue(),
+        cancel_event=threading.Event(),
+        pdf_generator=PDFGenerator(),
+        render_cache=None,
+    )
+    ui._format_validation_errors = lambda e: JSONImportUI._format_validation_errors(ui, e)
+    if cancel:
+        ui.cancel_event.set()
+    if cancel_before_solution:
+        # Abbruch, nachdem das Übungsblatt schon geschrieben ist
+        generate_solution_sheet = ui.pdf_generator._generate_solution_sheet
+
+        def cancel_then_generate(*args):
+            ui.cancel_event.set()
+            return generate_solution_sheet(*args)
+
+        ui.pdf_generator._generate_solution_sheet = cancel_then_generate
+
+    JSONImportUI._render_worker(ui, json_string, str(tmp_path))
+
+    messages = []
+    while not ui.render_queue.empty():
+        messages.append(ui.render_queue.get())
+    return messages
+
+
+def test_worker_fortschritt(tmp_path):
+    """Teste Fortschrittsmeldungen und Zeitaufschlüsselung"""
+    messages = run_worker(tmp_path, json.dumps(create_sample_json()))
+
+    phases = {(m[1], m[2]) for m in messages if m[0] == "progress"}
+    assert ("parse", None) in phases
+    assert ("validate", None) in phases
+    assert ("story", "exercise") in phases
+    assert ("page", "solution") in phases
+
+    final = messages[-1]
+    assert final[0] == "done"
+    assert ("layout", "exercise") in final[3]
+
+
+def test_worker_abbruch(tmp_path):
+    """Teste den Abbruch über das Cancel-Event"""
+    assert run_worker(tmp_path, json.dumps(create_sample_json()), cancel=True) == [("cancelled",)]
+
+
+def test_worker_abbruch_nach_uebungsblatt(tmp_path):
+    """Teste, dass nach einem Abbruch kein einzelnes Übungsblatt zurückbleibt"""
+    messages = run_worker(tmp_path, json.dumps(create_sample_json()), cancel_before_solution=True)
+
+    assert messages[-1] == ("cancelled",)
+    assert list(tmp_path.glob("*.pdf")) == []
+
+
+def test_worker_validierungsfehler(tmp_path):
+    """Teste, dass Validierungsfehler als Fehlermeldung zurückkommen"""
+    data = create_sample_json()
+    del data["metadata"]
+
+    final = run_worker(tmp_path, json.dumps(data))[-1]
+
+    assert final[0] == "error"
+    assert "$: missing required field 'metadata'" in final[2]
@@ -0,0 +1,131 @@
+"""
+Test Script für den LLM-Client
+
+Testet Verbindungs-Pool, Parallelitätsgrenze, Wiederholungen und Streaming gegen den lokalen Stub-Server
+"""
+
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from exercise_model import parse_worksheet
+from llm_client import LLMClient, LLMError, _parse_retry_after, extract_json, generate_pdfs_from_prompts
+from question_bank import QuestionBank
+
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_viele_prompts_mit_pool(stream, run_with_stub):
+    """Teste, dass viele Prompts über wenige Keep-Alive-Verbindungen beantwortet werden"""
+
+    async def send(url):
+        async with LLMClient(url, max_concurrency=3, stream=stream) as client:
+            answers = await client.complete_many([f"Prompt {i}" for i in range(12)])
+            return answers, client.pool.opened
+
+    (answers, opened), server = run_with_stub(send, exercises=4, chunk_size=50)
+
+    assert server.requests == 12
+    assert opened <= 3
+    assert server.connections == opened
+    assert answers[0] == server.answer_for("Prompt 0")
+    assert len(parse_worksheet(answers[5]).exercises) == 4
+
+
+def test_wiederholung_und_fehler(run_with_stub):
+    """Teste Wiederholungen bei 503 und den Fehler nach allen Versuchen"""
+
+    async def send(url):
+        async with LLMClient(url, max_retries=2, backoff_seconds=0) as client:
+            return await client.generate_worksheet("Prompt")
+
+    worksheet, server = run_with_stub(send, fail_first=2)
+    assert server.requests == 3
+    assert worksheet.exercises
+
+    with pytest.raises(LLMError):
+        run_with_stub(send, fail_first=3)
+
+
+def test_retry_after():
+    """Teste Retry-After in Sekunden, als HTTP-Datum und unlesbar (dann normaler Backoff)"""
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert _parse_retry_after("2") == 2.0
+    assert 0 < _parse_retry_after(later) <= 30
+    assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert _parse_retry_after("bald") is None
+    assert _parse_retry_after(None) is None
+
+
+def test_prompts_zu_pdfs(tmp_path, run_with_stub):
+    """Teste die Pipeline von Prompt (auch in Teilen) bis zum PDF"""
+
+    async def send(url):
+        async with LLMClient(url) as client:
+            prompts = [("einzeln", "Prompt A"), ("geteilt", ["Teil 1", "Teil 2"])]
+            return await generate_pdfs_from_prompts(client, prompts, str(tmp_path))
+
+    results, server = run_with_stub(send, exercises=3)
+
+    assert [result["ok"] for result in results] == [True, True]
+    assert server.requests == 3
+    assert all(os.path.exists(result["exercise_pdf"]) for result in results)
+
+    async def send_invalid(url):
+        async with LLMClient(url) as client:
+            return await generate_pdfs_from_prompts(client, [("kaputt", "Prompt")], str(tmp_path))
+
+    (result,), _ = run_with_stub(send_invalid, response="Leider kann ich das nicht.")
+    assert not result["ok"]
+    assert "kein JSON" in result["error"]
+
+
+def test_prompts_zu_pdfs_mit_fragenbank(tmp_path, run_with_stub):
+    """Teste, dass die Fragenbank außerhalb der Event-Loop schreibt und ein Fehler nur sein Blatt betrifft"""
+
+    class FlakyBank(QuestionBank):
+        def add_worksheet(self, json_data):
+            self.threads.add(threading.get_ident())
+            self.calls += 1
+            if self.calls == 2:
+                raise sqlite3.OperationalError("database is locked")
+            return super().add_worksheet(json_data)
+
+    bank = FlakyBank(":memory:")
+    bank.threads, bank.calls = set(), 0
+
+    async def send(url):
+        async with LLMClient(url, max_concurrency=1) as client:
+            prompts = [(f"blatt_{number}", f"Prompt {number}") for number in range(3)]
+            return await generate_pdfs_from_prompts(client, prompts, str(tmp_path), bank=bank)
+
+    with bank:
+        results, _ = run_with_stub(send, exercises=2)
+        assert [result["ok"] for result in results].count(False) == 1
+        assert "database is locked" in [result["error"] for result in results if not result["ok"]][0]
+        assert threading.get_ident() not in bank.threads
+        assert bank.count() > 0
+
+
+def test_prompts_zu_pdfs_mit_threads(tmp_path, run_with_stub):
+    """Teste gleichzeitiges Rendern in einem Thread-Pool, jeder Thread nutzt seinen eigenen Generator"""
+
+    async def send(url):
+        async with LLMClient(url) as client:
+            prompts = [(f"blatt_{number}", f"Prompt {number}") for number in range(6)]
+            return await generate_pdfs_from_prompts(client, prompts, str(tmp_path), executor=executor)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results, _ = run_with_stub(send, exercises=20)
+
+    assert all(result["ok"] for result in results), [result["error"] for result in results]
+    assert all(os.path.getsize(result["solution_pdf"]) > 0 for result in results)
+
+
+def test_json_aus_antwort():
+    """Teste das Herausschneiden des JSON aus Code-Blöcken"""
+    assert extract_json('Hier:\n```json\n{"a": {"b": 1}}\n```') == '{"a": {"b": 1}}'
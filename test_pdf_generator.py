@@ -0,0 +1,235 @@
+"""
+Test Script für den PDF-Generator
+
+Testet die verschiedenen Render-Modi des PDF-Generators
+"""
+
+import json
+import os
+import re
+import time
+import tracemalloc
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from reportlab.lib.rl_accel import asciiBase85Decode
+
+from benchmark_corpus import generate_worksheet, write_worksheet_file
+from exercise_model import parse_worksheet
+import pdf_generator
+from pdf_generator import PDFGenerator, create_sample_json, split_at_subtopics
+from pdf_merge import _PdfSource
+from render_cache import RenderCache
+
+
+def test_parallele_blaetter(tmp_path):
+    """Teste das parallele Rendern von Übungs- und Lösungsblatt"""
+    generator = PDFGenerator()
+
+    exercise_pdf, solution_future = generator.generate_pdfs_concurrently(
+        create_sample_json(), str(tmp_path / "parallel")
+    )
+
+    assert os.path.getsize(exercise_pdf) > 0
+    solution_pdf = solution_future.result(timeout=60)
+    assert os.path.getsize(solution_pdf) > 0
+    assert "_loesungsblatt_" in solution_pdf
+
+
+def test_parallel_flag(tmp_path):
+    """Teste generate_pdfs_from_json mit parallel=True"""
+    generator = PDFGenerator()
+
+    exercise_pdf, solution_pdf = generator.generate_pdfs_from_json(
+        create_sample_json(), str(tmp_path / "flag"), parallel=True
+    )
+
+    assert os.path.exists(exercise_pdf)
+    assert os.path.exists(solution_pdf)
+
+
+def _failing_exercise_sheet(sheet, worksheet, output_path):
+    """Ersatz für den Worker: Das Übungsblatt schlägt fehl, das Lösungsblatt wird etwas später geschrieben"""
+    if sheet == "exercise":
+        raise RuntimeError("Übungsblatt fehlgeschlagen")
+    time.sleep(0.2)
+    with open(output_path, "wb") as f:
+        f.write(b"%PDF-1.4")
+    return output_path
+
+
+def test_parallel_fehler_im_uebungsblatt(tmp_path, monkeypatch):
+    """Teste, dass ein Fehler im Übungsblatt parallel gemeldet wird und keine PDFs zurückbleiben"""
+    executor = ThreadPoolExecutor(max_workers=2)
+    submit_sheets = PDFGenerator._submit_sheets
+    monkeypatch.setattr(pdf_generator, "_render_sheet_in_process", _failing_exercise_sheet)
+    monkeypatch.setattr(
+        PDFGenerator, "_submit_sheets", lambda self, *args: submit_sheets(self, *args[:3], executor=executor)
+    )
+    generator = PDFGenerator()
+
+    with pytest.raises(RuntimeError, match="Übungsblatt"):
+        generator.generate_pdfs_from_json(create_sample_json(), str(tmp_path / "flag"), parallel=True)
+    with pytest.raises(RuntimeError, match="Übungsblatt"):
+        generator.generate_pdfs_concurrently(create_sample_json(), str(tmp_path / "concurrent"), executor)
+
+    executor.shutdown(wait=True)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_deterministische_ausgabe(tmp_path):
+    """Teste, dass gleiche Daten byte-identische PDFs ergeben"""
+    generator = PDFGenerator()
+
+    first = generator.generate_pdfs_from_json(create_sample_json(), str(tmp_path / "a"))
+    second = generator.generate_pdfs_from_json(create_sample_json(), str(tmp_path / "b"))
+
+    for first_pdf, second_pdf in zip(first, second):
+        with open(first_pdf, "rb") as f1, open(second_pdf, "rb") as f2:
+            assert f1.read() == f2.read()
+
+
+def test_render_cache(tmp_path, monkeypatch):
+    """Teste Cache-Treffer und LRU-Verdrängung des Render-Caches"""
+    generator = PDFGenerator()
+    cache = RenderCache(str(tmp_path / "cache"))
+    data = create_sample_json()
+
+    first = generator.generate_pdfs_from_json(data, str(tmp_path / "blatt"), cache=cache)
+
+    # Bei einem Treffer wird nicht neu gerendert
+    def fail(*args):
+        raise AssertionError("Cache-Treffer erwartet")
+
+    monkeypatch.setattr(generator, "_generate_exercise_sheet", fail)
+    second = generator.generate_pdfs_from_json(data, str(tmp_path / "blatt"), cache=cache)
+    assert first == second
+
+    # Ein zu kleines Limit verdrängt alte Einträge
+    cache.max_bytes = 0
+    cache.evict()
+    assert cache.get(cache.make_key(data, generator.render_fingerprint())) is None
+
+
+def test_cache_eintrag_verdraengt_vor_kopie(tmp_path, monkeypatch):
+    """Teste, dass ein zwischen Nachschlagen und Kopieren verdrängter Eintrag als Fehltreffer gilt"""
+    generator = PDFGenerator()
+    cache = RenderCache(str(tmp_path / "cache"))
+    data = create_sample_json()
+    generator.generate_pdfs_from_json(data, str(tmp_path / "erst"), cache=cache)
+
+    lookup = cache.get
+
+    def get_then_evict(key):
+        paths = lookup(key)
+        cache.clear()
+        return paths
+
+    monkeypatch.setattr(cache, "get", get_then_evict)
+    exercise_pdf, solution_pdf = generator.generate_pdfs_from_json(data, str(tmp_path / "dann"), cache=cache)
+    assert os.path.getsize(exercise_pdf) > 0 and os.path.getsize(solution_pdf) > 0
+
+
+def test_render_in_memory(tmp_path):
+    """Teste das Rendern in den Speicher ohne Dateizugriff"""
+    generator = PDFGenerator()
+
+    exercise_bytes, solution_bytes = generator.render_pdfs_to_bytes(create_sample_json())
+
+    assert exercise_bytes.startswith(b"%PDF")
+    assert solution_bytes.startswith(b"%PDF")
+
+    # Gleiche Bytes wie beim Schreiben in Dateien
+    exercise_pdf, solution_pdf = generator.generate_pdfs_from_json(create_sample_json(), str(tmp_path / "datei"))
+    with open(exercise_pdf, "rb") as f:
+        assert f.read() == exercise_bytes
+    with open(solution_pdf, "rb") as f:
+        assert f.read() == solution_bytes
+
+
+def test_profiling_report(tmp_path, monkeypatch):
+    """Teste den Profiling-Report und den cProfile-Dump per Umgebungsvariable"""
+    profile_path = tmp_path / "render.prof"
+    monkeypatch.setenv("PDF_PROFILE_OUTPUT", str(profile_path))
+    generator = PDFGenerator()
+
+    exercise_pdf, solution_pdf, report = generator.generate_pdfs_from_json(
+        json.dumps(create_sample_json()), str(tmp_path / "profil"), profile=True
+    )
+
+    phases = [(entry["phase"], entry["sheet"]) for entry in report["phases"]]
+    assert phases == [
+        ("parse", None),
+        ("validate", None),
+        ("story", "exercise"),
+        ("build", "exercise"),
+        ("story", "solution"),
+        ("build", "solution"),
+    ]
+    assert all(entry["peak_memory_bytes"] > 0 for entry in report["phases"])
+    assert report["counters"]["exercise"]["pages"] == 1
+    assert report["counters"]["solution"]["flowables"] > report["counters"]["exercise"]["flowables"] > 0
+    assert profile_path.exists()
+
+
+def test_profiling_ohne_reset_peak(tmp_path, monkeypatch):
+    """Teste den Profiling-Report unter Python < 3.9 (tracemalloc ohne reset_peak)"""
+    monkeypatch.delattr(tracemalloc, "reset_peak")
+    _, _, report = PDFGenerator().generate_pdfs_from_json(create_sample_json(), str(tmp_path / "alt"), profile=True)
+    assert all(entry["peak_memory_bytes"] > 0 for entry in report["phases"])
+
+
+def _page_contents(path):
+    """Entpackte Seiteninhalte einer PDF, Schriftnamen (F1, F2, ...) vereinheitlicht"""
+    with open(path, "rb") as f:
+        pdf = _PdfSource(f.read())
+    contents = []
+    for page in pdf.pages():
+        body, _ = pdf.read_object(page)
+        _, stream = pdf.read_object(int(re.search(rb"/Contents (\d+)", body).group(1)))
+        contents.append(re.sub(rb"/F\d+", b"/F", zlib.decompress(asciiBase85Decode(stream))))
+    return contents
+
+
+def _exercise_numbers(path):
+    """Aufgabennummern in Seitenreihenfolge"""
+    return [int(number) for content in _page_contents(path) for number in re.findall(rb"\((\d+)\.\)", content)]
+
+
+def test_rendern_in_teilen(tmp_path):
+    """Teste das Aufteilen an Unterthemen-Grenzen und die durchgehende Nummerierung der zusammengefügten PDFs"""
+    data = generate_worksheet(60, seed=3)
+    worksheet = parse_worksheet(data)
+
+    parts = split_at_subtopics(worksheet, 3)
+    assert 1 < len(parts) <= 3
+    assert [number for _, number in parts][0] == 1
+    assert sum(len(part.exercises) for part, _ in parts) == 60
+    for (part, number), (_, next_number) in zip(parts, parts[1:]):
+        assert number + len(part.exercises) == next_number
+
+    # Kein Unterthema wird auf zwei Teile verteilt
+    subtopics = [set(part.exercises_by_subtopic()) for part, _ in parts]
+    assert sum(len(names) for names in subtopics) == len(set().union(*subtopics))
+
+    for path in PDFGenerator().generate_pdfs_in_chunks(data, str(tmp_path / "teile"), chunks=3):
+        assert _exercise_numbers(path) == list(range(1, 61))
+
+
+def test_streaming_wie_einzelner_durchlauf(tmp_path):
+    """Teste, dass das Streaming-Rendern in Segmenten dieselben Seiten ergibt wie ein einzelner Durchlauf"""
+    path = str(tmp_path / "gross.jsonl")
+    write_worksheet_file(path, 80, seed=4)
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    generator = PDFGenerator()
+
+    regular = generator.generate_pdfs_from_json(
+        {"metadata": lines[0]["metadata"], "exercises": lines[1:]}, str(tmp_path / "regulaer")
+    )
+    streamed = generator.generate_pdfs_streaming(path, str(tmp_path / "stream"), segment_pages=3)
+
+    for regular_pdf, streamed_pdf in zip(regular, streamed):
+        assert _exercise_numbers(streamed_pdf) == list(range(1, 81))
+        assert _page_contents(streamed_pdf) == _page_contents(regular_pdf)
@@ -0,0 +1,47 @@
+"""
+Test Script für das Zusammenfügen von PDFs
+
+Testet Seitenreihenfolge, gültige Querverweise und Fehlermeldungen von pdf_merge
+"""
+
+import pytest
+
+from pdf_generator import PDFGenerator, create_sample_json
+from pdf_merge import _PdfSource, merge_pdf_bytes, merge_pdfs
+
+
+def test_seiten_in_reihenfolge(tmp_path):
+    """Teste, dass die Seiten aller Quellen in Reihenfolge im Ergebnis stehen"""
+    exercise_bytes, solution_bytes = PDFGenerator().render_pdfs_to_bytes(create_sample_json())
+    solution_path = tmp_path / "loesung.pdf"
+    solution_path.write_bytes(solution_bytes)
+
+    output_path = tmp_path / "gesamt.pdf"
+    assert merge_pdfs([exercise_bytes, str(solution_path), exercise_bytes], str(output_path)) == 3
+
+    merged = _PdfSource(output_path.read_bytes())
+    # Jeder Querverweis zeigt auf den Anfang seines Objekts
+    for number, offset in merged.offsets.items():
+        assert merged.data.startswith(b"%d 0 obj" % number, offset)
+
+    # Seiteninhalte bleiben unverändert und in Eingabereihenfolge
+    contents = []
+    for page in merged.pages():
+        body, _ = merged.read_object(page)
+        assert b"/Parent 2 0 R" in body
+        contents.append(merged.read_object(int(body.split(b"/Contents ")[1].split()[0]))[1])
+
+    expected = []
+    for source in (exercise_bytes, solution_bytes, exercise_bytes):
+        pdf = _PdfSource(source)
+        body, _ = pdf.read_object(pdf.pages()[0])
+        expected.append(pdf.read_object(int(body.split(b"/Contents ")[1].split()[0]))[1])
+    assert contents == expected
+
+
+def test_ungueltige_eingaben():
+    """Teste die Fehlermeldungen für leere Listen und Nicht-PDFs"""
+    with pytest.raises(ValueError):
+        merge_pdf_bytes([])
+    with pytest.raises(ValueError, match="Keine PDF-Datei"):
+        merge_pdf_bytes([b"kein pdf"])
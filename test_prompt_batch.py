@@ -0,0 +1,64 @@
+"""
+Test Script für die Prompt-Matrix
+
+Testet die Lehrplan-Expansion, stabile IDs und das JSONL-Streaming
+"""
+
+import io
+import json
+
+import pytest
+
+from prompt_batch import iter_prompt_requests, load_curriculum_spec, write_prompt_matrix
+
+SPEC = {
+    "grades": ["3. Klasse", "7. Klasse"],
+    "subjects": ["Mathematik", "Deutsch"],
+    "types": ["Rechenaufgaben", "Erkennen/Unterstreichen", "Ankreuzen (Multiple Choice)"],
+    "count": 3,
+    "topics": [
+        {"topic": "Nomen", "subtopics": "Plural, Artikel", "subjects": ["Deutsch"]},
+        {"topic": "Brüche", "types": ["Rechenaufgaben"]},
+    ],
+}
+
+
+def test_matrix_expansion():
+    """Teste, dass ungültige Fach/Typ-Kombinationen übersprungen werden"""
+    requests = list(iter_prompt_requests(SPEC))
+
+    # Nomen: 2 Klassen × Deutsch; Brüche: 2 Klassen × Mathematik (Deutsch hat keine Rechenaufgaben)
+    assert [(r["topic"], r["subject"]) for r in requests] == [("Nomen", "Deutsch")] * 2 + [("Brüche", "Mathematik")] * 2
+    assert requests[0]["types"] == ["Erkennen/Unterstreichen", "Ankreuzen (Multiple Choice)"]
+    assert requests[0]["subtopics"] == ["Plural", "Artikel"]
+
+    ids = [r["id"] for r in requests]
+    assert len(set(ids)) == len(ids)
+    assert ids == [r["id"] for r in iter_prompt_requests(SPEC)]
+
+
+def test_matrix_jsonl_mit_pool():
+    """Teste, dass der Prozess-Pool dieselben Zeilen in derselben Reihenfolge liefert"""
+    serial, parallel = io.StringIO(), io.StringIO()
+
+    summary = write_prompt_matrix(SPEC, serial, workers=1)
+    write_prompt_matrix(SPEC, parallel, workers=2)
+
+    assert (summary["total"], summary["succeeded"], summary["failed"]) == (4, 4, 0)
+    assert summary["tokens"] > 0
+    assert serial.getvalue() == parallel.getvalue()
+    first = json.loads(serial.getvalue().splitlines()[0])
+    assert '„Nomen" (Schwerpunkte: Plural, Artikel)' in first["prompt"]
+
+
+def test_yaml_lehrplan(tmp_path):
+    """Teste das Laden eines YAML-Lehrplans (nur mit dem optionalen PyYAML)"""
+    pytest.importorskip("yaml")
+    spec_path = tmp_path / "lehrplan.yaml"
+    spec_path.write_text("subjects: [Latein]\ngrades: [5. Klasse]\ntopics:\n  - Deklination\n", encoding="utf-8")
+
+    requests = list(iter_prompt_requests(load_curriculum_spec(str(spec_path))))
+
+    assert len(requests) == 1
+    assert requests[0]["topic"] == "Deklination"
+    assert "Kurzantwort: Bestimme Eigenschaften" in requests[0]["types"]
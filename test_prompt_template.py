@@ -0,0 +1,92 @@
+"""
+Test Script für das vorkompilierte Prompt-Template
+
+Testet, dass Segmente und Caches exakt denselben Prompt liefern wie str.format
+"""
+
+from config import JSON_PROMPT_TEMPLATE, MULTIPLE_CHOICE_TYPE
+from create_prompt import JSON_PROMPT_SEGMENTS, PromptGenerator, compile_template, estimate_tokens, render_template
+from prompt_batch import iter_prompt_requests
+
+FIELDS = {
+    "topic_text": '„Brüche" {mit Klammern}',
+    "grade": "6. Klasse",
+    "subject": "Mathematik",
+    "exercise_type_details": "• Rechenaufgaben: {x}",
+    "distribution_info": "Insgesamt 10 Aufgaben",
+    "language_instruction": "Sprache: Deutsch",
+    "subtopic_instructions": "}{",
+    "grade_level": "altersgerechte",
+    "num_questions": 5,
+}
+
+
+def test_segmente_wie_format():
+    """Teste, dass das vorkompilierte Template identisch zu str.format ist"""
+    assert render_template(JSON_PROMPT_SEGMENTS, FIELDS) == JSON_PROMPT_TEMPLATE.format(**FIELDS)
+    assert render_template(compile_template("{{a}} {b}!"), {"b": 1}) == "{a} 1!"
+
+
+def test_prompt_cache_identisch():
+    """Teste, dass der Prompt-Cache für alle Lehrplan-Kombinationen denselben Prompt liefert"""
+    spec = {"count": 4, "topics": [{"topic": "Wortarten", "subtopics": "Nomen, Verben"}, {"topic": "Zeiten"}]}
+    plain, cached = PromptGenerator(), PromptGenerator(prompt_cache_size=64)
+
+    for request in iter_prompt_requests(spec):
+        args = (
+            str(request["count"]),
+            request["grade"],
+            request["subject"],
+            request["topic"],
+            ", ".join(request["subtopics"]),
+            request["types"],
+        )
+        expected = plain.create_json_prompt_template(*args)
+        assert cached.create_json_prompt_template(*args) == expected
+        # Second call is served from the cache, whitespace variants share the entry
+        padded = args[:3] + (f"  {args[3]} ", f" {args[4]}  ", list(args[5]))
+        assert cached.create_json_prompt_template(*padded) == expected
+
+
+def test_kompakter_prompt():
+    """Teste, dass der kompakte Prompt jede Regel einmal nennt und den Plan als Tabelle enthält"""
+    generator = PromptGenerator()
+    args = ("5", "4. Klasse", "Deutsch", "Nomen", "Plural, Artikel", ["Erkennen/Unterstreichen", "Sortieren/Zuordnen"])
+
+    full = generator.create_json_prompt_template(*args)
+    compact = generator.create_json_prompt_template(*args, compact=True)
+
+    assert "Unterthema | T1 | T2\nPlural | 3 | 2\nArtikel | 3 | 2" in compact
+    assert "Plan (10 Aufgaben" in compact
+    assert compact.count("3-5") == 1
+    assert compact.count("30%") == 1
+    assert estimate_tokens(compact) < estimate_tokens(full) / 2
+
+    # Ohne Unterthemen gilt die Anzahl pro Aufgabentyp (wie im vollständigen Prompt)
+    assert "Gesamt | 5 | 5" in generator.create_json_prompt_template(*args[:4], "", args[5], compact=True)
+
+    # Das Beispiel für Multiple Choice nutzt den Typnamen aus der Konfiguration, auch im Reparatur-Prompt
+    repair = generator.create_repair_prompt("4. Klasse", "Deutsch", "Nomen", [("Plural", MULTIPLE_CHOICE_TYPE, 1)])
+    assert f'"type": "{MULTIPLE_CHOICE_TYPE}"' in compact
+    assert f'"type": "{MULTIPLE_CHOICE_TYPE}"' in repair
+
+
+def test_token_schaetzung():
+    """Teste die Token-Schätzung für Wörter und Satzzeichen"""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Die Bäume, grün!") == 6
+    assert estimate_tokens("Übungsaufgaben") == 4
+
+
+def test_prompt_aufteilen():
+    """Teste das Aufteilen vieler Unterthemen auf mehrere Prompts"""
+    generator = PromptGenerator()
+    subtopics = ", ".join(f"Thema {i}" for i in range(1, 6))
+
+    shards = generator.create_sharded_prompts("4", "5. Klasse", "Deutsch", "Wortarten", subtopics, ["Kurzantwort"], 2)
+
+    assert [group for group, _ in shards] == [["Thema 1", "Thema 2", "Thema 3"], ["Thema 4", "Thema 5"]]
+    assert shards[1][1] == generator.create_json_prompt_template(
+        "4", "5. Klasse", "Deutsch", "Wortarten", "Thema 4, Thema 5", ["Kurzantwort"]
+    )
+    assert len(generator.create_sharded_prompts("4", "5. Klasse", "Deutsch", "Wortarten", "", ["Kurzantwort"], 3)) == 1
@@ -0,0 +1,60 @@
+"""
+Test Script für die Fragenbank
+
+Testet Speichern mit Duplikaterkennung, gefilterte Abfragen, Volltextsuche und den Abgleich mit dem Verteilungsplan
+"""
+
+import time
+
+from benchmark_corpus import generate_worksheet
+from compliance import plan_for_request
+from pdf_generator import create_sample_json
+from question_bank import QuestionBank
+
+
+def test_speichern_und_duplikate(tmp_path):
+    """Teste, dass bekannte Aufgaben nicht doppelt gespeichert werden"""
+    path = str(tmp_path / "bank.sqlite3")
+    with QuestionBank(path) as bank:
+        assert bank.add_worksheet(create_sample_json()) == (2, 0)
+        assert bank.add_worksheet(create_sample_json()) == (0, 2)
+
+    # Persistent über das Schließen hinaus
+    with QuestionBank(path) as bank:
+        exercises = bank.query(subject="deutsch", grade="4. Klasse", subtopic="Artikel")
+        assert len(exercises) == 1
+        assert exercises[0].multiple_choice.options == ("der", "die", "das")
+
+
+def test_abfrage_und_volltextsuche():
+    """Teste Filter, Volltextsuche und Geschwindigkeit der Abfragen"""
+    with QuestionBank(":memory:") as bank:
+        bank.add_worksheet(generate_worksheet(600, seed=1))
+        bank.add_worksheet(create_sample_json())
+
+        start = time.perf_counter()
+        plural = bank.query(subject="Deutsch", grade="4. Klasse", subtopic="Plural")
+        found = bank.query(text="Hunde Katzen")
+        elapsed = time.perf_counter() - start
+
+        assert len(plural) == bank.count(subtopic="Plural") == 101
+        assert [exercise.question for exercise in found] == ["Unterstreiche alle Pluralformen in diesem Satz:"]
+        assert bank.query(text='"; DROP TABLE exercises') == []
+        assert bank.count(text="Mädchen") > 0
+        print(f"\n2 Abfragen auf {bank.count()} Aufgaben: {elapsed * 1000:.1f} ms")
+
+
+def test_fehlende_plaetze():
+    """Teste, welche Plan-Plätze die Bank nicht füllen kann"""
+    with QuestionBank(":memory:") as bank:
+        bank.add_worksheet(create_sample_json())
+
+        plan = plan_for_request("2", "Nomen", "Plural, Artikel", ["Unterstreichen", "Multiple Choice"])
+        assert bank.missing_slots(plan, "Deutsch", "4. Klasse", "Nomen") == [
+            ("Plural", "Multiple Choice", 1),
+            ("Artikel", "Unterstreichen", 1),
+        ]
+        assert bank.missing_slots(plan[:1], "Deutsch", "4. Klasse", "Verben") == [
+            ("Plural", "Unterstreichen", 1),
+            ("Plural", "Multiple Choice", 1),
+        ]
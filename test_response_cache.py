@@ -0,0 +1,127 @@
+"""
+Test Script für den Antwort-Cache
+
+Testet Normalisierung der Prompts, Ablaufzeit, LRU-Verdrängung und die Nutzung durch den LLM-Client
+"""
+
+import json
+import os
+import time
+from types import SimpleNamespace
+
+from llm_client import LLMClient
+from pdf_generator import create_sample_json
+from response_cache import ResponseCache
+from ui.prompt_tab import PromptGeneratorTab
+
+
+def test_normalisierung_ablauf_und_verdraengung(tmp_path):
+    """Teste gleiche Schlüssel für umformatierte Prompts, TTL und LRU-Reihenfolge"""
+    cache = ResponseCache(str(tmp_path), max_entries=2, ttl=60)
+
+    key = cache.make_key("Erstelle  5 Aufgaben\nzum Thema Nomen")
+    assert key == cache.make_key(" Erstelle 5 Aufgaben zum Thema\tNomen ")
+    assert key != cache.make_key("Erstelle 5 Aufgaben zum Thema Nomen", "gpt-4o")
+
+    cache.put(key, '{"a": 1}')
+    assert cache.get(key)[0] == '{"a": 1}'
+
+    # Der zuletzt gelesene Eintrag überlebt, der älteste wird verdrängt
+    cache.put("b", '{"b": 2}')
+    os.utime(os.path.join(str(tmp_path), "b.json"), (time.time() - 10,) * 2)
+    cache.get(key)
+    cache.put("c", '{"c": 3}')
+    assert cache.get("b") is None
+    assert cache.get(key) is not None and cache.get("c") is not None
+
+    # Abgelaufene Einträge werden nicht mehr geliefert
+    expired = ResponseCache(str(tmp_path), max_entries=2, ttl=0)
+    time.sleep(0.01)
+    assert expired.get("c") is None
+    assert not os.path.exists(os.path.join(str(tmp_path), "c.json"))
+
+
+def test_kaputte_eintraege_sind_fehltreffer(tmp_path):
+    """Teste, dass abgeschnittene und veraltete Einträge als Fehltreffer gelten und gelöscht werden"""
+    cache = ResponseCache(str(tmp_path))
+    entries = {"abgeschnitten": '{"created": 1', "alt": '{"response": "{}"}', "liste": "[]"}
+    for key, content in entries.items():
+        with open(os.path.join(str(tmp_path), f"{key}.json"), "w", encoding="utf-8") as f:
+            f.write(content)
+
+    for key in entries:
+        assert cache.get(key) is None
+        assert not os.path.exists(os.path.join(str(tmp_path), f"{key}.json"))
+
+
+def test_eintrag_verdraengt_waehrend_aufraeumen(tmp_path, monkeypatch):
+    """Teste, dass ein zwischen Auflisten und Prüfen verdrängter Eintrag übersprungen wird"""
+    cache = ResponseCache(str(tmp_path))
+    cache.put("a", '{"a": 1}')
+    cache.put("b", '{"b": 2}')
+
+    listdir = os.listdir
+
+    def listdir_then_remove(path):
+        filenames = listdir(path)
+        os.remove(os.path.join(path, "a.json"))
+        return filenames
+
+    monkeypatch.setattr(os, "listdir", listdir_then_remove)
+    cache.evict()
+    monkeypatch.undo()
+    assert cache.get("b")[0] == '{"b": 2}'
+
+
+def test_antwort_nur_passend_und_einmal_speichern(tmp_path):
+    """Teste, dass nur zum Prompt passende Antworten gespeichert werden, und zwar einmal"""
+    cache = ResponseCache(str(tmp_path))
+    stored = []
+    cache.put = lambda key, response: stored.append((key, response))
+    tab = SimpleNamespace(
+        response_cache=cache, last_prompt_key="schluessel", last_prompt_inputs=("4. Klasse", "Deutsch", "nomen")
+    )
+    tab.get_response_cache = lambda: cache
+
+    # Beispieldaten für ein anderes Thema werden nicht gespeichert
+    other = create_sample_json()
+    other["metadata"]["topic"] = "Verben"
+    PromptGeneratorTab.store_response(tab, json.dumps(other))
+    assert stored == []
+
+    # Die passende Antwort wird genau einmal gespeichert (Validieren und danach Generieren)
+    matching = json.dumps(create_sample_json())
+    PromptGeneratorTab.store_response(tab, matching)
+    PromptGeneratorTab.store_response(tab, matching)
+    assert stored == [("schluessel", matching)]
+
+
+def test_llm_client_nutzt_cache(tmp_path, run_with_stub):
+    """Teste, dass ein wiederholter Prompt ohne Anfrage beantwortet wird"""
+    cache = ResponseCache(str(tmp_path))
+
+    async def send(url):
+        async with LLMClient(url, cache=cache) as client:
+            first = await client.generate_worksheet("Prompt A")
+            again = await client.generate_worksheet("Prompt   A")
+            return first, again, client.cache_hits
+
+    (first, again, hits), server = run_with_stub(send, exercises=3)
+
+    assert server.requests == 1
+    assert hits == 1
+    assert again.to_dict() == first.to_dict()
+
+    # Ungültige Antworten werden nicht gespeichert
+    _, server = run_with_stub(lambda url: _generate_invalid(url, cache), response="kein JSON")
+    assert server.requests == 1
+    assert cache.get(cache.make_key("Prompt B", LLMClient("http://localhost/").model)) is None
+
+
+async def _generate_invalid(url, cache):
+    """Fordere ein Arbeitsblatt an, dessen Antwort kein gültiges JSON ist"""
+    async with LLMClient(url, cache=cache) as client:
+        try:
+            await client.generate_worksheet("Prompt B")
+        except ValueError:
+            return None
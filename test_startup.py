@@ -0,0 +1,51 @@
+"""
+Test Script für die Startzeit der GUI
+
+Misst mit "python -X importtime", welche Module beim Start geladen werden,
+und stellt sicher, dass reportlab und pyperclip erst bei Bedarf importiert werden
+"""
+
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Module, die beim Start nicht geladen werden dürfen
+LAZY_MODULES = ("reportlab", "pyperclip", "pdf_generator")
+
+# Obergrenze für die Importzeit des GUI-Starts (gemessen etwa 50-80 ms, großzügig für langsame Rechner)
+STARTUP_BUDGET_MS = 1000
+
+
+def measure_import(statement):
+    """Importiere in einem frischen Interpreter und gib {Modul: (kumulierte Mikrosekunden, Tiefe)} zurück"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        # Indentation shows the nesting, top-level imports have the smallest indent
+        depth = len(name) - len(name.lstrip())
+        modules[name.strip()] = (int(cumulative_us), depth)
+    return modules
+
+
+def test_gui_start_ohne_pdf_bibliotheken():
+    """Teste, dass der GUI-Start weder reportlab noch pyperclip lädt"""
+    modules = measure_import("import ai_prompt_generator, json_import_ui")
+
+    loaded = [name for name in modules if name.split(".")[0] in LAZY_MODULES]
+    assert loaded == []
+
+    top_level = min(depth for _, depth in modules.values())
+    total_ms = sum(us for us, depth in modules.values() if depth == top_level) / 1000
+    assert 0 < total_ms < STARTUP_BUDGET_MS
@@ -0,0 +1,64 @@
+"""
+Test Script für das Zusammenstellen von Arbeitsblättern aus der Fragenbank
+
+Testet Einhaltung des Verteilungsplans, Reproduzierbarkeit, Vermeidung von Wiederholungen und Geschwindigkeit
+"""
+
+import time
+
+import pytest
+
+from benchmark_corpus import generate_worksheet
+from compliance import check_worksheet, plan_for_request
+from question_bank import QuestionBank
+from worksheet_assembler import AssemblyError, WorksheetAssembler
+
+TYPES = ["Lückentext (Wort einsetzen)", "Erkennen/Unterstreichen", "Ankreuzen (Multiple Choice)"]
+REQUEST = ("5", "4. Klasse", "Deutsch", "Nomen und Wortarten", "Plural, Artikel, Merkwörter", TYPES)
+
+
+@pytest.fixture
+def bank():
+    """Fragenbank mit 3000 synthetischen Aufgaben"""
+    with QuestionBank(":memory:") as bank:
+        for seed in range(5):
+            bank.add_worksheet(generate_worksheet(600, seed=seed))
+        yield bank
+
+
+def test_klassensatz_nach_plan(bank):
+    """Teste 30 verschiedene, plangerechte Blätter in unter 100 ms pro Blatt"""
+    assembler = WorksheetAssembler(bank)
+    plan = plan_for_request(REQUEST[0], REQUEST[3], REQUEST[4], TYPES)
+
+    start = time.perf_counter()
+    worksheets = assembler.assemble_variants(30, *REQUEST, seed=1)
+    per_sheet = (time.perf_counter() - start) / 30
+
+    for worksheet in worksheets:
+        report = check_worksheet(worksheet, plan)
+        assert report.is_compliant, report.issues
+        assert [exercise.id for exercise in worksheet.exercises] == list(range(1, 16))
+
+    # Bei genug Vorrat teilen sich aufeinanderfolgende Blätter keine Aufgabe
+    questions = [{exercise.question for exercise in worksheet.exercises} for worksheet in worksheets]
+    assert not questions[0] & questions[1]
+
+    # Gleicher Startwert -> gleiches Blatt
+    again = WorksheetAssembler(bank).assemble(*REQUEST, seed=1)
+    assert again.to_dict() == worksheets[0].to_dict()
+
+    print(f"\n30 Blätter: {per_sheet * 1000:.2f} ms pro Blatt")
+    assert per_sheet < 0.1
+
+
+def test_fehlende_aufgaben(bank):
+    """Teste, dass fehlende Plätze gemeldet statt still ausgelassen werden"""
+    with pytest.raises(AssemblyError) as error:
+        WorksheetAssembler(bank).assemble("5", "4. Klasse", "Deutsch", "Nomen und Wortarten", "Plural, Verben", TYPES)
+
+    assert [(subtopic, count) for subtopic, _, count in error.value.missing] == [
+        ("Verben", 2),
+        ("Verben", 2),
+        ("Verben", 1),
+    ]
@@ -0,0 +1,64 @@
+"""
+Test Script für das Worksheet-Schema
+
+Testet, ob alle Fehler eines Dokuments in einem Durchlauf gefunden werden
+"""
+
+import pytest
+
+from exercise_model import parse_worksheet
+from pdf_generator import create_sample_json
+from worksheet_schema import WorksheetValidationError, validate_worksheet
+
+
+def test_valides_dokument():
+    """Teste, dass das Beispiel-JSON keine Fehler liefert"""
+    assert validate_worksheet(create_sample_json()) == []
+
+
+def test_wie_bisher_erlaubt():
+    """Teste, dass Listen als Antwort, null neben Teilaufgaben und null als Übungsbereiche gültig bleiben"""
+    data = create_sample_json()
+    data["metadata"]["subtopics"] = None
+    data["exercises"][0]["answer"] = None
+    data["exercises"][0]["sub_questions"][0]["answer"] = ["Katzen", "Mäuse", "Hunde"]
+    data["exercises"][1]["answer"] = ["der", "die"]
+
+    assert validate_worksheet(data) == []
+    worksheet = parse_worksheet(data)
+    assert worksheet.metadata.subtopics == ()
+    assert worksheet.exercises[1].answer == ["der", "die"]
+
+    data["exercises"][1]["answer"] = None
+    assert [str(error) for error in validate_worksheet(data)] == [
+        "$.exercises[1].answer: must be a string, number or list"
+    ]
+
+
+def test_alle_fehler_auf_einmal():
+    """Teste, dass mehrere Fehler mit JSON-Pfad gesammelt werden"""
+    data = create_sample_json()
+    del data["metadata"]["grade"]
+    del data["exercises"][0]["sub_questions"][1]["answer"]
+    del data["exercises"][1]["answer"]
+    data["exercises"][1]["options"] = "der, die, das"
+    data["exercises"].append("keine Aufgabe")
+
+    errors = [str(error) for error in validate_worksheet(data)]
+
+    assert errors == [
+        "$.metadata: missing required field 'grade'",
+        "$.exercises[0].sub_questions[1]: missing required field 'answer'",
+        "$.exercises[1]: missing required field 'answer'",
+        "$.exercises[1].options: must be a list",
+        "$.exercises[2]: must be an object",
+    ]
+
+    with pytest.raises(WorksheetValidationError) as excinfo:
+        parse_worksheet(data)
+    assert len(excinfo.value.errors) == 5
+
+
+def test_kein_objekt():
+    """Teste ein Dokument, das kein Objekt ist"""
+    assert [str(error) for error in validate_worksheet([])] == ["$: must be an object"]
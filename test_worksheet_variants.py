@@ -0,0 +1,58 @@
+"""
+Test Script für Arbeitsblatt-Varianten
+
+Testet reproduzierbares Mischen innerhalb der Unterthemen, korrekte Lösungen nach dem Mischen und die Variantenübersicht
+"""
+
+from benchmark_corpus import generate_worksheet
+from exercise_model import parse_worksheet
+from pdf_generator import create_sample_json
+from worksheet_variants import generate_variants, shuffle_worksheet, variant_label
+
+
+def test_mischen_pro_unterthema():
+    """Teste, dass Varianten nur innerhalb der Unterthemen mischen und Lösungen passend bleiben"""
+    worksheet = parse_worksheet(generate_worksheet(60, seed=2))
+
+    variant, order = shuffle_worksheet(worksheet, 7)
+    again, _ = shuffle_worksheet(worksheet, 7)
+    other, _ = shuffle_worksheet(worksheet, 8)
+
+    assert variant.to_dict() == again.to_dict()
+    assert variant.to_dict() != other.to_dict()
+    assert sorted(order) == list(range(1, 61))
+    assert [exercise.id for exercise in variant.exercises] == list(range(1, 61))
+
+    # Gleiche Aufgaben pro Unterthema, Unterthemen in Originalreihenfolge
+    original_groups = worksheet.exercises_by_subtopic()
+    variant_groups = variant.exercises_by_subtopic()
+    assert list(variant_groups) == list(original_groups)
+    for subtopic, exercises in original_groups.items():
+        assert sorted(e.question for e in variant_groups[subtopic]) == sorted(e.question for e in exercises)
+
+    for number, exercise in zip(order, variant.exercises):
+        source = worksheet.exercises[number - 1]
+        assert exercise.question == source.question
+        assert sorted(sub_q.answer for sub_q in exercise.sub_questions) == sorted(
+            sub_q.answer for sub_q in source.sub_questions
+        )
+        if exercise.multiple_choice:
+            # Die Lösung markiert die Option über ihren Text, die richtige Antwort bleibt eine Option
+            assert exercise.answer in exercise.multiple_choice.options
+            assert sorted(exercise.multiple_choice.options) == sorted(source.multiple_choice.options)
+
+    assert [variant_label(i) for i in (0, 1, 25, 26, 27)] == ["A", "B", "Z", "AA", "AB"]
+
+
+def test_varianten_rendern(tmp_path):
+    """Teste Rendern mehrerer Varianten mit Übersichtsseite"""
+    results, index_path = generate_variants(create_sample_json(), 3, str(tmp_path), seed=40, workers=1)
+
+    assert [(result["name"], result["seed"], result["ok"]) for result in results] == [
+        ("A", 40, True),
+        ("B", 41, True),
+        ("C", 42, True),
+    ]
+    assert results[1]["exercise_pdf"] == str(tmp_path / "Nomen_uebungsblatt_B.pdf")
+    with open(index_path, "rb") as f:
+        assert f.read(5) == b"%PDF-"
@@ -10,7 +10,6 @@ Date: October 2025
 import tkinter as tk
 from tkinter import ttk
 from .prompt_tab import PromptGeneratorTab
-from .json_pdf_tab import JsonPdfTab
 from config import WINDOW_TITLE, WINDOW_SIZE
 
 
@@ -29,6 +28,7 @@ class AIPromptGeneratorUI:
         self.prompt_generator = prompt_generator
         self.notebook = None
         self.prompt_tab_instance = None
+        self.json_pdf_tab_frame = None
         self.json_pdf_tab_instance = None
 
         self.setup_window()
@@ -57,9 +57,26 @@ class AIPromptGeneratorUI:
         # Tab 1: JSON Prompt Generator
         prompt_tab_frame = ttk.Frame(self.notebook, padding="20")
         self.notebook.add(prompt_tab_frame, text="JSON Prompt Generator")
-        self.prompt_tab_instance = PromptGeneratorTab(prompt_tab_frame, self.root, self.prompt_generator)
+        self.prompt_tab_instance = PromptGeneratorTab(
+            prompt_tab_frame, self.root, self.prompt_generator, on_cached_response=self.open_cached_response
+        )
 
-        # Tab 2: JSON Import & PDF Generator
-        json_pdf_tab_frame = ttk.Frame(self.notebook, padding="10")
-        self.notebook.add(json_pdf_tab_frame, text="JSON → PDF Generator")
-        self.json_pdf_tab_instance = JsonPdfTab(json_pdf_tab_frame)
+        # Tab 2: JSON Import & PDF Generator (content is built when the tab is first selected)
+        self.json_pdf_tab_frame = ttk.Frame(self.notebook, padding="10")
+        self.notebook.add(self.json_pdf_tab_frame, text="JSON → PDF Generator")
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+
+    def on_tab_changed(self, event=None):
+        """Build the JSON → PDF tab on first selection"""
+        if self.json_pdf_tab_instance is None and self.notebook.select() == str(self.json_pdf_tab_frame):
+            from .json_pdf_tab import JsonPdfTab
+
+            self.json_pdf_tab_instance = JsonPdfTab(
+                self.json_pdf_tab_frame, on_valid_json=self.prompt_tab_instance.store_response
+            )
+
+    def open_cached_response(self, json_string):
+        """Show a cached AI response in the JSON → PDF tab"""
+        self.notebook.select(self.json_pdf_tab_frame)
+        self.on_tab_changed()
+        self.json_pdf_tab_instance.json_import_ui.set_json(json_string)
@@ -13,17 +13,19 @@ from json_import_ui import JSONImportUI
 class JsonPdfTab:
     """JSON import and PDF generation tab"""
 
-    def __init__(self, parent_frame):
+    def __init__(self, parent_frame, on_valid_json=None):
         """
         Initialize the JSON to PDF tab
 
         Args:
             parent_frame: Parent tkinter frame
+            on_valid_json (callable): Optional callback with every successfully validated JSON string
         """
         self.parent = parent_frame
+        self.on_valid_json = on_valid_json
         self.json_import_ui = None
         self.create_ui()
 
     def create_ui(self):
         """Create the tab UI"""
-        self.json_import_ui = JSONImportUI(self.parent)
+        self.json_import_ui = JSONImportUI(self.parent, self.on_valid_json)
@@ -12,9 +12,9 @@ Tab component for the unified prompt generator with PDF/JSON toggle.        self
 Date: October 2025
 """
 
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import pyperclip
 from config import (
     GRADES,
     SUBJECTS,
@@ -30,12 +30,14 @@ from config import (
     MIN_QUESTIONS,
     MAX_QUESTIONS,
 )
+from create_prompt import estimate_tokens
+from response_cache import ResponseCache, response_matches_prompt
 
 
 class PromptGeneratorTab:
     """Prompt generator tab with PDF/JSON toggle"""
 
-    def __init__(self, parent_frame, root, prompt_generator):
+    def __init__(self, parent_frame, root, prompt_generator, on_cached_response=None):
         """
         Initialize the prompt generator tab
 
@@ -43,10 +45,17 @@ class PromptGeneratorTab:
             parent_frame: Parent tkinter frame
             root: Root window (for after() callbacks)
             prompt_generator: Instance of PromptGenerator class
+            on_cached_response (callable): Optional callback that opens a cached AI response (JSON string)
         """
         self.parent = parent_frame
         self.root = root
         self.prompt_generator = prompt_generator
+        self.on_cached_response = on_cached_response
+
+        # Response cache (created on first use), key and (grade, subject, topic) of the last generated prompt
+        self.response_cache = None
+        self.last_prompt_key = None
+        self.last_prompt_inputs = None
 
         # Variables for input fields
         self.grade_var = None
@@ -57,6 +66,7 @@ class PromptGeneratorTab:
         self.exercise_type_vars = {}
         self.exercise_checkboxes = []
         self.exercise_frame = None
+        self.compact_var = None
 
         # UI elements
         self.generate_button = None
@@ -206,7 +216,14 @@ class PromptGeneratorTab:
         """Create the output section with generated prompt display"""
         # Output label
         self.output_label = ttk.Label(self.parent, text="Generierter JSON-Prompt:", font=LABEL_FONT)
-        self.output_label.grid(row=9, column=0, columnspan=2, sticky=tk.W, pady=(20, 5))
+        self.output_label.grid(row=9, column=0, sticky=tk.W, pady=(20, 5))
+
+        # Compact prompt toggle (every rule once, fewer tokens)
+        self.compact_var = tk.BooleanVar(value=False)
+        compact_checkbox = ttk.Checkbutton(
+            self.parent, text="Kompakter Prompt (weniger Tokens)", variable=self.compact_var
+        )
+        compact_checkbox.grid(row=9, column=1, sticky=tk.E, pady=(20, 5))
 
         # Output text area with scrollbar
         self.output_text = scrolledtext.ScrolledText(self.parent, height=8, width=70, wrap=tk.WORD, font=OUTPUT_FONT)
@@ -248,15 +265,24 @@ class PromptGeneratorTab:
 
         # Generate JSON prompt
         prompt = self.prompt_generator.create_json_prompt_template(
-            num_questions, grade, subject, main_topic, subtopics, selected_exercise_types
+            num_questions,
+            grade,
+            subject,
+            main_topic,
+            subtopics,
+            selected_exercise_types,
+            compact=self.compact_var.get(),
         )
 
-        # Display the prompt
+        # Display the prompt with its estimated size
         self.output_text.delete(1.0, tk.END)
         self.output_text.insert(1.0, prompt)
+        self.output_label.configure(text=f"Generierter JSON-Prompt (≈ {estimate_tokens(prompt)} Tokens):")
 
-        # Auto-copy to clipboard
+        # Auto-copy to clipboard (pyperclip is imported on first use)
         try:
+            import pyperclip
+
             pyperclip.copy(prompt)
         except Exception:
             pass
@@ -265,6 +291,58 @@ class PromptGeneratorTab:
         self.show_text_area_success()
         self.show_generate_button_success()
 
+        self.last_prompt_inputs = (grade, subject, main_topic)
+        self.offer_cached_response(prompt)
+
+    def get_response_cache(self):
+        """
+        Get the response cache, creating it on first use
+
+        Returns:
+            ResponseCache or None: The cache, or None if the cache directory is not writable
+        """
+        if self.response_cache is None:
+            try:
+                self.response_cache = ResponseCache()
+            except OSError:
+                return None
+        return self.response_cache
+
+    def offer_cached_response(self, prompt):
+        """Remember the prompt and offer a stored AI answer for it, if there is one"""
+        cache = self.get_response_cache()
+        if cache is None:
+            return
+
+        self.last_prompt_key = cache.make_key(prompt)
+        cached = cache.get(self.last_prompt_key)
+        if cached is None or self.on_cached_response is None:
+            return
+
+        response, created = cached
+        if messagebox.askyesno(
+            "Gespeicherte Antwort",
+            f"Für diesen Prompt gibt es eine gespeicherte KI-Antwort vom "
+            f"{time.strftime('%d.%m.%Y %H:%M', time.localtime(created))}.\n\n"
+            "Im Tab 'JSON → PDF Generator' öffnen, statt die KI erneut zu fragen?",
+        ):
+            # The answer is already cached, validating it again must not store it anew
+            self.last_prompt_key = None
+            self.on_cached_response(response)
+
+    def store_response(self, json_string):
+        """Store a validated AI answer for the last generated prompt, once and only if its metadata matches"""
+        if self.last_prompt_key is None or not response_matches_prompt(json_string, *self.last_prompt_inputs):
+            return
+
+        cache = self.get_response_cache()
+        if cache is not None:
+            key, self.last_prompt_key = self.last_prompt_key, None
+            try:
+                cache.put(key, json_string)
+            except OSError:
+                pass
+
     def copy_to_clipboard(self):
         """Copy the generated prompt to clipboard"""
         prompt_text = self.output_text.get(1.0, tk.END).strip()
@@ -276,6 +354,8 @@ class PromptGeneratorTab:
             return
 
         try:
+            import pyperclip
+
             pyperclip.copy(prompt_text)
             self.show_copy_button_success()
         except Exception as e:
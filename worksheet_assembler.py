@@ -0,0 +1,176 @@
+"""
+Worksheet Assembler Module
+
+This module builds worksheets from the question bank without asking the
+AI. The request is turned into the same distribution plan the prompt
+would contain (exercises per subtopic and type), every slot is filled
+with randomly drawn stored exercises and the multiple choice share is
+kept within the limit. Candidates are loaded once per subject, grade
+and topic and indexed by slot, so a class set of variants costs only a
+few milliseconds per sheet. Recently assembled sheets are remembered and
+their exercises are only reused when the bank runs out of fresh ones.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import math
+import random
+from collections import deque
+
+from compliance import exercise_problem, is_multiple_choice, normalize_name, plan_for_request, with_id
+from config import MAX_MULTIPLE_CHOICE_SHARE, MULTIPLE_CHOICE_TYPE
+from exercise_model import Metadata, Worksheet
+
+# Number of recently assembled sheets whose exercises are avoided
+DEFAULT_RECENT_SHEETS = 30
+
+
+class AssemblyError(ValueError):
+    """Raised when the question bank cannot fill the distribution plan"""
+
+    def __init__(self, missing):
+        """
+        Args:
+            missing (list): [(subtopic, exercise_type, missing count), ...] as for create_repair_prompt
+        """
+        details = ", ".join(f"{subtopic or 'Gesamt'} / {ex_type}: {count}" for subtopic, ex_type, count in missing)
+        super().__init__(f"Nicht genug Aufgaben in der Fragenbank ({details})")
+        self.missing = missing
+
+
+class WorksheetAssembler:
+    """Assemble worksheets from stored exercises following the prompt distribution rules"""
+
+    def __init__(self, bank, recent_sheets=DEFAULT_RECENT_SHEETS):
+        """
+        Initialize the assembler
+
+        Args:
+            bank (question_bank.QuestionBank): Question bank to draw from
+            recent_sheets (int): Number of recent sheets whose exercises are avoided
+        """
+        self.bank = bank
+        self.recent = deque(maxlen=recent_sheets)
+        self._candidates = {}
+
+    def _slot_index(self, subject, grade, topic):
+        """
+        Load and index the compliant candidates for subject, grade and topic (cached)
+
+        Returns:
+            tuple: ({(subtopic, type): [exercises]}, {type: [exercises]}) with normalized keys
+        """
+        key = (normalize_name(subject), normalize_name(grade), normalize_name(topic) if topic else None)
+        index = self._candidates.get(key)
+        if index is None:
+            by_slot, by_type = {}, {}
+            for exercise in self.bank.query(subject=subject, grade=grade, topic=topic):
+                if exercise_problem(exercise):
+                    continue
+                ex_type = normalize_name(exercise.type)
+                by_slot.setdefault((normalize_name(exercise.subtopic), ex_type), []).append(exercise)
+                by_type.setdefault(ex_type, []).append(exercise)
+            index = self._candidates[key] = (by_slot, by_type)
+        return index
+
+    def clear_cache(self):
+        """Forget the loaded candidates (after new exercises were added to the bank)"""
+        self._candidates.clear()
+
+    def assemble(
+        self, num_questions, grade, subject, main_topic, subtopics, exercise_types, seed=None, match_topic=True
+    ):
+        """
+        Assemble one worksheet
+
+        Args:
+            num_questions (str): Number of questions per subtopic (per type without subtopics)
+            grade (str): Grade/class level
+            subject (str): Subject area
+            main_topic (str): Main topic
+            subtopics (str): Subtopics separated by commas
+            exercise_types (list): List of exercise types
+            seed (int): Random seed (same seed and bank state -> same worksheet)
+            match_topic (bool): Only use exercises stored under main_topic (False: any topic)
+
+        Returns:
+            Worksheet: Worksheet with exercises numbered 1..n, ready for PDFGenerator
+
+        Raises:
+            AssemblyError: If the bank has too few exercises for some slots (see .missing)
+        """
+        plan = plan_for_request(num_questions, main_topic, subtopics, exercise_types)
+        by_slot, by_type = self._slot_index(subject, grade, main_topic if match_topic else None)
+        rng = random.Random(seed)
+        recent = set().union(*self.recent)
+
+        # Multiple choice budget as enforced by check_worksheet
+        total = sum(count for _, type_counts in plan for _, count in type_counts)
+        planned_mc = sum(
+            count
+            for _, type_counts in plan
+            for ex_type, count in type_counts
+            if normalize_name(ex_type) == normalize_name(MULTIPLE_CHOICE_TYPE)
+        )
+        mc_budget = math.floor(max(MAX_MULTIPLE_CHOICE_SHARE, planned_mc / max(total, 1)) * total)
+        # Multiple choice slots are filled first, the rest of the budget is open to other types
+        mc_budget -= planned_mc
+
+        exercises, missing, used = [], [], []
+        for subtopic, type_counts in plan:
+            for ex_type, count in type_counts:
+                if subtopic is None:
+                    candidates = by_type.get(normalize_name(ex_type), ())
+                else:
+                    candidates = by_slot.get((normalize_name(subtopic), normalize_name(ex_type)), ())
+                is_mc_slot = normalize_name(ex_type) == normalize_name(MULTIPLE_CHOICE_TYPE)
+
+                drawn = []
+                for exercise in _draw_order(rng, candidates, recent):
+                    if len(drawn) == count:
+                        break
+                    if not is_mc_slot and is_multiple_choice(exercise):
+                        if mc_budget <= 0:
+                            continue
+                        mc_budget -= 1
+                    drawn.append(exercise)
+                    used.append(exercise.id)
+
+                if len(drawn) < count:
+                    missing.append((subtopic, ex_type, count - len(drawn)))
+                exercises.extend(with_id(exercise, 0, subtopic=subtopic, ex_type=ex_type) for exercise in drawn)
+
+        if missing:
+            raise AssemblyError(missing)
+
+        self.recent.append(frozenset(used))
+        subtopic_names = [subtopic for subtopic, _ in plan if subtopic is not None]
+        return Worksheet(
+            Metadata(main_topic, grade, subject, subtopic_names),
+            [with_id(exercise, number) for number, exercise in enumerate(exercises, 1)],
+        )
+
+    def assemble_variants(self, count, *args, seed=0, **kwargs):
+        """
+        Assemble several different worksheets (e.g. one per student)
+
+        Args:
+            count (int): Number of worksheets
+            *args: Arguments of assemble (num_questions, grade, subject, main_topic, subtopics, exercise_types)
+            seed (int): Base seed, variant i uses seed + i
+            **kwargs: Further keyword arguments of assemble
+
+        Returns:
+            list: Worksheets
+        """
+        return [self.assemble(*args, seed=seed + i, **kwargs) for i in range(count)]
+
+
+def _draw_order(rng, candidates, recent):
+    """Candidates in random order, exercises of recent sheets last"""
+    fresh = [exercise for exercise in candidates if exercise.id not in recent]
+    reused = [exercise for exercise in candidates if exercise.id in recent]
+    rng.shuffle(fresh)
+    rng.shuffle(reused)
+    return fresh + reused
@@ -0,0 +1,227 @@
+"""
+Worksheet Schema Module
+
+This module contains the declarative schema of the exercise JSON format.
+The schema is compiled once at import time into nested validator functions
+that check a whole document in a single pass and collect every error with
+its JSON path, instead of stopping at the first problem.
+
+Has no dependency on reportlab, so the UI can validate without it.
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+# Python types accepted for each schema type name
+_TYPE_CHECKS = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "scalar": (str, int, float, bool),
+    "answer": (str, int, float, bool, list),
+}
+
+_TYPE_NAMES = {
+    "object": "an object",
+    "array": "a list",
+    "string": "a string",
+    "scalar": "a string or number",
+    "answer": "a string, number or list",
+}
+
+SUB_QUESTION_SCHEMA = {
+    "type": "object",
+    "required": ["question", "answer"],
+    "properties": {
+        "question": {"type": "scalar"},
+        # Some answers are lists (e.g. all words to underline), rendered as they are
+        "answer": {"type": "answer"},
+        "explanation": {"type": "scalar", "nullable": True},
+    },
+}
+
+_EXERCISE_PROPERTIES = {
+    "id": {"type": "scalar"},
+    "type": {"type": "scalar"},
+    "subtopic": {"type": "scalar"},
+    "question": {"type": "scalar"},
+    "answer": {"type": "answer"},
+    "explanation": {"type": "scalar", "nullable": True},
+    "options": {"type": "array", "items": {"type": "scalar"}, "nullable": True},
+}
+
+EXERCISE_SCHEMA = {
+    "type": "object",
+    # Exercises with sub_questions (new format) or a single answer (legacy format)
+    "when_present": (
+        "sub_questions",
+        {
+            "required": ["id", "type", "question", "sub_questions"],
+            # The answers are in the sub_questions, a top-level answer may be null
+            "properties": dict(
+                _EXERCISE_PROPERTIES,
+                answer={"type": "answer", "nullable": True},
+                sub_questions={"type": "array", "items": SUB_QUESTION_SCHEMA},
+            ),
+        },
+        {
+            "required": ["id", "type", "question", "answer"],
+            "properties": _EXERCISE_PROPERTIES,
+        },
+    ),
+}
+
+METADATA_SCHEMA = {
+    "type": "object",
+    "required": ["topic", "grade", "subject"],
+    "properties": {
+        "topic": {"type": "scalar"},
+        "grade": {"type": "scalar"},
+        "subject": {"type": "scalar"},
+        "subtopics": {"type": "array", "items": {"type": "scalar"}, "nullable": True},
+    },
+}
+
+WORKSHEET_SCHEMA = {
+    "type": "object",
+    "required": ["metadata", "exercises"],
+    "properties": {
+        "metadata": METADATA_SCHEMA,
+        "exercises": {"type": "array", "items": EXERCISE_SCHEMA},
+    },
+}
+
+
+class SchemaError:
+    """Single validation error with the JSON path of the offending value"""
+
+    __slots__ = ("path", "message")
+
+    def __init__(self, path, message):
+        self.path = path
+        self.message = message
+
+    def __str__(self):
+        return f"{self.path}: {self.message}"
+
+    def __repr__(self):
+        return f"SchemaError({self.path!r}, {self.message!r})"
+
+
+class WorksheetValidationError(ValueError):
+    """Raised when a worksheet does not match the schema, carries all errors at once"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        lines = [str(error) for error in self.errors]
+        super().__init__(f"{len(lines)} validation error(s):\n" + "\n".join(lines))
+
+
+def compile_schema(schema):
+    """
+    Compile a schema dictionary into a validator function
+
+    Args:
+        schema (dict): Schema with the keys type, nullable, required, properties, items and when_present
+
+    Returns:
+        callable: validate(value, path, errors) appending SchemaError objects to errors
+    """
+    checks = []
+    nullable = schema.get("nullable", False)
+
+    if "type" in schema:
+        python_types = _TYPE_CHECKS[schema["type"]]
+        type_name = _TYPE_NAMES[schema["type"]]
+    else:
+        python_types = type_name = None
+
+    if "required" in schema or "properties" in schema:
+        checks.append(_compile_object(schema.get("required", ()), schema.get("properties", {})))
+
+    if "items" in schema:
+        checks.append(_compile_items(compile_schema(schema["items"])))
+
+    if "when_present" in schema:
+        key, present_schema, absent_schema = schema["when_present"]
+        present, absent = compile_schema(present_schema), compile_schema(absent_schema)
+
+        def check_variant(value, path, errors):
+            (present if key in value else absent)(value, path, errors)
+
+        checks.append(check_variant)
+
+    def validate(value, path, errors):
+        if value is None and nullable:
+            return
+        if python_types is not None and not isinstance(value, python_types):
+            errors.append(SchemaError(path, f"must be {type_name}"))
+            return
+        for check in checks:
+            check(value, path, errors)
+
+    return validate
+
+
+def _compile_object(required, properties):
+    """Compile the required-field and property checks of an object schema"""
+    required = tuple(required)
+    property_validators = tuple((name, compile_schema(sub_schema)) for name, sub_schema in properties.items())
+
+    def check_object(value, path, errors):
+        for name in required:
+            if name not in value:
+                errors.append(SchemaError(path, f"missing required field '{name}'"))
+        for name, validator in property_validators:
+            if name in value:
+                validator(value[name], f"{path}.{name}", errors)
+
+    return check_object
+
+
+def _compile_items(item_validator):
+    """Compile the per-item check of an array schema"""
+
+    def check_items(value, path, errors):
+        for i, item in enumerate(value):
+            item_validator(item, f"{path}[{i}]", errors)
+
+    return check_items
+
+
+# Compiled once at import time
+_validate_worksheet = compile_schema(WORKSHEET_SCHEMA)
+_validate_metadata = compile_schema(METADATA_SCHEMA)
+_validate_exercise = compile_schema(EXERCISE_SCHEMA)
+
+
+def validate_worksheet(data):
+    """
+    Validate an exercise document against the worksheet schema
+
+    Args:
+        data: Parsed JSON document
+
+    Returns:
+        list: All SchemaError objects found (empty if the document is valid)
+    """
+    errors = []
+    _validate_worksheet(data, "$", errors)
+    return errors
+
+
+def validate_part(kind, data, path):
+    """
+    Validate a single part of a worksheet (for documents read record by record)
+
+    Args:
+        kind (str): "metadata" or "exercise"
+        data: Parsed JSON value
+        path (str): JSON path of the value, used in the error messages
+
+    Returns:
+        list: All SchemaError objects found (empty if the value is valid)
+    """
+    errors = []
+    (_validate_metadata if kind == "metadata" else _validate_exercise)(data, path, errors)
+    return errors
@@ -0,0 +1,299 @@
+"""
+Worksheet Variants Module
+
+This module produces A/B/C... variants of a worksheet against copying
+between desks: every variant reorders the exercises inside each
+subtopic, the sub-questions of every exercise and the multiple choice
+options. Each variant is fully determined by its seed; the solution
+sheet marks the correct option by its text, so the ✓ stays correct
+after shuffling. The source document is parsed once, the variants are
+shuffled and rendered in parallel worker processes and an index page
+maps variant letters to seeds and to the original exercise order.
+
+Usage:
+    python worksheet_variants.py arbeitsblatt.json --count 4 --seed 42 -o varianten/
+    python worksheet_variants.py arbeitsblatt.json --count 30 --jsonl varianten.jsonl
+
+Author: Toni Kleinfeld
+Date: October 2025
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import string
+import sys
+import time
+
+from exercise_model import Exercise, MultipleChoice, Worksheet, parse_worksheet
+
+# Source worksheet and PDF generator of the current worker process (set once per process)
+_worker_worksheet = None
+_worker_generator = None
+
+
+def variant_label(index):
+    """Letter(s) of the variant with the given index: A..Z, AA, AB, ..."""
+    label = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        label = string.ascii_uppercase[remainder] + label
+    return label
+
+
+def shuffle_worksheet(worksheet, seed):
+    """
+    Create a shuffled variant of a worksheet
+
+    Exercises keep their subtopic group (and the group order), but are
+    reordered inside it; sub-questions and multiple choice options are
+    reordered as well. Options are only shuffled if the answer is one of
+    them, otherwise the solution could point to a moved option (e.g. "b").
+
+    Args:
+        worksheet (Worksheet): Parsed source worksheet
+        seed (int): Random seed (same seed -> same variant)
+
+    Returns:
+        tuple: (variant worksheet with ids 1..n, original exercise numbers in variant order)
+    """
+    rng = random.Random(seed)
+    positions = {id(exercise): number for number, exercise in enumerate(worksheet.exercises, 1)}
+
+    exercises, order = [], []
+    for subtopic, group in worksheet.exercises_by_subtopic().items():
+        group = list(group)
+        rng.shuffle(group)
+        for exercise in group:
+            multiple_choice = exercise.multiple_choice
+            if multiple_choice and exercise.answer in multiple_choice.options:
+                multiple_choice = MultipleChoice(rng.sample(multiple_choice.options, len(multiple_choice.options)))
+
+            exercises.append(
+                Exercise(
+                    id=len(exercises) + 1,
+                    type=exercise.type,
+                    question=exercise.question,
+                    subtopic=subtopic,
+                    sub_questions=rng.sample(exercise.sub_questions, len(exercise.sub_questions)),
+                    answer=exercise.answer,
+                    explanation=exercise.explanation,
+                    multiple_choice=multiple_choice,
+                )
+            )
+            order.append(positions[id(exercise)])
+
+    return Worksheet(worksheet.metadata, exercises), order
+
+
+def _init_worker(worksheet):
+    """Receive the parsed source worksheet and create the PDF generator once per worker process"""
+    global _worker_worksheet, _worker_generator
+    from pdf_generator import PDFGenerator
+
+    _worker_worksheet = worksheet
+    _worker_generator = PDFGenerator()
+
+
+def _render_variant(job):
+    """
+    Shuffle and render a single variant inside a worker process
+
+    Args:
+        job (tuple): (label, seed, output_prefix)
+
+    Returns:
+        dict: Result as in batch_render plus seed and original exercise order
+    """
+    label, seed, output_prefix = job
+    start = time.perf_counter()
+    result = {"name": label, "seed": seed, "ok": False, "exercise_pdf": None, "solution_pdf": None, "error": None}
+
+    try:
+        variant, order = shuffle_worksheet(_worker_worksheet, seed)
+        paths = _worker_generator._build_output_paths(output_prefix, suffix=label)
+        _worker_generator._render_to_paths(variant, *paths)
+        result.update(ok=True, exercise_pdf=paths[0], solution_pdf=paths[1], order=order)
+    except Exception as e:
+        result["error"] = str(e)
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def generate_variants(json_data, count, output_dir, seed=0, workers=None, on_result=None, prefix=None):
+    """
+    Render count shuffled variants (exercise and solution sheet each) and a variant index page
+
+    Args:
+        json_data (Worksheet, dict or str): Source worksheet
+        count (int): Number of variants
+        output_dir (str): Directory for the generated PDFs
+        seed (int): Base seed, variant i uses seed + i
+        workers (int): Number of worker processes (default: number of CPU cores)
+        on_result (callable): Optional callback invoked with every per-variant result
+        prefix (str): Filename prefix (default: topic of the worksheet)
+
+    Returns:
+        tuple: (results in variant order, path of the variant index PDF)
+
+    Raises:
+        ValueError: If the worksheet is invalid
+    """
+    worksheet = parse_worksheet(json_data)
+    os.makedirs(output_dir, exist_ok=True)
+    prefix = prefix or "".join(c if c.isalnum() else "_" for c in worksheet.metadata.topic).strip("_") or "variante"
+    output_prefix = os.path.join(output_dir, prefix)
+    jobs = [(variant_label(i), seed + i, output_prefix) for i in range(count)]
+    workers = min(workers or os.cpu_count() or 1, max(count, 1))
+
+    results = []
+    if workers == 1:
+        # Render in-process, no pool overhead for a single worker
+        _init_worker(worksheet)
+        for job in jobs:
+            results.append(_render_variant(job))
+            if on_result:
+                on_result(results[-1])
+    else:
+        # The worksheet is sent once per worker, jobs only carry label and seed
+        with multiprocessing.Pool(processes=workers, initializer=_init_worker, initargs=(worksheet,)) as pool:
+            for result in pool.imap_unordered(_render_variant, jobs, chunksize=max(1, count // (workers * 4))):
+                results.append(result)
+                if on_result:
+                    on_result(result)
+
+    order = {label: i for i, (label, _, _) in enumerate(jobs)}
+    results.sort(key=lambda result: order[result["name"]])
+
+    index_path = f"{output_prefix}_varianten_index.pdf"
+    write_variant_index(worksheet, results, index_path)
+    return results, index_path
+
+
+def write_variant_index(worksheet, results, output_path, generator=None):
+    """
+    Write the variant index page: variant letter, seed, exercise order and files
+
+    Args:
+        worksheet (Worksheet): Source worksheet
+        results (list): Per-variant results of generate_variants
+        output_path (str or file-like): Target filename or writable binary file-like object
+        generator (PDFGenerator): PDF generator whose styles are used (created if None)
+    """
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+
+    if generator is None:
+        from pdf_generator import PDFGenerator
+
+        generator = PDFGenerator()
+    styles = generator.styles
+    metadata = worksheet.metadata
+
+    rows = [
+        [Paragraph(f"<b>{heading}</b>", styles["Normal"]) for heading in ("Variante", "Seed", "Reihenfolge", "Dateien")]
+    ]
+    for result in results:
+        if result["ok"]:
+            order = ", ".join(str(number) for number in result["order"])
+            files = f"{os.path.basename(result['exercise_pdf'])}<br/>{os.path.basename(result['solution_pdf'])}"
+        else:
+            order, files = "–", f"Fehler: {result['error']}"
+        rows.append(
+            [
+                Paragraph(f"<b>{result['name']}</b>", styles["Normal"]),
+                Paragraph(str(result["seed"]), styles["Normal"]),
+                Paragraph(order, styles["Normal"]),
+                Paragraph(files, styles["Normal"]),
+            ]
+        )
+
+    table = Table(rows, colWidths=[2 * cm, 2 * cm, 6 * cm, 7 * cm], repeatRows=1)
+    table.setStyle(
+        TableStyle(
+            [
+                ("GRID", (0, 0), (-1, -1), 0.5, "#999999"),
+                ("BACKGROUND", (0, 0), (-1, 0), "#EEEEEE"),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ]
+        )
+    )
+
+    story = [
+        Paragraph(f"{metadata.topic} – Varianten ({metadata.grade} {metadata.subject})", styles["CustomTitle"]),
+        Paragraph("Reihenfolge: Nummern der Aufgaben im Original, in der Reihenfolge der Variante.", styles["Normal"]),
+        Spacer(1, 0.5 * cm),
+        table,
+    ]
+    generator._create_document(output_path).build(story)
+
+
+def write_variants_jsonl(json_data, count, output, seed=0):
+    """
+    Write count shuffled variants as JSONL (one worksheet per line, e.g. for class_set)
+
+    Args:
+        json_data (Worksheet, dict or str): Source worksheet
+        count (int): Number of variants
+        output: Writable text stream
+        seed (int): Base seed, variant i uses seed + i
+    """
+    worksheet = parse_worksheet(json_data)
+    for i in range(count):
+        variant, _ = shuffle_worksheet(worksheet, seed + i)
+        output.write(json.dumps(variant.to_dict(), ensure_ascii=False) + "\n")
+
+
+def main(argv=None):
+    """Generate worksheet variants from the command line"""
+    parser = argparse.ArgumentParser(description="Gemischte Varianten (A, B, C, ...) eines Arbeitsblatts erzeugen")
+    parser.add_argument("worksheet", help="Arbeitsblatt (.json)")
+    parser.add_argument("-n", "--count", type=int, default=4, help="Anzahl der Varianten")
+    parser.add_argument("--seed", type=int, default=0, help="Startwert, Variante i nutzt seed + i")
+    parser.add_argument("-o", "--output-dir", default="pdf_output", help="Zielverzeichnis für die PDFs")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=None, help="Anzahl der Prozesse (Standard: alle CPU-Kerne)"
+    )
+    parser.add_argument("--jsonl", default=None, help="Varianten nur als JSONL schreiben ('-' für stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.worksheet, encoding="utf-8") as f:
+            json_string = f.read()
+        if args.jsonl == "-":
+            write_variants_jsonl(json_string, args.count, sys.stdout, args.seed)
+            return 0
+        if args.jsonl:
+            with open(args.jsonl, "w", encoding="utf-8") as output:
+                write_variants_jsonl(json_string, args.count, output, args.seed)
+            return 0
+
+        from batch_render import format_result
+
+        start = time.perf_counter()
+        results, index_path = generate_variants(
+            json_string,
+            args.count,
+            args.output_dir,
+            args.seed,
+            args.workers,
+            on_result=lambda r: print(format_result(r), flush=True),
+        )
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+
+    failed = sum(1 for result in results if not result["ok"])
+    print(
+        f"{len(results) - failed}/{len(results)} Varianten in {time.perf_counter() - start:.2f}s, "
+        f"Übersicht: {index_path}"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())